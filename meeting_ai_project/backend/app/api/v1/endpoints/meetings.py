@@ -1,63 +1,151 @@
-from fastapi import APIRouter, Depends, UploadFile, File, BackgroundTasks, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Response, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
-from sqlalchemy.orm import selectinload
-from app.core.database import get_db, AsyncSessionLocal
-from app.models.domain import Meeting, MeetingStatus, TranscriptSegment, ActionItem, VoiceProfile, User
-from app.services.audio_service import audio_service
-from app.services.llm_service import llm_service
-from app.services.voice_service import voice_service
-from app.services.rag_service import rag_service # <-- RAG Servisi Eklendi
+from sqlalchemy import select, or_, and_, func
+from app.core.database import get_db
+from app.models.domain import Meeting, MeetingStatus, TranscriptSegment, ActionItem, User, TeamMember
+from app.services.llm_service import llm_service, CHAT_ERROR_MESSAGE
+from app.services.rag_service import rag_service, reciprocal_rank_fusion # <-- RAG Servisi Eklendi
+from app.services.context_packer import ContextPacker, pack_lines
+from app.services.meeting_chat import build_meeting_context
+from app.core.job_queue import get_job_queue
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from app.core.cache import TTLCache
+from app.services.upload_service import (
+    save_upload_file, safe_filename, resumable_uploads,
+    UploadTooLargeError, UploadOffsetMismatchError, UploadNotFoundError,
+    UploadIncompleteError, UploadChecksumError
+)
 from app.api.v1.endpoints.auth import get_current_user # <-- Auth Eklendi
-from pydub import AudioSegment 
 from pydantic import BaseModel 
-import shutil
+from typing import Optional
 import os
-import soundfile as sf
-import numpy as np
+import asyncio
+import hashlib
 import json
+import time
 from datetime import datetime
 
 router = APIRouter()
 
+# Tamamlanmış toplantıların serileştirilmiş detay yanıtları: (tür, toplantı, pencere) -> (gövde, ETag)
+meeting_detail_cache = TTLCache(
+    "meeting_detail", settings.MEETING_DETAIL_CACHE_SIZE, settings.MEETING_DETAIL_CACHE_TTL,
+    max_bytes=settings.MEETING_DETAIL_CACHE_MAX_BYTES
+)
+
 # Chat istekleri için model
 class ChatRequest(BaseModel):
     query: str
 
+NO_TRANSCRIPT_ANSWER = "Bu toplantının henüz bir dökümü yok."
+NO_MEMORY_ANSWER = "Kayıtlarımda bu konuyla ilgili net bir bilgi bulamadım."
+
+# Parçalı yükleme istekleri için modeller
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    size: int
+    title: str = "Adsız Toplantı"
+
+class ResumableUploadComplete(BaseModel):
+    sha256: Optional[str] = None # İstemci gönderirse sunucudaki özetle karşılaştırılır
+
+def _page_limit(limit: Optional[int], cursor: Optional[str]) -> Optional[int]:
+    """
+    limit/cursor verilmeyen eski istemciler (web paneli, mobil) listenin tamamını bekler: sınırsız (None).
+    Sayfalamaya geçen istemci ?limit= ile başlar, sonraki sayfalarda varsayılan LIST_PAGE_SIZE'dır.
+    """
+    if limit is None and cursor is None:
+        return None
+    return limit or settings.LIST_PAGE_SIZE
+
+
+def _cursor_values(cursor: Optional[str], size: int):
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor, size)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # --- GÖREVLER ENDPOINTİ (Auth Destekli) ---
 @router.get("/tasks/all")
 async def get_all_tasks(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.LIST_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user), # <-- Sadece giriş yapanın görevleri
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Kullanıcının tüm toplantılarından çıkarılan görevleri getirir.
+    Kullanıcının tüm toplantılarından çıkarılan görevleri getirir (tarihe göre, tarihsizler sonda).
+    İmleçli sayfalama (?limit=): sonraki sayfa varsa imleci X-Next-Cursor başlığında döner, ?cursor= ile istenir.
     """
-    # Kullanıcıya ait toplantıları ve onların görevlerini birleştir
-    query = select(ActionItem, Meeting).join(Meeting)\
+    limit = _page_limit(limit, cursor)
+    # Sıralama anahtarı (due_date NULLS LAST, id): OFFSET yerine son görülen anahtardan devam edilir
+    query = select(
+        ActionItem.id, ActionItem.description, ActionItem.assignee_name, ActionItem.due_date,
+        ActionItem.confidence_score, Meeting.id.label("meeting_id"), Meeting.title, Meeting.created_at
+    ).join(Meeting)\
         .where(Meeting.owner_id == current_user.id)\
-        .order_by(ActionItem.due_date.asc().nulls_last())
-        
-    result = await db.execute(query)
-    
-    tasks_with_context = []
-    for task, meeting in result.all():
-        tasks_with_context.append({
-            "id": task.id,
-            "description": task.description,
-            "assignee": task.assignee_name,
-            "due_date": task.due_date,
-            "confidence": task.confidence_score,
-            "meeting_id": meeting.id,
-            "meeting_title": meeting.title,
-            "created_at": meeting.created_at
-        })
-        
-    return tasks_with_context
+        .order_by(ActionItem.due_date.asc().nulls_last(), ActionItem.id.asc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    after = _cursor_values(cursor, 2)
+    if after is not None:
+        due_date, task_id = after
+        if due_date is None:
+            query = query.where(ActionItem.due_date.is_(None), ActionItem.id > task_id)
+        else:
+            query = query.where(or_(
+                ActionItem.due_date > due_date,
+                and_(ActionItem.due_date == due_date, ActionItem.id > task_id),
+                ActionItem.due_date.is_(None)
+            ))
+
+    rows = (await db.execute(query)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].due_date, rows[-1].id)
+
+    return [
+        {
+            "id": row.id,
+            "description": row.description,
+            "assignee": row.assignee_name,
+            "due_date": row.due_date,
+            "confidence": row.confidence_score,
+            "meeting_id": row.meeting_id,
+            "meeting_title": row.title,
+            "created_at": row.created_at
+        }
+        for row in rows
+    ]
+
+async def _create_meeting_and_enqueue(db: AsyncSession, owner_id: int, title: str, file_path: str, content_sha256: str):
+    new_meeting = Meeting(
+        owner_id=owner_id, # <-- Dinamik User ID
+        title=title,
+        audio_file_path=file_path,
+        content_sha256=content_sha256,
+        status=MeetingStatus.UPLOADING
+    )
+    db.add(new_meeting)
+    await db.commit()
+    await db.refresh(new_meeting)
+
+    # Analiz API sürecinde değil, kalıcı kuyruk üzerinden worker'larda yapılır (python -m app.worker)
+    await asyncio.to_thread(
+        get_job_queue().enqueue, "process_meeting", {"meeting_id": new_meeting.id, "file_path": file_path}
+    )
+    return new_meeting
 
 @router.post("/upload", status_code=201)
 async def upload_meeting(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: str = "Adsız Toplantı",
     current_user: User = Depends(get_current_user), # <-- Auth Eklendi
@@ -66,265 +154,435 @@ async def upload_meeting(
     upload_dir = "uploads"
     os.makedirs(upload_dir, exist_ok=True)
     
-    # Dosya ismini güvenli hale getir (Kullanıcı ID'si ile başlasın)
-    safe_filename = f"user_{current_user.id}_{file.filename.replace(' ', '_')}"
-    file_path = os.path.join(upload_dir, safe_filename)
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    new_meeting = Meeting(
-        owner_id=current_user.id, # <-- Dinamik User ID
-        title=title,
-        audio_file_path=file_path,
-        status=MeetingStatus.UPLOADING
-    )
-    db.add(new_meeting)
-    await db.commit()
-    await db.refresh(new_meeting)
+    file_path = os.path.join(upload_dir, safe_filename(current_user.id, file.filename))
     
-    background_tasks.add_task(process_meeting_task, new_meeting.id, file_path)
+    # Parça parça, event loop'u bloklamadan yaz; boyut sınırı ve SHA-256 yazarken hesaplanır
+    try:
+        _, content_sha256 = await save_upload_file(file, file_path)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    new_meeting = await _create_meeting_and_enqueue(db, current_user.id, title, file_path, content_sha256)
     
     return {"id": new_meeting.id, "message": "Yüklendi, analiz başlıyor..."}
 
-async def process_meeting_task(meeting_id: int, file_path: str):
-    print(f"🚀 Meeting ID {meeting_id} için analiz başladı...")
-    
-    async with AsyncSessionLocal() as db:
-        try:
-            # 1. Durumu Güncelle -> PROCESSING
-            meeting = await db.get(Meeting, meeting_id)
-            if not meeting: return
-            meeting.status = MeetingStatus.PROCESSING
-            await db.commit()
-
-            # --- FORMAT DÖNÜŞTÜRME (m4a -> wav) ---
-            if not file_path.lower().endswith(".wav"):
-                print(f"🔄 Format Dönüştürülüyor: {file_path} -> WAV")
-                try:
-                    audio = AudioSegment.from_file(file_path)
-                    wav_path = os.path.splitext(file_path)[0] + ".wav"
-                    audio.export(wav_path, format="wav")
-                    
-                    file_path = wav_path 
-                    meeting.audio_file_path = wav_path
-                    await db.commit()
-                    print("✅ Dönüştürme Başarılı!")
-                except Exception as e:
-                    print(f"⚠️ Format dönüştürme hatası: {e}")
-            # --------------------------------------
-
-            # 2. Transkripsiyon
-            result = audio_service.transcribe(file_path)
-            segments = result.get("segments", [])
-            
-            # 3. Ses Profillerini Hazırla
-            profiles_result = await db.execute(select(VoiceProfile, User).join(User))
-            known_profiles = []
-            for vp, user in profiles_result:
-                try:
-                    embedding_data = vp.embedding
-                    if isinstance(embedding_data, str):
-                        embedding_data = json.loads(embedding_data)
-                    known_profiles.append({"name": user.full_name, "embedding": embedding_data})
-                except: pass
-
-            # 4. Ses Dosyasını Oku ve Tanıma Yap
-            full_audio_data, sample_rate = sf.read(file_path)
-            if len(full_audio_data.shape) > 1:
-                full_audio_data = np.mean(full_audio_data, axis=1)
-
-            full_text_list = []
-
-            for seg in segments:
-                start_sec = seg["start"]
-                end_sec = seg["end"]
-                raw_text = seg["text"].strip()
-                speaker_name = "Misafir"
-                
-                # A) Metin Düzeltme
-                if len(raw_text) > 5:
-                    text = await llm_service.correct_transcript(raw_text)
-                else:
-                    text = raw_text
-
-                # B) Ses Tanıma
-                start_frame = int(start_sec * sample_rate)
-                end_frame = int(end_sec * sample_rate)
-                if end_frame - start_frame > sample_rate * 0.5:
-                    segment_audio = full_audio_data[start_frame:end_frame]
-                    seg_path = f"temp_seg_{meeting_id}_{int(start_sec)}.wav"
-                    sf.write(seg_path, segment_audio, sample_rate)
-                    try:
-                        vec = voice_service.extract_embedding(seg_path)
-                        name, score = voice_service.identify_speaker(vec, known_profiles)
-                        if score > 0.35: speaker_name = name
-                    except: pass
-                    finally:
-                        if os.path.exists(seg_path): os.remove(seg_path)
-
-                full_text_list.append(f"{speaker_name}: {text}")
-                
-                new_segment = TranscriptSegment(
-                    meeting_id=meeting_id,
-                    start_time=start_sec,
-                    end_time=end_sec,
-                    speaker_label=speaker_name,
-                    text=text
-                )
-                db.add(new_segment)
-            
-            await db.commit()
-
-            # --- ANALİZ AŞAMASI ---
-            full_transcript_str = "\n".join(full_text_list)
-            
-            if len(full_transcript_str) > 10:
-                # 1. ÖZET & DUYGU
-                exec_summary_json = await llm_service.generate_executive_summary(full_transcript_str)
-                meeting.executive_summary = json.dumps(exec_summary_json, ensure_ascii=False)
-                
-                sentiment_json = await llm_service.analyze_sentiment(full_transcript_str)
-                meeting.sentiment = json.dumps(sentiment_json, ensure_ascii=False)
-                await db.commit()
-
-                # 2. GÖREVLER
-                extracted_tasks = await llm_service.extract_action_items(full_transcript_str)
-                for task in extracted_tasks:
-                    new_item = ActionItem(
-                        meeting_id=meeting_id,
-                        description=task.get("description", "Tanımsız"),
-                        assignee_name=task.get("assignee", "Belirsiz"),
-                        due_date=task.get("due_date"),
-                        confidence_score=task.get("confidence", 0.0)
-                    )
-                    db.add(new_item)
-                await db.commit()
-
-                # --- 3. KURUM HAFIZASINA KAYDET (RAG) ---
-                print("🧠 Kurum Hafızasına (Vector DB) Kaydediliyor...")
-                # DB'den temiz segmentleri çek
-                saved_segments = await db.execute(select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id))
-                segments_list = [{"speaker_label": s.speaker_label, "text": s.text, "start_time": s.start_time} for s in saved_segments.scalars().all()]
-                
-                # RAG Servisine gönder
-                rag_service.add_meeting_to_memory(meeting_id, segments_list, meeting.title)
-                # ----------------------------------------
-
-            final_meeting = await db.get(Meeting, meeting_id)
-            final_meeting.status = MeetingStatus.COMPLETED
-            await db.commit()
-            print(f"✅ TÜM ANALİZLER BAŞARIYLA TAMAMLANDI: Meeting {meeting_id}")
-
-        except Exception as e:
-            print(f"❌ Arka Plan Görevi Hatası: {e}")
-            try:
-                err_meeting = await db.get(Meeting, meeting_id)
-                if err_meeting:
-                    err_meeting.status = MeetingStatus.FAILED
-                    await db.commit()
-            except:
-                pass
+# --- PARÇALI (KALDIĞI YERDEN DEVAM EDEN) YÜKLEME ---
+# 1) POST /uploads -> upload_id   2) PUT /uploads/{id}?offset=N (ham bayt)
+# 3) Bağlantı koparsa GET /uploads/{id} ile ofseti öğren, oradan devam et
+# 4) POST /uploads/{id}/complete -> toplantı oluşturulur ve analiz kuyruğa alınır
+@router.post("/uploads", status_code=201)
+async def create_resumable_upload(
+    request: ResumableUploadCreate,
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        meta = await asyncio.to_thread(
+            resumable_uploads.create, current_user.id, request.filename, request.size, request.title
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {"upload_id": meta["upload_id"], "offset": 0, "size": meta["size"], "chunk_size": settings.RESUMABLE_CHUNK_BYTES}
 
-@router.get("/{meeting_id}")
-async def get_meeting_details(
-    meeting_id: int, 
+@router.get("/uploads/{upload_id}")
+async def get_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        meta = await asyncio.to_thread(resumable_uploads.get, upload_id, current_user.id)
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+    return {"upload_id": upload_id, "offset": meta["offset"], "size": meta["size"]}
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        new_offset = await resumable_uploads.append(upload_id, current_user.id, offset, request.stream())
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+    except UploadOffsetMismatchError as e:
+        return JSONResponse(status_code=409, content={"detail": str(e), "offset": e.expected_offset})
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {"upload_id": upload_id, "offset": new_offset}
+
+@router.post("/uploads/{upload_id}/complete", status_code=201)
+async def complete_resumable_upload(
+    upload_id: str,
+    request: ResumableUploadComplete,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    query = select(Meeting).where(Meeting.id == meeting_id)
-    result = await db.execute(query)
-    meeting = result.scalars().first()
-    
+    upload_dir = "uploads"
+    os.makedirs(upload_dir, exist_ok=True)
+    try:
+        meta = await asyncio.to_thread(resumable_uploads.get, upload_id, current_user.id)
+        file_path = os.path.join(upload_dir, safe_filename(current_user.id, meta["filename"]))
+        meta, content_sha256 = await resumable_uploads.finish(upload_id, current_user.id, file_path, request.sha256)
+    except UploadNotFoundError:
+        raise HTTPException(status_code=404, detail="Yükleme oturumu bulunamadı")
+    except UploadIncompleteError as e:
+        raise HTTPException(status_code=409, detail=f"Yükleme tamamlanmadı: {e}")
+    except UploadChecksumError:
+        raise HTTPException(status_code=400, detail="SHA-256 doğrulaması başarısız, dosya bozuk yüklenmiş")
+
+    new_meeting = await _create_meeting_and_enqueue(db, current_user.id, meta["title"], file_path, content_sha256)
+
+    return {"id": new_meeting.id, "sha256": content_sha256, "message": "Yüklendi, analiz başlıyor..."}
+
+@router.get("/memory/cache-stats")
+async def memory_cache_stats(current_user: User = Depends(get_current_user)):
+    """Kurum hafızası önbelleklerinin isabet oranı ve kazandırdığı süre."""
+    return rag_service.cache_stats()
+
+@router.get("/llm/cache-stats")
+async def llm_cache_stats(current_user: User = Depends(get_current_user)):
+    """LLM yanıt önbelleğinin metod bazında isabet/ıska sayıları (bu süreç için)."""
+    return llm_service.cache_stats()
+
+def _json_or_empty(value: Optional[str]) -> dict:
+    if not value:
+        return {}
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {}
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match: "*", tek etiket ya da virgülle ayrılmış liste (W/ zayıf önekiyle de eşleşir)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def _meeting_header(db: AsyncSession, meeting_id: int, current_user: User):
+    meeting = (await db.execute(
+        select(
+            Meeting.id, Meeting.title, Meeting.status, Meeting.created_at, Meeting.owner_id, Meeting.team_id
+        ).where(Meeting.id == meeting_id)
+    )).first()
+
     if not meeting:
         raise HTTPException(status_code=404, detail="Toplantı bulunamadı")
-        
+
     # Güvenlik kontrolü: Başkasının toplantısını göremesin (Şimdilik takım yoksa)
     if meeting.owner_id != current_user.id and meeting.team_id is None:
         # İleride takım kontrolü de buraya eklenecek
-        pass 
-    
-    segments = await db.execute(select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id))
-    actions = await db.execute(select(ActionItem).where(ActionItem.meeting_id == meeting_id))
-    
-    exec_summary = {}
-    if meeting.executive_summary:
-        try: exec_summary = json.loads(meeting.executive_summary)
-        except: pass
+        pass
+    return meeting
+
 
-    sentiment = {}
-    if meeting.sentiment:
-        try: sentiment = json.loads(meeting.sentiment)
-        except: pass
+async def _transcript_window(db: AsyncSession, meeting_id: int, start: Optional[float], end: Optional[float],
+                             offset: int, limit: Optional[int]) -> dict:
+    """
+    Segmentler yazıldıkları sırayla (id); start/end verilirse yalnızca bu saniye aralığıyla
+    kesişenler, ardından offset/limit penceresi. total, zaman filtresine uyan segment sayısıdır.
+    """
+    conditions = [TranscriptSegment.meeting_id == meeting_id]
+    if start is not None:
+        conditions.append(TranscriptSegment.end_time > start)
+    if end is not None:
+        conditions.append(TranscriptSegment.start_time < end)
+
+    query = select(
+        TranscriptSegment.id, TranscriptSegment.start_time, TranscriptSegment.end_time,
+        TranscriptSegment.speaker_label, TranscriptSegment.text
+    ).where(*conditions).order_by(TranscriptSegment.id).offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    rows = (await db.execute(query)).all()
 
+    # Pencere sona ulaştıysa toplam zaten bellidir; aksi halde ayrıca sayılır
+    if (limit is not None and len(rows) == limit) or (offset and not rows):
+        total = (await db.execute(select(func.count(TranscriptSegment.id)).where(*conditions))).scalar()
+    else:
+        total = offset + len(rows)
+
+    segments = [
+        {
+            "id": row.id,
+            "meeting_id": meeting_id,
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "speaker_label": row.speaker_label,
+            "text": row.text
+        }
+        for row in rows
+    ]
     return {
-        "id": meeting.id,
-        "title": meeting.title,
-        "status": meeting.status,
-        "created_at": meeting.created_at,
-        "transcript": [s.__dict__ for s in segments.scalars().all()],
-        "action_items": [a.__dict__ for a in actions.scalars().all()],
-        "executive_summary": exec_summary,
-        "sentiment": sentiment
+        "segments": segments,
+        "start": start,
+        "end": end,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_offset": offset + len(rows) if offset + len(rows) < total else None
     }
 
-@router.get("/")
-async def list_meetings(
+
+async def _detail_response(request: Request, meeting, cache_key: tuple, build):
+    """
+    Tamamlanmış toplantı bir daha değişmez: yanıt bir kez serileştirilip önbelleğe alınır,
+    içeriğin özeti ETag olarak döner ve If-None-Match tutarsa gövdesiz 304 verilir.
+    İşlenmekte olan toplantılar her seferinde yeniden okunur (önbellek/ETag yok).
+    """
+    if meeting.status != MeetingStatus.COMPLETED:
+        return await build()
+
+    cached = meeting_detail_cache.get(cache_key)
+    if cached is None:
+        started = time.perf_counter()
+        body = json.dumps(jsonable_encoder(await build()), ensure_ascii=False).encode("utf-8")
+        cached = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        meeting_detail_cache.set(cache_key, cached, cost=time.perf_counter() - started, size=len(body))
+    body, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}  # Tarayıcı saklar ama her seferinde doğrular
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/details/cache-stats")
+async def meeting_detail_cache_stats(current_user: User = Depends(get_current_user)):
+    """Toplantı detayı yanıt önbelleğinin isabet oranı (bu süreç için)."""
+    return meeting_detail_cache.stats()
+
+@router.get("/{meeting_id}")
+async def get_meeting_details(
+    meeting_id: int, 
+    request: Request,
+    start: Optional[float] = Query(None, ge=0, description="Bu saniyeden sonra biten segmentler"),
+    end: Optional[float] = Query(None, ge=0, description="Bu saniyeden önce başlayan segmentler"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=settings.TRANSCRIPT_MAX_PAGE_SIZE),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Sadece kullanıcının kendi toplantılarını listeler.
+    Toplantı detayı: transkript, görevler, özet ve duygu analizi.
+    Parametresiz çağrıda transkriptin tamamı döner; start/end/offset/limit verilirse
+    yalnızca o pencere döner ve sayfalama bilgisi transcript_window alanındadır.
     """
-    query = select(Meeting).where(Meeting.owner_id == current_user.id)\
-        .options(selectinload(Meeting.action_items))\
-        .order_by(Meeting.id.desc())
-        
-    result = await db.execute(query)
-    return result.scalars().all()
+    meeting = await _meeting_header(db, meeting_id, current_user)
+    windowed = start is not None or end is not None or offset > 0 or limit is not None
 
-@router.post("/{meeting_id}/chat")
-async def chat_with_meeting_bot(
-    meeting_id: int, 
-    request: ChatRequest, 
+    async def build():
+        window = await _transcript_window(db, meeting_id, start, end, offset, limit)
+        actions = await db.execute(
+            select(
+                ActionItem.id, ActionItem.description, ActionItem.assignee_name, ActionItem.due_date,
+                ActionItem.status, ActionItem.confidence_score
+            ).where(ActionItem.meeting_id == meeting_id).order_by(ActionItem.id)
+        )
+        summary = (await db.execute(
+            select(Meeting.executive_summary, Meeting.sentiment).where(Meeting.id == meeting_id)
+        )).first()
+
+        details = {
+            "id": meeting.id,
+            "title": meeting.title,
+            "status": meeting.status,
+            "created_at": meeting.created_at,
+            "transcript": window.pop("segments"),
+            "action_items": [
+                {
+                    "id": row.id,
+                    "meeting_id": meeting_id,
+                    "description": row.description,
+                    "assignee_name": row.assignee_name,
+                    "due_date": row.due_date,
+                    "status": row.status,
+                    "confidence_score": row.confidence_score
+                }
+                for row in actions.all()
+            ],
+            "executive_summary": _json_or_empty(summary.executive_summary),
+            "sentiment": _json_or_empty(summary.sentiment)
+        }
+        if windowed:
+            details["transcript_window"] = window
+        return details
+
+    return await _detail_response(request, meeting, ("details", meeting_id, start, end, offset, limit), build)
+
+@router.get("/{meeting_id}/transcript")
+async def get_meeting_transcript(
+    meeting_id: int,
+    request: Request,
+    start: Optional[float] = Query(None, ge=0, description="Bu saniyeden sonra biten segmentler"),
+    end: Optional[float] = Query(None, ge=0, description="Bu saniyeden önce başlayan segmentler"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=settings.TRANSCRIPT_MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Yalnızca transkript penceresi (oynatıcı uzun kayıtlarda sayfa sayfa ilerler).
+    limit verilmezse TRANSCRIPT_MAX_PAGE_SIZE kullanılır; sonraki sayfa için ?offset=next_offset.
+    """
+    meeting = await _meeting_header(db, meeting_id, current_user)
+    limit = limit or settings.TRANSCRIPT_MAX_PAGE_SIZE
+
+    async def build():
+        return {"meeting_id": meeting_id, **await _transcript_window(db, meeting_id, start, end, offset, limit)}
+
+    return await _detail_response(request, meeting, ("transcript", meeting_id, start, end, offset, limit), build)
+
+@router.get("/")
+async def list_meetings(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.LIST_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_action_items: bool = False,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    """
+    Sadece kullanıcının kendi toplantılarını listeler (en yeni önce).
+    Yalnızca liste ekranının kullandığı sütunlar ve görev sayısı döner; görevlerin
+    kendisi include_action_items=true ile istenir. ?limit= verilirse sayfalanır; sonraki sayfanın
+    imleci X-Next-Cursor başlığında.
+    """
+    limit = _page_limit(limit, cursor)
+    action_item_count = select(func.count(ActionItem.id))\
+        .where(ActionItem.meeting_id == Meeting.id)\
+        .scalar_subquery()
+    query = select(
+        Meeting.id, Meeting.title, Meeting.status, Meeting.created_at, Meeting.duration_seconds,
+        Meeting.team_id, action_item_count.label("action_item_count")
+    ).where(Meeting.owner_id == current_user.id)\
+        .order_by(Meeting.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    after = _cursor_values(cursor, 1)
+    if after is not None:
+        query = query.where(Meeting.id < after[0])
+
+    rows = (await db.execute(query)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].id)
+    meetings = [dict(row._mapping) for row in rows]
+
+    if include_action_items and meetings:
+        items_by_meeting = {m["id"]: [] for m in meetings}
+        items = await db.execute(
+            select(
+                ActionItem.id, ActionItem.meeting_id, ActionItem.description, ActionItem.assignee_name,
+                ActionItem.due_date, ActionItem.status, ActionItem.confidence_score
+            ).where(ActionItem.meeting_id.in_(list(items_by_meeting))).order_by(ActionItem.id)
+        )
+        for item in items.all():
+            items_by_meeting[item.meeting_id].append(dict(item._mapping))
+        for meeting in meetings:
+            meeting["action_items"] = items_by_meeting[meeting["id"]]
+
+    return meetings
+
+async def _meeting_chat_context(meeting_id: int, query: str, db: AsyncSession):
+    """Toplantı sohbeti bağlamı; dökümü olmayan toplantıda None döner."""
     # Toplantıyı çek
-    query = select(Meeting).where(Meeting.id == meeting_id)
-    result = await db.execute(query)
+    query_stmt = select(Meeting).where(Meeting.id == meeting_id)
+    result = await db.execute(query_stmt)
     meeting = result.scalars().first()
     
     if not meeting:
         raise HTTPException(status_code=404, detail="Toplantı bulunamadı")
 
-    # Transkripti oluştur
-    segments_result = await db.execute(select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id))
+    # Transkripti çek (hafızaya yazıldığı sırayla)
+    segments_result = await db.execute(
+        select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id).order_by(TranscriptSegment.id)
+    )
     segments = segments_result.scalars().all()
-    
-    full_transcript = "\n".join([f"{s.speaker_label}: {s.text}" for s in segments])
-    
-    if not full_transcript:
-        return {"answer": "Bu toplantının henüz bir dökümü yok."}
 
-    answer = await llm_service.chat_with_context(full_transcript, request.query)
+    if not segments:
+        return None
+
+    # Kısa transkript tamamen, uzun transkript ise soruyla en alakalı parçalar bütçeye sığdırılarak gönderilir
+    return await build_meeting_context(meeting_id, segments, query)
+
+
+def _log_meeting_chat(meeting_id: int, context: dict, usage: dict, started: float, first_token_ms: float = None):
+    ttft = f", ilk token={first_token_ms:.0f} ms" if first_token_ms is not None else ""
+    print(
+        f"💬 Toplantı #{meeting_id} sohbet: mod={context['mode']}, "
+        f"bağlam≈{context['tokens']}/{context['transcript_tokens']} token, "
+        f"prompt={usage.get('prompt_tokens', '?')} completion={usage.get('completion_tokens', '?')} token, "
+        f"süre={(time.perf_counter() - started) * 1000:.0f} ms{ttft}"
+    )
+
+
+@router.post("/{meeting_id}/chat")
+async def chat_with_meeting_bot(
+    meeting_id: int, 
+    request: ChatRequest, 
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    started = time.perf_counter()
+    context = await _meeting_chat_context(meeting_id, request.query, db)
+    if context is None:
+        return {"answer": NO_TRANSCRIPT_ANSWER}
+
+    usage = {}
+    answer = await llm_service.chat_with_context(context["context"], request.query, usage=usage)
+    _log_meeting_chat(meeting_id, context, usage, started)
     return {"answer": answer}
 
-# --- GLOBAL CHAT (GÜNCELLENMİŞ HİBRİT VERSİYON) ---
-@router.post("/global-chat")
-async def global_chat(
+@router.post("/{meeting_id}/chat/stream")
+async def stream_chat_with_meeting_bot(
+    meeting_id: int, 
     request: ChatRequest, 
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
+    """/chat ile aynı cevap, Server-Sent Events olarak token token akıtılır."""
+    started = time.perf_counter()
+    context = await _meeting_chat_context(meeting_id, request.query, db)
+    if context is None:
+        return _sse_response(_sse_static_answer(NO_TRANSCRIPT_ANSWER))
+
+    def _on_done(usage: dict, first_token_ms: float):
+        _log_meeting_chat(meeting_id, context, usage, started, first_token_ms)
+
+    return _sse_response(_sse_answer_stream(context["context"], request.query, started, _on_done))
+
+# --- GLOBAL CHAT (GÜNCELLENMİŞ HİBRİT VERSİYON) ---
+GLOBAL_CHAT_INSTRUCTIONS = """
+        4. Verilerde 'GÖREV VE TARİH LİSTESİ' kesin tarihleri içerir. Kullanıcı tarih veya 'ne zaman'
+           sorusu sorarsa ÖNCELİKLE görev listesine bak. Toplantı notları detayı içerir.
+        5. Net ve kısa konuş.
+        
+        Bugünün Tarihi: {current_date} ({current_day})
+        """
+
+
+async def _global_chat_prompt(query: str, current_user: User, db: AsyncSession):
     """
-    Hem Vektör Arama (Metin) hem de Veritabanı Sorgusu (Görevler) yaparak en doğru cevabı üretir.
+    Hem Vektör Arama (Metin) hem de Veritabanı Sorgusu (Görevler) yaparak LLM bağlamını hazırlar.
+    Bağlam token bütçesine göre paketlenir. Dönüş: (bağlam, ek talimatlar, istatistik)
+    veya hiçbir veri bulunamazsa None.
     """
-    print(f"🧠 AI Arama Yapılıyor: {request.query}")
+    print(f"🧠 AI Arama Yapılıyor: {query}")
     
-    # 1. RAG ARAMASI (Metinlerde Ara)
-    relevant_contexts = rag_service.search_memory(request.query, limit=15)
-    context_str = "\n".join(relevant_contexts) if relevant_contexts else ""
+    # 1. HİBRİT ARAMA (Metinlerde Ara): vektör + BM25, Reciprocal Rank Fusion ile birleştirilir
+    # Arama yalnızca kullanıcının kendi ve takımlarının toplantılarıyla sınırlıdır
+    team_ids = (await db.execute(select(TeamMember.team_id).where(TeamMember.user_id == current_user.id))).scalars().all()
+    candidates = settings.RAG_HYBRID_CANDIDATES
+    vector_hits, lexical_hits = await asyncio.gather(
+        asyncio.to_thread(rag_service.search_hits, query, candidates, current_user.id, team_ids),
+        asyncio.to_thread(rag_service.lexical_hits, query, candidates, current_user.id, team_ids)
+    )
+    hits = reciprocal_rank_fusion([vector_hits, lexical_hits], limit=candidates)
 
     # 2. GÖREV LİSTESİ (Kopya Kağıdı)
     # Son 10 aktif görevi çekip bağlama ekleyelim. Böylece tarih sorularını kaçırmaz.
@@ -336,44 +594,106 @@ async def global_chat(
     tasks_result = await db.execute(tasks_query)
     tasks_list = tasks_result.all()
     
-    tasks_context = ""
-    if tasks_list:
-        tasks_context = "\n--- ÇIKARILAN GÖREVLER VE TARİHLER ---\n"
-        for task, meeting in tasks_list:
-            due = task.due_date if task.due_date else "Tarih Yok"
-            assignee = task.assignee_name if task.assignee_name else "Belirsiz"
-            tasks_context += f"- Görev: {task.description} | Tarih: {due} | Sorumlu: {assignee} (Toplantı: {meeting.title})\n"
+    task_lines = []
+    for task, meeting in tasks_list:
+        due = task.due_date if task.due_date else "Tarih Yok"
+        assignee = task.assignee_name if task.assignee_name else "Belirsiz"
+        task_lines.append(f"- Görev: {task.description} | Tarih: {due} | Sorumlu: {assignee} (Toplantı: {meeting.title})")
 
     # Hiçbir şey bulunamazsa
-    if not context_str and not tasks_context:
-        return {"answer": "Kayıtlarımda bu konuyla ilgili net bir bilgi bulamadım."}
+    if not hits and not task_lines:
+        return None
 
-    # 3. LLM'e HEPSİNİ GÖNDER
-    current_date = datetime.now().strftime("%d.%m.%Y")
-    current_day = datetime.now().strftime("%A")
-    
-    full_prompt_context = f"""
-    Sen, 'Smart' adında profesyonel bir toplantı asistanısın.
-    Aşağıda, geçmiş toplantı notları ve veritabanından çekilen görev listesi var.
-    
-    GÖREV LİSTESİ, kesin tarihleri içerir. Eğer kullanıcı tarih veya 'ne zaman' sorusu sorarsa ÖNCELİKLE görev listesine bak.
-    Metin notları ise detayı içerir.
-    
-    --- MEVCUT TARİH BİLGİSİ ---
-    Bugünün Tarihi: {current_date}
-    Gün: {current_day}
-    
-    --- GÖREV VE TARİH LİSTESİ (KESİN BİLGİ) ---
-    {tasks_context}
-    
-    --- TOPLANTI KONUŞMA NOTLARI (DETAYLAR) ---
-    {context_str}
-    ------------------------
-    
-    Soru: {request.query}
-    Cevap (Net ve kısa konuş):
+    # 3. BAĞLAMI BÜTÇEYE GÖRE PAKETLE: önce görevler (kesin bilgi), kalan bütçe alaka sırasıyla notlara
+    tasks_context, task_tokens = pack_lines(task_lines, settings.GLOBAL_CHAT_TASK_TOKENS)
+    packer = ContextPacker(settings.GLOBAL_CHAT_CONTEXT_TOKENS - task_tokens, settings.CONTEXT_DEDUP_THRESHOLD)
+    packer.add_hits(hits, rag_service.hit_timestamp, rag_service.segment_index)
+
+    sections = []
+    if tasks_context:
+        sections.append(f"--- GÖREV VE TARİH LİSTESİ (KESİN BİLGİ) ---\n{tasks_context}")
+    notes = packer.render()
+    if notes:
+        sections.append(f"--- TOPLANTI KONUŞMA NOTLARI (DETAYLAR) ---\n{notes}")
+
+    now = datetime.now()
+    instructions = GLOBAL_CHAT_INSTRUCTIONS.format(current_date=now.strftime("%d.%m.%Y"), current_day=now.strftime("%A"))
+    stats = {**packer.stats(), "task_tokens": task_tokens}
+    return "\n\n".join(sections), instructions, stats
+
+@router.post("/global-chat")
+async def global_chat(
+    request: ChatRequest, 
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
     """
+    Hem Vektör Arama (Metin) hem de Veritabanı Sorgusu (Görevler) yaparak en doğru cevabı üretir.
+    """
+    prepared = await _global_chat_prompt(request.query, current_user, db)
+    if prepared is None:
+        return {"answer": NO_MEMORY_ANSWER}
+
+    context, instructions, stats = prepared
+    print(f"📦 Global sohbet bağlamı: {stats}")
+    answer = await llm_service.chat_with_context(context, request.query, instructions=instructions)
     
-    answer = await llm_service.chat_with_context(full_prompt_context, request.query)
-    
-    return {"answer": answer}
\ No newline at end of file
+    return {"answer": answer}
+
+@router.post("/global-chat/stream")
+async def stream_global_chat(
+    request: ChatRequest, 
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """/global-chat ile aynı cevap, Server-Sent Events olarak token token akıtılır."""
+    started = time.perf_counter()
+    prepared = await _global_chat_prompt(request.query, current_user, db)
+    if prepared is None:
+        return _sse_response(_sse_static_answer(NO_MEMORY_ANSWER))
+
+    context, instructions, stats = prepared
+
+    def _on_done(usage: dict, first_token_ms: float):
+        print(
+            f"💬 Global sohbet (stream): bağlam={stats}, ilk token={first_token_ms or 0:.0f} ms, "
+            f"süre={(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+    return _sse_response(_sse_answer_stream(context, request.query, started, _on_done, instructions))
+
+# --- SSE (Server-Sent Events) YARDIMCILARI ---
+# Olaylar: "token" {"text"} (her parça), "done" {"answer"} (tam cevap), "error" {"detail", "answer"}.
+# DB oturumu yanıt akarken kapanmış olabilir; akış sırasında yalnızca LLM çağrılır.
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # Proxy tamponlamasın
+    )
+
+
+async def _sse_static_answer(answer: str):
+    yield _sse_event("token", {"text": answer})
+    yield _sse_event("done", {"answer": answer})
+
+
+async def _sse_answer_stream(context: str, query: str, started: float, on_done=None, instructions: str = None):
+    usage, parts, first_token_ms = {}, [], None
+    try:
+        async for delta in llm_service.stream_chat_with_context(context, query, usage=usage, instructions=instructions):
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            parts.append(delta)
+            yield _sse_event("token", {"text": delta})
+    except Exception as e:
+        print(f"❌ Chat Stream Hatası: {e}")
+        yield _sse_event("error", {"detail": str(e), "answer": CHAT_ERROR_MESSAGE})
+        return
+    yield _sse_event("done", {"answer": "".join(parts).strip()})
+    if on_done:
+        on_done(usage, first_token_ms)
@@ -4,9 +4,9 @@ from sqlalchemy import select
 from app.core.database import get_db
 from app.models.domain import User, VoiceProfile
 from app.services.voice_service import voice_service
-import shutil
+from app.services.voice_profile_cache import voice_profile_cache
+from app.services.upload_service import save_upload_file, UploadTooLargeError
 import os
-import json  # <--- EKLENDİ: Listeyi String'e çevirmek için şart
 
 router = APIRouter()
 
@@ -26,8 +26,10 @@ async def enroll_voice(
     os.makedirs(upload_dir, exist_ok=True)
     file_path = os.path.join(upload_dir, f"enroll_{user_id}.wav")
     
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    try:
+        await save_upload_file(file, file_path)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
     # 3. Vektör Çıkar
     try:
@@ -42,23 +44,24 @@ async def enroll_voice(
         result = await db.execute(select(VoiceProfile).where(VoiceProfile.user_id == user_id))
         voice_profile = result.scalars().first()
 
-        # DÜZELTME BURADA YAPILDI: Listeyi JSON String'e çeviriyoruz
-        vector_json = json.dumps(vector)
-
+        # Vektör float32 BLOB (veya pgvector) olarak saklanır; JSON'a çevirmeye gerek yok
         if voice_profile:
             # Güncelle
-            voice_profile.embedding = vector_json
-            voice_profile.sample_count += 1
+            voice_profile.embedding = vector
+            voice_profile.sample_count = (voice_profile.sample_count or 0) + 1
         else:
             # Yeni Oluştur
             voice_profile = VoiceProfile(
                 user_id=user_id,
-                embedding=vector_json,
+                embedding=vector,
                 sample_count=1
             )
             db.add(voice_profile)
         
         await db.commit()
+
+        # Analiz süreçlerindeki profil önbelleği sürüm damgasından değişikliği anlar; bu süreçtekini yerinde güncelle
+        await voice_profile_cache.upsert(db, user_id, user.full_name, vector, voice_profile.updated_at)
         
         # Geçici dosyayı temizle
         if os.path.exists(file_path):
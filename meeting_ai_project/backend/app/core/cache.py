@@ -0,0 +1,227 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TagGenerations:
+    """
+    Etiket başına sürüm sayacı (SQLite). Süreçler arası önbellek geçersizleştirme
+    için kullanılır: bir süreç etiketi "bump" eder, diğer süreçlerdeki o etiketli
+    kayıtlar bir sonraki okumada bayat sayılır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute("CREATE TABLE IF NOT EXISTS tag_generations (tag TEXT PRIMARY KEY, gen INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def current(self, tags: tuple) -> tuple:
+        if not tags:
+            return ()
+        rows = dict(self._connect().execute(
+            f"SELECT tag, gen FROM tag_generations WHERE tag IN ({','.join('?' * len(tags))})", tags
+        ).fetchall())
+        return tuple(rows.get(tag, 0) for tag in tags)
+
+    def bump(self, tags):
+        conn = self._connect()
+        for tag in tags:
+            conn.execute(
+                "INSERT INTO tag_generations (tag, gen) VALUES (?, 1) ON CONFLICT(tag) DO UPDATE SET gen = gen + 1",
+                (tag,)
+            )
+
+
+class TTLCache:
+    """
+    Süreç içi LRU + TTL önbellek (thread-safe).
+    - Kayıtlar etiketlenebilir; invalidate_tags ile toplu geçersiz kılınır.
+    - generations verilirse etiketler süreçler arası da geçerlilik kontrolünden geçer.
+    - Hesaplama süresi (cost) kaydedilir; isabetlerde kazanılan süre istatistiğe eklenir.
+    - max_bytes verilirse set(..., size=) ile bildirilen boyutların toplamı da sınırlanır
+      (büyük değerler, ör. serileştirilmiş yanıtlar, için); sınırı tek başına aşan değer saklanmaz.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float, generations: TagGenerations = None,
+                 max_bytes: int = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generations = generations
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (value, expires_at, tags, gens, cost, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] < now:
+                self._discard(key)
+                entry = _MISSING
+        if entry is not _MISSING and entry[2] and self.generations is not None:
+            if self.generations.current(entry[2]) != entry[3]:
+                with self._lock:
+                    self._discard(key)
+                entry = _MISSING
+
+        with self._lock:
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            self.seconds_saved += entry[4]
+            return entry[0]
+
+    def _discard(self, key):
+        """Kilit altında çağrılır."""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[5]
+
+    def _current_gens(self, tags: tuple) -> tuple:
+        return self.generations.current(tags) if tags and self.generations is not None else ()
+
+    def set(self, key, value, tags: tuple = (), cost: float = 0.0, gens: tuple = None, size: int = 0):
+        """
+        gens: değer hesaplanmaya başlamadan okunan sürümler (get_or_compute verir); yoksa şimdiki.
+        size: değerin bayt cinsinden boyutu (max_bytes sınırı için).
+        """
+        tags = tuple(tags)
+        if gens is None:
+            gens = self._current_gens(tags)
+        with self._lock:
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl_seconds, tags, gens, cost, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes):
+                self._discard(next(iter(self._data)))
+
+    def get_or_compute(self, key, compute, tags: tuple = ()):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        # Sürümler hesaplamadan önce okunur: hesaplama sürerken gelen geçersizleştirme
+        # kaydı bir sonraki okumada bayat yapar (yeni sürümle kaydedilip kaçmaz)
+        gens = self._current_gens(tuple(tags))
+        started = time.perf_counter()
+        value = compute()
+        self.set(key, value, tags=tags, cost=time.perf_counter() - started, gens=gens)
+        return value
+
+    def invalidate_tags(self, *tags):
+        tags = set(tags)
+        with self._lock:
+            for key in [k for k, entry in self._data.items() if tags.intersection(entry[2])]:
+                self._discard(key)
+        if self.generations is not None:
+            self.generations.bump(sorted(tags))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "seconds_saved": round(self.seconds_saved, 3)
+            }
+
+
+class DiskCache:
+    """
+    Süreçler arası paylaşılan, kalıcı anahtar-değer önbelleği (SQLite).
+    - TTL: süresi dolan kayıt okunmaz, temizlikte silinir.
+    - Boyut: max_entries aşılınca en uzun süredir okunmayan kayıtlar atılır.
+    Değerler metin olarak saklanır (JSON vb. serileştirme çağırana aittir).
+    """
+
+    _PRUNE_EVERY = 100  # Her N yazmada bir temizlik
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at ON cache_entries (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        if row is None:
+            return default
+        conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at, "
+            "accessed_at = excluded.accessed_at",
+            (key, value, now + self.ttl_seconds, now)
+        )
+        self._writes += 1
+        if self._writes % self._PRUNE_EVERY == 0:
+            self.prune()
+
+    def prune(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache_entries")
+
+    def __len__(self):
+        return self._connect().execute("SELECT count(*) FROM cache_entries").fetchone()[0]
@@ -7,6 +7,137 @@ class Settings:
     # Yüklenen dosyaların saklanacağı klasör
     UPLOAD_DIR: str = os.path.join(os.getcwd(), "uploads")
 
+    # Konuşmacı tanıma: tek encode_batch çağrısında işlenecek en fazla segment sayısı
+    VOICE_EMBED_BATCH_SIZE: int = int(os.getenv("VOICE_EMBED_BATCH_SIZE", "16"))
+    # Bir batch'in (dolgu dahil) en fazla kaç saniyelik ses taşıyabileceği (bellek sınırı)
+    VOICE_EMBED_MAX_BATCH_SECONDS: float = float(os.getenv("VOICE_EMBED_MAX_BATCH_SECONDS", "240"))
+    # Segment bir profile bu benzerlikten (kosinüs) yüksekse o kişiye atanır, değilse "Misafir"
+    SPEAKER_MATCH_THRESHOLD: float = float(os.getenv("SPEAKER_MATCH_THRESHOLD", "0.35"))
+
+    # LLM: aynı anda Groq'a gönderilebilecek en fazla istek sayısı (transkript düzeltme vb.)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    # LLM sağlayıcısı: "groq" veya ağa çıkmayan "stub" (testler); stub gecikmeleri (sn) ve hata oranı (0-1)
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "groq")
+    LLM_STUB_FIRST_TOKEN_DELAY: float = float(os.getenv("LLM_STUB_FIRST_TOKEN_DELAY", "0"))
+    LLM_STUB_TOKEN_DELAY: float = float(os.getenv("LLM_STUB_TOKEN_DELAY", "0"))
+    LLM_STUB_FAILURE_RATE: float = float(os.getenv("LLM_STUB_FAILURE_RATE", "0"))
+    # ASR sağlayıcısı: "groq" (Whisper) veya sahte "stub"; stub gecikmesi = sabit + ses süresi * realtime factor
+    ASR_BACKEND: str = os.getenv("ASR_BACKEND", "groq")
+    ASR_STUB_LATENCY: float = float(os.getenv("ASR_STUB_LATENCY", "0"))
+    ASR_STUB_REALTIME_FACTOR: float = float(os.getenv("ASR_STUB_REALTIME_FACTOR", "0"))
+    ASR_STUB_FAILURE_RATE: float = float(os.getenv("ASR_STUB_FAILURE_RATE", "0"))
+    # Stub backend'lerin hata seçimi ve sahte içerik üretimi için tohum (aynı seed = aynı koşu)
+    STUB_SEED: int = int(os.getenv("STUB_SEED", "0"))
+    # Kalıcı LLM yanıt önbelleği (model + sıcaklık + mesajların özeti ile anahtarlanır); LLM_CACHE_ENABLED=0 atlar
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", os.path.join(os.getcwd(), "llm_cache.db"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))  # 30 gün
+    # Özet/duygu analizi: bu uzunluğu aşan transkript parçalara bölünüp map-reduce ile işlenir
+    LLM_SUMMARY_CHUNK_CHARS: int = int(os.getenv("LLM_SUMMARY_CHUNK_CHARS", "12000"))
+
+    # İş Kuyruğu & Worker'lar (python -m app.worker)
+    JOB_QUEUE_BACKEND: str = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+    JOB_QUEUE_PATH: str = os.getenv("JOB_QUEUE_PATH", os.path.join(os.getcwd(), "job_queue.db"))
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))  # Worker süreç sayısı
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "120"))  # Heartbeat gelmezse iş başka worker'a geçer
+    JOB_RETRY_BASE_SECONDS: float = float(os.getenv("JOB_RETRY_BASE_SECONDS", "10"))  # Üstel geri çekilme tabanı
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+
+    # Yükleme: en büyük dosya boyutu ve diske yazma parça boyutu
+    UPLOAD_MAX_BYTES: int = int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))  # 2 GB
+    UPLOAD_CHUNK_BYTES: int = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))  # 1 MB
+    # Parçalı (kaldığı yerden devam eden) yüklemede istemciye önerilen parça boyutu
+    RESUMABLE_CHUNK_BYTES: int = int(os.getenv("RESUMABLE_CHUNK_BYTES", str(4 * 1024 * 1024)))  # 4 MB
+    # Tamamlanmayan parçalı yükleme oturumu bu süreden sonra silinir (oluşturulma anından itibaren)
+    RESUMABLE_UPLOAD_TTL: float = float(os.getenv("RESUMABLE_UPLOAD_TTL", str(24 * 3600)))  # 1 gün
+
+    # RAG: embedding modeline tek ileri geçişte verilecek segment sayısı / Chroma'ya tek seferde yazılacak kayıt
+    RAG_EMBED_BATCH_SIZE: int = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+    RAG_UPSERT_BATCH_SIZE: int = int(os.getenv("RAG_UPSERT_BATCH_SIZE", "1000"))
+
+    # RAG önbellekleri: soru -> vektör (LRU/TTL) ve (kiracı, soru) -> arama sonucu
+    RAG_QUERY_CACHE_SIZE: int = int(os.getenv("RAG_QUERY_CACHE_SIZE", "2048"))
+    RAG_QUERY_CACHE_TTL: float = float(os.getenv("RAG_QUERY_CACHE_TTL", "86400"))
+    RAG_RESULT_CACHE_SIZE: int = int(os.getenv("RAG_RESULT_CACHE_SIZE", "1024"))
+    RAG_RESULT_CACHE_TTL: float = float(os.getenv("RAG_RESULT_CACHE_TTL", "600"))
+    # Süreçler arası önbellek geçersizleştirme sayaçları (worker hafızaya yazınca API önbelleği düşer)
+    CACHE_STATE_PATH: str = os.getenv("CACHE_STATE_PATH", os.path.join(os.getcwd(), "cache_state.db"))
+
+    # Hibrit arama: BM25 (SQLite FTS5) indeksi ve Reciprocal Rank Fusion ayarları
+    LEXICAL_INDEX_PATH: str = os.getenv("LEXICAL_INDEX_PATH", os.path.join(os.getcwd(), "lexical_index.db"))
+    RAG_RRF_K: int = int(os.getenv("RAG_RRF_K", "60"))
+    RAG_HYBRID_CANDIDATES: int = int(os.getenv("RAG_HYBRID_CANDIDATES", "30"))  # Her yöntemden alınacak aday sayısı
+
+    # Toplantı sohbeti: transkript bu token sayısına sığıyorsa tamamı gönderilir,
+    # aksi halde en alakalı segmentler MEETING_CHAT_CONTEXT_TOKENS bütçesine paketlenir
+    MEETING_CHAT_FULL_TRANSCRIPT_TOKENS: int = int(os.getenv("MEETING_CHAT_FULL_TRANSCRIPT_TOKENS", "6000"))
+    MEETING_CHAT_CONTEXT_TOKENS: int = int(os.getenv("MEETING_CHAT_CONTEXT_TOKENS", "3000"))
+    MEETING_CHAT_CANDIDATES: int = int(os.getenv("MEETING_CHAT_CANDIDATES", "20"))
+    MEETING_CHAT_NEIGHBOR_SEGMENTS: int = int(os.getenv("MEETING_CHAT_NEIGHBOR_SEGMENTS", "1"))  # Her isabetin iki yanından eklenecek segment
+
+    # Global sohbet bağlamı: toplam token bütçesi (görevler dahil), görevlere ayrılan üst sınır
+    # ve neredeyse aynı notların elenmesi için kelime benzerliği eşiği (Jaccard)
+    GLOBAL_CHAT_CONTEXT_TOKENS: int = int(os.getenv("GLOBAL_CHAT_CONTEXT_TOKENS", "2500"))
+    GLOBAL_CHAT_TASK_TOKENS: int = int(os.getenv("GLOBAL_CHAT_TASK_TOKENS", "500"))
+    CONTEXT_DEDUP_THRESHOLD: float = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.85"))
+
+    # Sağlayıcı (Groq) çağrıları: süreçler arası paylaşılan hız limiti (dakikada istek, anlık patlama),
+    # jitter'lı üstel retry ve devre kesici. Sayaçlar /metrics ile okunur.
+    RATE_LIMIT_PATH: str = os.getenv("RATE_LIMIT_PATH", os.path.join(os.getcwd(), "rate_limits.db"))
+    LLM_REQUESTS_PER_MINUTE: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))  # 0 = sınırsız (429'ları retry karşılar)
+    LLM_BURST: float = float(os.getenv("LLM_BURST", "10"))
+    ASR_REQUESTS_PER_MINUTE: float = float(os.getenv("ASR_REQUESTS_PER_MINUTE", "0"))  # Groq hesap limitine göre ayarlanır
+    ASR_BURST: float = float(os.getenv("ASR_BURST", "5"))
+    PROVIDER_MAX_RETRIES: int = int(os.getenv("PROVIDER_MAX_RETRIES", "4"))
+    PROVIDER_RETRY_BASE_SECONDS: float = float(os.getenv("PROVIDER_RETRY_BASE_SECONDS", "1"))
+    PROVIDER_RETRY_MAX_SECONDS: float = float(os.getenv("PROVIDER_RETRY_MAX_SECONDS", "30"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    METRICS_PATH: str = os.getenv("METRICS_PATH", os.path.join(os.getcwd(), "metrics.db"))
+    # Sayaçlar bellekte biriktirilip bu aralıkla (arka plan thread'i) toplu yazılır
+    METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "2"))
+
+    # Veritabanı bağlantısı. DB_ECHO=1 tüm SQL'i yazar (yalnızca hata ayıklama için);
+    # bunun yerine DB_SLOW_QUERY_MS'i aşan sorgular DB_SLOW_QUERY_SAMPLE_RATE oranında yazılır (0 = kapalı)
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./meeting_ai.db")
+    DB_ECHO: bool = os.getenv("DB_ECHO", "0") in ("1", "true", "True")
+    DB_SLOW_QUERY_MS: float = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+    DB_SLOW_QUERY_SAMPLE_RATE: float = float(os.getenv("DB_SLOW_QUERY_SAMPLE_RATE", "1.0"))
+    # Derlenmiş SQL önbelleği (SQLAlchemy) ve sürücünün hazırlanmış ifade önbelleği (sqlite3 / asyncpg)
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", "1000"))
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+    # Toplu yazma (transkript segmentleri, görevler): tek commit'te yazılacak en fazla satır
+    DB_BULK_INSERT_BATCH_SIZE: int = int(os.getenv("DB_BULK_INSERT_BATCH_SIZE", "1000"))
+    # Postgres bağlantı havuzu (SQLite'ta kullanılmaz)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # sn; ara katmanların kapattığı bağlantılar yenilensin
+    # SQLite bağlantı PRAGMA'ları: WAL ile API okumaları worker yazmalarını beklemez
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))  # Bağlantı başına sayfa önbelleği
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+
+    # Liste endpoint'leri (toplantılar, görevler): imleçli (keyset) sayfalama boyutları
+    # (?limit= veya ?cursor= verilmezse liste sınırsız döner: sayfalamayı bilmeyen istemciler için)
+    LIST_PAGE_SIZE: int = int(os.getenv("LIST_PAGE_SIZE", "50"))
+    LIST_MAX_PAGE_SIZE: int = int(os.getenv("LIST_MAX_PAGE_SIZE", "200"))
+
+    # Toplantı detayı: transkript penceresi üst sınırı (?limit=) ve tamamlanmış toplantıların
+    # serileştirilmiş yanıt önbelleği (ETag / If-None-Match ile 304)
+    TRANSCRIPT_MAX_PAGE_SIZE: int = int(os.getenv("TRANSCRIPT_MAX_PAGE_SIZE", "1000"))
+    MEETING_DETAIL_CACHE_SIZE: int = int(os.getenv("MEETING_DETAIL_CACHE_SIZE", "256"))
+    MEETING_DETAIL_CACHE_TTL: float = float(os.getenv("MEETING_DETAIL_CACHE_TTL", "3600"))
+    # Süreç (uvicorn worker'ı) başına toplam gövde boyutu sınırı
+    MEETING_DETAIL_CACHE_MAX_BYTES: int = int(os.getenv("MEETING_DETAIL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # 32 MB
+
+    # Açılışta önceden yüklenecek servisler ("audio,llm,voice,rag" veya "all"; boş = tembel yükleme)
+    WARMUP_SERVICES: str = os.getenv("WARMUP_SERVICES", "")
+    WORKER_WARMUP_SERVICES: str = os.getenv("WORKER_WARMUP_SERVICES", "all")
+
 settings = Settings()
 
 # Klasör yoksa oluştur
@@ -1,10 +1,79 @@
+import os
+import random
+import time
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from app.core.config import settings
 
-# Veritabanı URL'si (Seninkine göre ayarlı)
-DATABASE_URL = "sqlite+aiosqlite:///./meeting_ai.db"
+# Veritabanı URL'si (DATABASE_URL ile değiştirilebilir, örn. postgresql+asyncpg://...)
+DATABASE_URL = settings.DATABASE_URL
+
+
+def _engine_options(url) -> dict:
+    """
+    Sürücüye göre bağlantı ayarları.
+    - SQLite: busy timeout ve sqlite3'ün hazırlanmış ifade önbelleği (PRAGMA'lar bağlanırken).
+    - Postgres: açık havuz boyutları, bayat bağlantı kontrolü ve asyncpg ifade önbelleği.
+    """
+    options = {"echo": settings.DB_ECHO, "query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "cached_statements": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+        return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    return options
+
+
+def _database_url():
+    url = make_url(DATABASE_URL)
+    if url.get_driver_name() == "asyncpg" and "prepared_statement_cache_size" not in url.query:
+        url = url.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+    return url
+
+
+_url = _database_url()
+engine = create_async_engine(_url, **_engine_options(_url))
+
+
+if _url.get_backend_name() == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Her yeni bağlantıda: WAL (okuyucular yazarı beklemez), synchronous, sayfa önbelleği
+        ve busy_timeout (kilitte hemen "database is locked" yerine bekle).
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")  # Negatif: KB cinsinden
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+
+if settings.DB_SLOW_QUERY_MS > 0:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany):
+        """Eşiği aşan sorguları (örneklenerek) yazar; parametreler kişisel veri içerebileceği için yazılmaz."""
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        if elapsed_ms >= settings.DB_SLOW_QUERY_MS and random.random() < settings.DB_SLOW_QUERY_SAMPLE_RATE:
+            statement = " ".join(statement.split())
+            print(f"🐢 Yavaş sorgu ({elapsed_ms:.0f} ms{', toplu' if executemany else ''}): {statement[:500]}")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
 
 # BU SATIR ÇOK ÖNEMLİ:
 AsyncSessionLocal = async_sessionmaker(
@@ -16,7 +85,32 @@ AsyncSessionLocal = async_sessionmaker(
 
 Base = declarative_base()
 
+# Migrasyonlar (Alembic): backend/alembic.ini + backend/migrations
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASELINE_REVISION = "0001_baseline"
+
+
+def _upgrade(connection):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.attributes["connection"] = connection
+    tables = inspect(connection).get_table_names()
+    if "meetings" in tables and "alembic_version" not in tables:
+        # Migrasyon sisteminden önce create_all ile kurulmuş veritabanı: başlangıç şeması olarak işaretle
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+async def run_migrations():
+    """Şemayı en son migrasyona getirir (API açılışında ve benchmark'larda çağrılır)."""
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade)
+
+
 # Dependency (Bunu zaten kullanıyorduk)
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.core.config import settings
+
+
+class Job:
+    """Kuyruktan alınmış tek bir iş."""
+    def __init__(self, id: int, kind: str, payload: dict, attempts: int, max_attempts: int):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+
+class JobQueueBackend:
+    """
+    Kalıcı iş kuyruğu arayüzü. Farklı bir depo (Redis, Postgres vb.)
+    eklemek için bu sınıftan türetip JOB_QUEUE_BACKENDS'e kaydetmek yeterli.
+    """
+
+    def enqueue(self, kind: str, payload: dict, max_attempts: int = None) -> int:
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, lease_seconds: float):
+        """Sıradaki işi kiralar (lease). İş yoksa None döner."""
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """Kirayı uzatır. İş artık bu worker'da değilse False döner."""
+        raise NotImplementedError
+
+    def complete(self, job_id: int, worker_id: str):
+        raise NotImplementedError
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry_delay: float) -> bool:
+        """İşi hatalı işaretler. Yeniden denenecekse True; kalıcı olarak öldüyse ya da iş artık bu worker'da değilse False döner."""
+        raise NotImplementedError
+
+    def pop_dead(self) -> list:
+        """Kirası dolup deneme hakkı biten (ör. worker çöktü) ve henüz bildirilmemiş işleri döner."""
+        raise NotImplementedError
+
+
+class SQLiteJobQueue(JobQueueBackend):
+    """
+    SQLite tabanlı yerel iş kuyruğu. Birden fazla süreç aynı dosyayı paylaşabilir;
+    iş alma işlemi `BEGIN IMMEDIATE` ile atomiktir. Kirası dolan işler
+    (çöken worker) başka bir worker tarafından yeniden alınır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_until REAL,
+                    worker_id TEXT,
+                    last_error TEXT,
+                    notified INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status_available ON jobs (status, available_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._connect()
+        return _ImmediateTransaction(conn)
+
+    def enqueue(self, kind: str, payload: dict, max_attempts: int = None) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, max_attempts, available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), max_attempts or settings.JOB_MAX_ATTEMPTS, now, now, now)
+            )
+            return cursor.lastrowid
+
+    def claim(self, worker_id: str, lease_seconds: float):
+        now = time.time()
+        with self._transaction() as conn:
+            # Kirası dolmuş ve hakkı bitmiş işleri öldür (sonsuz çökme döngüsü olmasın)
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND available_at <= ?) "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY id LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker_id = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                (worker_id, now + lease_seconds, now, row["id"])
+            )
+            return Job(row["id"], row["kind"], json.loads(row["payload"]), row["attempts"] + 1, row["max_attempts"])
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now + lease_seconds, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', lease_until = NULL, updated_at = ? WHERE id = ? AND worker_id = ?",
+                (now, job_id, worker_id)
+            )
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry_delay: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            # Kira başka worker'a geçtiyse bu worker o denemeyi hatalı/ölü işaretleyemez
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] < row["max_attempts"]:
+                conn.execute(
+                    "UPDATE jobs SET status = 'queued', available_at = ?, lease_until = NULL, last_error = ?, updated_at = ? "
+                    "WHERE id = ? AND worker_id = ?",
+                    (now + retry_delay, error, now, job_id, worker_id)
+                )
+                return True
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', notified = 1, lease_until = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ?",
+                (error, now, job_id, worker_id)
+            )
+            return False
+
+    def pop_dead(self) -> list:
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT * FROM jobs WHERE status = 'dead' AND notified = 0").fetchall()
+            if rows:
+                conn.execute(
+                    f"UPDATE jobs SET notified = 1 WHERE id IN ({','.join('?' * len(rows))})",
+                    [row["id"] for row in rows]
+                )
+            return [Job(row["id"], row["kind"], json.loads(row["payload"]), row["attempts"], row["max_attempts"]) for row in rows]
+
+
+class _ImmediateTransaction:
+    """Yazma kilidini baştan alan (BEGIN IMMEDIATE) basit transaction bağlamı."""
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+JOB_QUEUE_BACKENDS = {
+    "sqlite": lambda: SQLiteJobQueue(settings.JOB_QUEUE_PATH),
+}
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueueBackend:
+    """Süreç başına tek kuyruk örneği (JOB_QUEUE_BACKEND ayarına göre)."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JOB_QUEUE_BACKENDS[settings.JOB_QUEUE_BACKEND]()
+    return _job_queue
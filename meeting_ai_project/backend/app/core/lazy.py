@@ -0,0 +1,79 @@
+import importlib
+import threading
+import time
+
+_registry = {}
+
+# warmup için servis adı -> tanımlandığı modül (modül henüz import edilmemiş olabilir)
+SERVICE_MODULES = {
+    "audio": "app.services.audio_service",
+    "llm": "app.services.llm_service",
+    "voice": "app.services.voice_service",
+    "rag": "app.services.rag_service",
+}
+
+
+class LazyService:
+    """
+    Servis singleton'ları için tembel (lazy), thread-safe vekil.
+    Modül import edildiğinde model yüklenmez; servis ilk kullanıldığında
+    (veya warmup ile) bir kez oluşturulur. Böylece yalnızca auth/listeleme
+    yapan süreçler torch, SentenceTransformer veya Chroma yüklemeden açılır.
+    """
+
+    def __init__(self, name: str, factory):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+        _registry[name] = self
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def get(self):
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    started = time.perf_counter()
+                    instance = self._factory()
+                    object.__setattr__(self, "_instance", instance)
+                    print(f"⚙️ Servis '{self._name}' yüklendi ({time.perf_counter() - started:.2f} sn)")
+        return instance
+
+    def __getattr__(self, item):
+        return getattr(self.get(), item)
+
+    def __setattr__(self, key, value):
+        setattr(self.get(), key, value)
+
+
+def warmup_services(names) -> dict:
+    """
+    Verilen servisleri önceden yükler ("all" hepsi demektir). Süreleri döner.
+    Örn: WARMUP_SERVICES="voice,rag" ile worker ilk işte model yükleme beklemez.
+    """
+    if isinstance(names, str):
+        names = [n.strip() for n in names.split(",") if n.strip()]
+    if "all" in names:
+        names = list(SERVICE_MODULES)
+
+    timings = {}
+    for name in names:
+        if name in SERVICE_MODULES:
+            importlib.import_module(SERVICE_MODULES[name])
+        service = _registry.get(name)
+        if service is None:
+            print(f"⚠️ Bilinmeyen servis (warmup): {name}")
+            continue
+        started = time.perf_counter()
+        service.get()
+        timings[name] = round(time.perf_counter() - started, 3)
+    return timings
+
+
+def loaded_services() -> dict:
+    return {name: service.is_loaded for name, service in _registry.items()}
@@ -0,0 +1,104 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.core.config import settings
+
+
+class Metrics:
+    """
+    Süreçler arası paylaşılan sayaçlar (SQLite). API ve worker süreçleri aynı dosyaya
+    yazar; /metrics uç noktası hepsinin toplamını Prometheus metin formatında verir.
+    Yalnızca seyrek olaylar (hata, retry, fallback, devre kesici) için tasarlanmıştır.
+    increment diske dokunmaz (async koddan çağrılır, event loop'u bloklamamalı): artışlar
+    bellekte birikir, arka plan thread'i flush_seconds aralıkla tek işlemde yazar.
+    """
+
+    def __init__(self, path: str, flush_seconds: float = None):
+        self.path = path
+        self.flush_seconds = settings.METRICS_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._local = threading.local()
+        self._pending = {}  # (name, labels_json) -> birikmiş artış
+        self._pending_lock = threading.Lock()
+        self._flusher = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT NOT NULL, labels TEXT NOT NULL, value REAL NOT NULL, "
+            "PRIMARY KEY (name, labels))"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def increment(self, name: str, labels: dict = None, value: float = 1.0):
+        key = (name, json.dumps(labels or {}, sort_keys=True, ensure_ascii=False))
+        with self._pending_lock:
+            self._pending[key] = self._pending.get(key, 0.0) + value
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT INTO counters (name, labels, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name, labels) DO UPDATE SET value = value + excluded.value",
+                    [(name, labels, value) for (name, labels), value in pending.items()]
+                )
+        except sqlite3.Error as e:
+            # Metrik yazılamaması asıl işi durdurmamalı; artışlar bir sonraki denemeye kalır
+            print(f"⚠️ Metrikler yazılamadı: {e}")
+            with self._pending_lock:
+                for key, value in pending.items():
+                    self._pending[key] = self._pending.get(key, 0.0) + value
+
+    def snapshot(self) -> list:
+        self.flush()
+        rows = self._connect().execute("SELECT name, labels, value FROM counters ORDER BY name, labels").fetchall()
+        return [{"name": name, "labels": json.loads(labels), "value": value} for name, labels, value in rows]
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for row in self.snapshot():
+            labels = ",".join(f'{key}="{str(val)}"' for key, val in row["labels"].items())
+            lines.append(f"{row['name']}{{{labels}}} {row['value']:g}" if labels else f"{row['name']} {row['value']:g}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics(settings.METRICS_PATH)
+                atexit.register(_metrics.flush)  # Çıkışta birikmiş artışlar kaybolmasın
+    return _metrics
+
+
+def record_fallback(service: str, method: str, error: Exception):
+    """Bir servis hatayı yutup yedek değer döndürdüğünde çağrılır; sessiz bozulma görünür olur."""
+    get_metrics().increment("ai_fallbacks_total", {"service": service, "method": method, "error": type(error).__name__})
@@ -0,0 +1,23 @@
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(*values) -> str:
+    """Sıralama anahtarının son değerlerini istemciye opak bir imleç olarak verir."""
+    raw = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """encode_cursor'ın tersi; bozuk veya beklenen uzunlukta olmayan imleçte InvalidCursorError."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Geçersiz sayfa imleci") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Geçersiz sayfa imleci")
+    return values
@@ -0,0 +1,269 @@
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from app.core.config import settings
+from app.core.metrics import get_metrics
+
+
+class ProviderUnavailableError(Exception):
+    """Sağlayıcı geçici olarak kullanılamıyor (retry'lar tükendi veya devre açık). İş daha sonra tekrar denenmeli."""
+
+
+class CircuitOpenError(ProviderUnavailableError):
+    pass
+
+
+class SimulatedProviderError(Exception):
+    """Sahte (stub) backend'lerin ürettiği geçici hata; 503 olarak retry/devre kesici yolundan geçer."""
+    status_code = 503
+
+
+class FaultInjector:
+    """
+    Sahte backend'ler için gecikme ve hata üretici. Hatalar tohumlanmış (seed)
+    RNG ile seçilir: aynı çağrı sırası her koşuda aynı hataları üretir.
+    """
+
+    def __init__(self, failure_rate: float = 0.0, seed: int = 0):
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def maybe_fail(self, what: str):
+        if self.failure_rate <= 0:
+            return
+        with self._lock:
+            failed = self._rng.random() < self.failure_rate
+        if failed:
+            raise SimulatedProviderError(f"Simüle edilmiş sağlayıcı hatası ({what})")
+
+
+class SQLiteTokenBucket:
+    """
+    Süreçler arası paylaşılan token bucket (SQLite). Tüm API/worker süreçleri aynı
+    kovadan çeker; böylece toplam istek hızı sağlayıcının limitinde kalır.
+    rate_per_second <= 0 ise sınırlama yapılmaz.
+    """
+
+    def __init__(self, path: str, name: str, rate_per_second: float, capacity: float):
+        self.path = path
+        self.name = name
+        self.rate = rate_per_second
+        self.capacity = max(1.0, capacity)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Token alınabildiyse 0, alınamadıysa beklenmesi gereken süreyi (sn) döner."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)).fetchone()
+            available = self.capacity if row is None else min(self.capacity, row[0] + (now - row[1]) * self.rate)
+            wait = 0.0 if available >= tokens else (tokens - available) / self.rate
+            if wait == 0.0:
+                available -= tokens
+            conn.execute(
+                "INSERT INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (self.name, available, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def acquire(self, tokens: float = 1.0):
+        """Token alınana kadar bekler (thread/senkron kod için)."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Token alınana kadar event loop'u bloklamadan bekler."""
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Ardışık failure_threshold geçici hatadan sonra devre reset_timeout saniye açılır;
+    bu sürede çağrılar sağlayıcıya gitmeden CircuitOpenError ile reddedilir.
+    Süre dolunca tek bir deneme çağrısına izin verilir (half-open). Deneme sonuçlanmadan
+    bitse bile (iptal, kalıcı hata) release_probe ile bırakılmalıdır; yoksa devre hiç kapanmaz.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self) -> bool:
+        """Çağrı reddedilirse CircuitOpenError; half-open deneme çağrısıysa True döner."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+        get_metrics().increment("ai_circuit_rejections_total", {"service": self.name})
+        raise CircuitOpenError(f"{self.name} devresi açık; {self.reset_timeout:.0f} sn içinde tekrar denenecek")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def release_probe(self):
+        """Deneme çağrısı başarı/hata kaydı olmadan bitti: devre half-open kalır, sonraki çağrı yeniden dener."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            reopen = self._probing or self.failures >= self.failure_threshold
+            self._probing = False
+            if reopen:
+                if self.opened_at is None or self.state != "open":
+                    print(f"🔌 {self.name} devre kesici açıldı ({self.failures} ardışık hata)")
+                    get_metrics().increment("ai_circuit_opened_total", {"service": self.name})
+                self.opened_at = time.monotonic()
+
+
+def is_transient(error: Exception) -> bool:
+    """429, 5xx, zaman aşımı ve bağlantı hataları tekrar denenebilir; 4xx (istek hatası) denenmez."""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or any(
+        key in name for key in ("Timeout", "Connection", "RateLimit", "InternalServer", "ServiceUnavailable")
+    )
+
+
+def _retry_after(error: Exception):
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Tam jitter'lı üstel bekleme: [0, min(max, base * 2^attempt)]. Eşzamanlı retry dalgalarını dağıtır."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class ResilientCaller:
+    """
+    Sağlayıcı çağrılarının ortak katmanı: paylaşılan hız limiti + jitter'lı retry + devre kesici.
+    Geçici hatalar max_retries kez tekrar denenir; tükenirse ProviderUnavailableError
+    fırlatılır (çağıran işi daha sonra tekrar kuyruğa bırakabilir). Kalıcı hatalar
+    olduğu gibi iletilir.
+    """
+
+    def __init__(self, name: str, bucket: SQLiteTokenBucket, breaker: CircuitBreaker,
+                 max_retries: int = None, base_delay: float = None, max_delay: float = None):
+        self.name = name
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_retries = settings.PROVIDER_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = settings.PROVIDER_RETRY_BASE_SECONDS if base_delay is None else base_delay
+        self.max_delay = settings.PROVIDER_RETRY_MAX_SECONDS if max_delay is None else max_delay
+
+    def _on_error(self, error: Exception, attempt: int, method: str):
+        """Hata sonrası bekleme süresini döner; denenmeyecekse istisna fırlatır."""
+        metrics = get_metrics()
+        if not is_transient(error):
+            # 4xx: sağlayıcı ayakta ve yanıt veriyor; devre açısından başarılı çağrı sayılır
+            self.breaker.record_success()
+            metrics.increment("ai_errors_total", {"service": self.name, "method": method, "kind": "permanent"})
+            raise error
+        self.breaker.record_failure()
+        metrics.increment("ai_errors_total", {"service": self.name, "method": method, "kind": "transient"})
+        if attempt >= self.max_retries:
+            raise ProviderUnavailableError(f"{self.name}.{method}: {self.max_retries} denemeden sonra başarısız: {error}") from error
+        metrics.increment("ai_retries_total", {"service": self.name, "method": method})
+        return max(_retry_after(error) or 0.0, backoff_delay(attempt, self.base_delay, self.max_delay))
+
+    async def call(self, func, method: str = "call"):
+        """func: her denemede yeni coroutine üreten fonksiyon."""
+        for attempt in range(self.max_retries + 1):
+            probe = self.breaker.before_call()
+            try:
+                await self.bucket.acquire_async()
+                try:
+                    result = await func()
+                except Exception as e:
+                    delay = self._on_error(e, attempt, method)
+                else:
+                    self.breaker.record_success()
+                    return result
+            finally:
+                # İptal (CancelledError) ya da beklenmedik hata: deneme hakkı asılı kalmasın
+                if probe:
+                    self.breaker.release_probe()
+            await asyncio.sleep(delay)
+
+    def call_sync(self, func, method: str = "call"):
+        """Senkron istemciler için (thread içinde çalışan ASR çağrısı gibi)."""
+        for attempt in range(self.max_retries + 1):
+            probe = self.breaker.before_call()
+            try:
+                self.bucket.acquire()
+                try:
+                    result = func()
+                except Exception as e:
+                    delay = self._on_error(e, attempt, method)
+                else:
+                    self.breaker.record_success()
+                    return result
+            finally:
+                if probe:
+                    self.breaker.release_probe()
+            time.sleep(delay)
+
+
+def create_caller(name: str, requests_per_minute: float, burst: float) -> ResilientCaller:
+    return ResilientCaller(
+        name,
+        SQLiteTokenBucket(settings.RATE_LIMIT_PATH, name, requests_per_minute / 60.0, burst),
+        CircuitBreaker(name, settings.CIRCUIT_FAILURE_THRESHOLD, settings.CIRCUIT_RESET_SECONDS)
+    )
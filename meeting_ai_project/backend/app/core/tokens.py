@@ -0,0 +1,12 @@
+import math
+
+# Llama tokenizer'ı Türkçe metinde ortalama ~3 karakter/token üretir (İngilizcede ~4).
+# Tahmin bilerek temkinli tutulur: bütçe aşımı, eksik kullanımdan daha pahalıdır.
+CHARS_PER_TOKEN = 3.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısı (tokenizer yüklemeden, O(1))."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -2,20 +2,29 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy import text
-from app.core.database import engine, Base
+from fastapi.responses import PlainTextResponse
+from app.core.database import run_migrations
+from app.core.config import settings
+from app.core.lazy import warmup_services
+from app.core.metrics import get_metrics
+from app.services.upload_service import resumable_uploads
 # 👇 BURASI ÇOK ÖNEMLİ: teams eklendi mi?
 from app.api.v1.endpoints import meetings, users, auth, teams 
 import os
+import asyncio
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     os.makedirs("uploads", exist_ok=True)
-    async with engine.begin() as conn:
-        if "postgresql" in str(engine.url):
-            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        await conn.run_sync(Base.metadata.create_all)
+    # Şema create_all yerine sürümlü migrasyonlarla kurulur/güncellenir (mevcut veritabanları da indeks kazanır)
+    await run_migrations()
+    # Yarıda bırakılmış parçalı yüklemeler (süresi dolanlar) diskte birikmesin
+    await asyncio.to_thread(resumable_uploads.sweep, True)
     print("✅ Veritabanı ve Sistem Hazır!")
+    # Modeller varsayılan olarak ilk kullanımda yüklenir; istenirse burada ısıtılır
+    if settings.WARMUP_SERVICES:
+        timings = await asyncio.to_thread(warmup_services, settings.WARMUP_SERVICES)
+        print(f"🔥 Servisler ısıtıldı: {timings}")
     yield
 
 app = FastAPI(
@@ -32,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Liste imleci ve toplantı detayının sürüm etiketi
 )
 
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -51,4 +61,9 @@ app.include_router(notifications.router, prefix="/api/v1/notifications", tags=["
 
 @app.get("/")
 async def root():
-    return {"message": "Smart Backend Çalışıyor 🚀"}
\ No newline at end of file
+    return {"message": "Smart Backend Çalışıyor 🚀"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus formatında sayaçlar (tüm API/worker süreçlerinin toplamı): fallback, retry, devre kesici."""
+    return await asyncio.to_thread(get_metrics().render_prometheus)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, Table
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text, Table, UniqueConstraint, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.types import EmbeddingVector
+from datetime import datetime, timezone
 import enum
 from typing import List, Optional
 
@@ -12,6 +14,9 @@ class MeetingStatus(str, enum.Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+def _utcnow():
+    return datetime.now(timezone.utc)
+
 # --- MODELLER ---
 
 # Çoka-Çok İlişki Tablosu (Takım Üyeleri)
@@ -20,7 +25,7 @@ class TeamMember(Base):
     __tablename__ = "team_members"
     
     team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, index=True) # PK (team_id, user_id) kullanıcıya göre aramaya yaramaz
     role = Column(String, default="member") # 'admin', 'member'
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -55,13 +60,16 @@ class Team(Base):
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    # Kullanıcının toplantıları en yeniden eskiye (liste / sayfalama)
+    __table_args__ = (Index("ix_meetings_owner_id_id", "owner_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id")) # Toplantıyı yükleyen
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True) # Hangi takıma ait? (Opsiyonel)
+    team_id = Column(Integer, ForeignKey("teams.id"), nullable=True, index=True) # Hangi takıma ait? (Opsiyonel)
     
     title = Column(String, index=True)
     audio_file_path = Column(String)
+    content_sha256 = Column(String(64), nullable=True) # Yüklenen dosyanın SHA-256 özeti
     duration_seconds = Column(Float, nullable=True)
     status = Column(String, default=MeetingStatus.UPLOADING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -78,6 +86,8 @@ class Meeting(Base):
 
 class TranscriptSegment(Base):
     __tablename__ = "transcript_segments"
+    # Toplantının segmentleri yazıldığı sırayla (id) okunur
+    __table_args__ = (Index("ix_transcript_segments_meeting_id_id", "meeting_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     meeting_id = Column(Integer, ForeignKey("meetings.id"))
@@ -91,6 +101,11 @@ class TranscriptSegment(Base):
 
 class ActionItem(Base):
     __tablename__ = "action_items"
+    __table_args__ = (
+        # Toplantının görevleri + kullanıcının açık/tarihli görevleri (toplantı join'i üzerinden)
+        Index("ix_action_items_meeting_id_status_due_date", "meeting_id", "status", "due_date"),
+        Index("ix_action_items_status_due_date", "status", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     meeting_id = Column(Integer, ForeignKey("meetings.id"))
@@ -108,7 +123,24 @@ class VoiceProfile(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True)
-    embedding = Column(Text) # Vektör verisi (JSON string)
+    embedding = Column(EmbeddingVector(192)) # Vektör verisi (float32 BLOB / pgvector)
+    sample_count = Column(Integer, default=1)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Mikro saniye hassasiyetinde: profil önbelleği değişikliği bu damgadan anlar
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
-    user = relationship("User", back_populates="voice_profile")
\ No newline at end of file
+    user = relationship("User", back_populates="voice_profile")
+
+class PipelineStageResult(Base):
+    __tablename__ = "pipeline_stage_results"
+    __table_args__ = (UniqueConstraint("meeting_id", "stage", name="uq_pipeline_stage"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id"), index=True)
+
+    stage = Column(String)                         # Örn: "transcribe", "summary"
+    status = Column(String, default="completed")   # completed, failed
+    output = Column(Text, nullable=True)           # Aşama çıktısı (JSON string)
+    error = Column(Text, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,57 @@
+import json
+import numpy as np
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+# Postgres'te pgvector kuruluysa native vektör sütunu kullanılır
+try:
+    from pgvector.sqlalchemy import Vector
+except ImportError:
+    Vector = None
+
+
+class _RawBinary(LargeBinary):
+    """Sonucu olduğu gibi döndüren BLOB (eski JSON metin satırları da okunabilsin)."""
+    def result_processor(self, dialect, coltype):
+        return None
+
+
+class EmbeddingVector(TypeDecorator):
+    """
+    Ses vektörlerini saklayan sütun tipi.
+    - Postgres + pgvector: vector(dim)
+    - Diğerleri (SQLite): float32 BLOB (192 boyut = 768 bayt; JSON'a göre ~5 kat küçük, parse maliyeti yok)
+    Okurken her zaman np.float32 dizisi döner. Eski JSON metin satırları da okunur.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dim: int = 192):
+        super().__init__()
+        self.dim = dim
+
+    def _use_pgvector(self, dialect) -> bool:
+        return dialect.name == "postgresql" and Vector is not None
+
+    def load_dialect_impl(self, dialect):
+        if self._use_pgvector(dialect):
+            return dialect.type_descriptor(Vector(self.dim))
+        return dialect.type_descriptor(_RawBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        vec = np.asarray(value, dtype=np.float32).reshape(-1)
+        if self._use_pgvector(dialect):
+            return vec
+        return vec.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            # Eski format: JSON metin
+            return np.asarray(json.loads(value), dtype=np.float32)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return np.frombuffer(bytes(value), dtype=np.float32).copy()
+        return np.asarray(value, dtype=np.float32)
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import random
+import time
+from app.core.config import settings
+from app.core.resilience import FaultInjector
+
+
+class ASRBackend:
+    """
+    Konuşma tanıma sağlayıcı arayüzü. AudioService dosyayı buraya verir;
+    hız limiti/retry AudioService'in ResilientCaller'ında kalır. Yeni bir sağlayıcı
+    (veya test için sahte ASR) eklemek için bu sınıftan türetip ASR_BACKENDS'e kaydetmek yeterli.
+    """
+
+    def transcribe(self, file_path: str) -> dict:
+        """{"text": tam metin, "segments": [{"start", "end", "text"}]} döner; hata olursa istisna fırlatır."""
+        raise NotImplementedError
+
+
+class GroqASRBackend(ASRBackend):
+    def __init__(self):
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            print("⚠️ GROQ API KEY Eksik! .env dosyasını kontrol edin.")
+        from groq import Groq
+        # Retry'ı AudioService'in ResilientCaller'ı yönetir (istemcinin kendi retry'ı ile katlanmasın)
+        self.client = Groq(api_key=api_key, max_retries=0)
+
+    def transcribe(self, file_path: str) -> dict:
+        """
+        Groq Whisper-Large-V3 kullanarak sesi metne çevirir.
+        Akustik olarak en iyi sonucu almaya odaklanır.
+        """
+        print("🚀 Ses dosyası Groq Cloud'a gönderiliyor...")
+        # Her denemede dosya baştan açılır (yarım kalan yükleme tekrar gönderilebilsin)
+        with open(file_path, "rb") as file:
+            transcription = self.client.audio.transcriptions.create(
+                # Dosya nesnesi verilir: ses belleğe bütünüyle kopyalanmadan akış halinde gönderilir
+                file=(os.path.basename(file_path), file),
+                model="whisper-large-v3",
+                # Genel Bağlam Prompt'u: Modele sadece düzgün yazmasını söylüyoruz.
+                prompt="Şimdi toplantı notlarını almaya başlıyorum. Lütfen cümleleri tam, akıcı ve noktalama işaretlerine dikkat ederek yaz.",
+                response_format="verbose_json",
+                language="tr"
+            )
+
+        segments = []
+        if hasattr(transcription, 'segments'):
+            for seg in transcription.segments:
+                segments.append({
+                    "start": seg['start'],
+                    "end": seg['end'],
+                    "text": seg['text']
+                })
+        else:
+            segments.append({
+                "start": 0.0,
+                "end": transcription.duration,
+                "text": transcription.text
+            })
+
+        print("✅ Groq Whisper Analizi Tamamlandı!")
+        return {"text": transcription.text, "segments": segments}
+
+
+# Sahte transkript için cümle havuzu (görev çıkarımı ve özet aşamalarına da içerik sağlar)
+_STUB_SENTENCES = (
+    "Geçen haftaki satış rakamlarını gözden geçirelim.",
+    "Müşteri geri bildirimleri genel olarak olumlu görünüyor.",
+    "Ahmet raporu cuma gününe kadar hazırlasın.",
+    "Yeni sürümün test süreci planlandığı gibi ilerliyor.",
+    "Bütçe konusunda finans ekibiyle tekrar görüşmemiz lazım.",
+    "Ayşe tasarım dokümanını yarın akşama kadar paylaşacak.",
+    "Sunucu maliyetlerini azaltmak için bir plan gerekli.",
+    "Kampanya takvimini bir sonraki toplantıda netleştirelim.",
+    "Mobil uygulamadaki hata kayıtlarını inceledik.",
+    "Ben tedarikçiyle pazartesi görüşürüm.",
+)
+
+
+class StubASRBackend(ASRBackend):
+    """
+    Ağa çıkmayan, deterministik sahte ASR (yük testi ve CI için).
+    Sesin süresine göre segment_seconds'lık segmentler üretir; metin dosya adı ve
+    seed'den türetildiği için aynı dosya her koşuda aynı transkripti verir.
+    Gecikme = latency + realtime_factor * ses süresi; failure_rate oranında geçici hata fırlatılır.
+    """
+
+    def __init__(self, latency: float = None, realtime_factor: float = None, failure_rate: float = None,
+                 seed: int = None, segment_seconds: float = 6.0):
+        self.latency = settings.ASR_STUB_LATENCY if latency is None else latency
+        self.realtime_factor = settings.ASR_STUB_REALTIME_FACTOR if realtime_factor is None else realtime_factor
+        self.seed = settings.STUB_SEED if seed is None else seed
+        self.faults = FaultInjector(settings.ASR_STUB_FAILURE_RATE if failure_rate is None else failure_rate, self.seed)
+        self.segment_seconds = segment_seconds
+
+    def transcribe(self, file_path: str) -> dict:
+        from app.services.audio_normalizer import NormalizedAudio
+        duration = NormalizedAudio(file_path).duration
+        time.sleep(self.latency + self.realtime_factor * duration)
+        self.faults.maybe_fail("transcribe")
+
+        digest = hashlib.sha256(f"{self.seed}:{os.path.basename(file_path)}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + self.segment_seconds)
+            segments.append({"start": round(start, 2), "end": round(end, 2), "text": " " + rng.choice(_STUB_SENTENCES)})
+            start = end
+        return {"text": "".join(seg["text"] for seg in segments).strip(), "segments": segments}
+
+
+ASR_BACKENDS = {
+    "groq": GroqASRBackend,
+    "stub": StubASRBackend,
+}
+
+
+def create_asr_backend(name: str = None) -> ASRBackend:
+    return ASR_BACKENDS[name or settings.ASR_BACKEND]()
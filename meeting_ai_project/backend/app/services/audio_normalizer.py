@@ -0,0 +1,181 @@
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import wave
+import numpy as np
+
+# ASR, konuşmacı tanıma ve VAD için ortak hedef format
+TARGET_SAMPLE_RATE = 16000
+NORMALIZED_SUFFIX = ".16k.wav"
+_BLOCK_BYTES = 1 << 16  # ffmpeg çıktısını 64 KB'lık bloklarla oku
+
+
+class NormalizedAudio:
+    """
+    Normalize edilmiş (16 kHz, mono, PCM16) WAV dosyasına bellek eşlemeli erişim.
+    Dosyanın tamamı belleğe alınmaz; istenen aralık float32 olarak kopyalanır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.sample_rate = TARGET_SAMPLE_RATE
+        offset, nbytes = _find_data_chunk(path)
+        frames = nbytes // 2
+        if frames:
+            self._pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(frames,))
+        else:
+            self._pcm = np.zeros(0, dtype="<i2")
+
+    def __len__(self):
+        return len(self._pcm)
+
+    @property
+    def duration(self) -> float:
+        return len(self._pcm) / self.sample_rate
+
+    def __getitem__(self, key):
+        """audio[start_frame:end_frame] -> float32 [-1, 1]."""
+        return self._pcm[key].astype(np.float32) / 32768.0
+
+    def slice(self, start_sec: float, end_sec: float):
+        return self[int(start_sec * self.sample_rate):int(end_sec * self.sample_rate)]
+
+    def iter_blocks(self, block_frames: int = TARGET_SAMPLE_RATE * 30):
+        """Sesi sabit boyutlu float32 bloklar halinde gezer."""
+        for start in range(0, len(self._pcm), block_frames):
+            yield self[start:start + block_frames]
+
+
+def normalized_path_for(src_path: str) -> str:
+    if src_path.endswith(NORMALIZED_SUFFIX):
+        return src_path
+    return os.path.splitext(src_path)[0] + NORMALIZED_SUFFIX
+
+
+def normalize_audio(src_path: str, dest_path: str = None) -> NormalizedAudio:
+    """
+    Herhangi bir ses dosyasını akış halinde 16 kHz mono PCM16 WAV'a çevirir.
+    ffmpeg varsa çıktısı bloklar halinde diske yazılır; yoksa soundfile ile
+    bloklar okunup yeniden örneklenir. Her iki yolda da çözülmüş ses bütünüyle
+    belleğe alınmaz.
+    """
+    dest_path = dest_path or normalized_path_for(src_path)
+    if src_path == dest_path and os.path.exists(dest_path):
+        return NormalizedAudio(dest_path)
+
+    tmp_path = dest_path + ".tmp"
+    try:
+        if shutil.which("ffmpeg"):
+            _normalize_with_ffmpeg(src_path, tmp_path)
+        else:
+            _normalize_with_soundfile(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return NormalizedAudio(dest_path)
+
+
+def _open_wav_writer(path: str) -> wave.Wave_write:
+    writer = wave.open(path, "wb")
+    writer.setnchannels(1)
+    writer.setsampwidth(2)
+    writer.setframerate(TARGET_SAMPLE_RATE)
+    return writer
+
+
+def _normalize_with_ffmpeg(src_path: str, dest_path: str):
+    # stderr geçici dosyaya yazılır: PIPE olsaydı, bozuk dosyada 64 KB'ı aşan uyarılar
+    # okunmayı beklerken ffmpeg ve biz birbirimizi bekleyip kilitlenirdik
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            ["ffmpeg", "-nostdin", "-v", "error", "-i", src_path,
+             "-vn", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-f", "s16le", "-"],
+            stdout=subprocess.PIPE,
+            stderr=stderr_file
+        )
+        writer = _open_wav_writer(dest_path)
+        try:
+            leftover = b""
+            while True:
+                block = process.stdout.read(_BLOCK_BYTES)
+                if not block:
+                    break
+                block = leftover + block
+                usable = len(block) - (len(block) % 2)
+                writer.writeframesraw(block[:usable])
+                leftover = block[usable:]
+        finally:
+            writer.close()
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+            raise RuntimeError(f"ffmpeg dönüştürme hatası: {stderr.decode(errors='ignore').strip()}")
+
+
+class _StreamingResampler:
+    """Blok blok doğrusal yeniden örnekleme; blok sınırlarında süreklilik korunur."""
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.step = src_rate / dst_rate
+        self.position = 0.0     # Sıradaki çıktı örneğinin kaynak zaman ekseninde konumu
+        self.consumed = 0       # Şimdiye kadar görülen kaynak örnek sayısı
+        self.last = None        # Önceki bloğun son örneği (sınır interpolasyonu için)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if self.last is not None:
+            block = np.concatenate(([self.last], block))
+            base = self.consumed - 1
+        else:
+            base = self.consumed
+        end = base + len(block) - 1  # Bu blokta interpolasyon yapılabilecek son konum
+        if self.position > end:
+            self.consumed = base + len(block)
+            self.last = block[-1]
+            return np.zeros(0, dtype=np.float32)
+
+        count = int((end - self.position) // self.step) + 1
+        positions = self.position + np.arange(count) * self.step
+        out = np.interp(positions - base, np.arange(len(block)), block).astype(np.float32)
+
+        self.position += count * self.step
+        self.consumed = base + len(block)
+        self.last = block[-1]
+        return out
+
+
+def _normalize_with_soundfile(src_path: str, dest_path: str):
+    import soundfile as sf  # Yalnızca ffmpeg yoksa gerekli
+    info = sf.info(src_path)
+    resampler = _StreamingResampler(info.samplerate, TARGET_SAMPLE_RATE) if info.samplerate != TARGET_SAMPLE_RATE else None
+    writer = _open_wav_writer(dest_path)
+    try:
+        for block in sf.blocks(src_path, blocksize=info.samplerate * 10, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1)
+            if resampler is not None:
+                mono = resampler.process(mono)
+            pcm = np.clip(mono * 32768.0, -32768, 32767).astype("<i2")
+            writer.writeframesraw(pcm.tobytes())
+    finally:
+        writer.close()
+
+
+def _find_data_chunk(path: str):
+    """WAV dosyasındaki 'data' bölümünün (ofset, uzunluk) bilgisini döner."""
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise ValueError(f"Geçerli bir WAV dosyası değil: {path}")
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                raise ValueError(f"WAV 'data' bölümü bulunamadı: {path}")
+            chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+            if chunk_id == b"data":
+                file_size = os.path.getsize(path)
+                return f.tell(), min(chunk_size, file_size - f.tell())
+            f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
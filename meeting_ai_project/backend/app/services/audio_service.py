@@ -1,58 +1,36 @@
 import os
-from groq import Groq
 from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.lazy import LazyService
+from app.core.metrics import record_fallback
+from app.core.resilience import ProviderUnavailableError, create_caller
+from app.services.asr_backends import ASRBackend, create_asr_backend
 
 load_dotenv()
 
 class AudioService:
-    def __init__(self):
-        self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            print("⚠️ GROQ API KEY Eksik! .env dosyasını kontrol edin.")
-        
-        self.client = Groq(api_key=self.api_key)
+    def __init__(self, backend: ASRBackend = None):
+        # Sağlayıcı: varsayılan Groq Whisper; ASR_BACKEND=stub ile ağa çıkmayan sahte transkript
+        self.backend = backend or create_asr_backend()
+        self.caller = create_caller("asr", settings.ASR_REQUESTS_PER_MINUTE, settings.ASR_BURST)
 
     def transcribe(self, file_path: str):
         """
-        Groq Whisper-Large-V3 kullanarak sesi metne çevirir.
-        Akustik olarak en iyi sonucu almaya odaklanır.
+        Sesi metne çevirir (hız limiti, retry ve devre kesici ResilientCaller'da).
+        Kalıcı hatalarda boş transkript döner; geçici hatalar tükenirse iş tekrar denensin diye yükseltilir.
         """
-        print("🚀 Ses dosyası Groq Cloud'a gönderiliyor...")
-        
         if not os.path.exists(file_path):
              return {"text": "", "segments": []}
 
         try:
-            with open(file_path, "rb") as file:
-                transcription = self.client.audio.transcriptions.create(
-                    file=(file_path, file.read()),
-                    model="whisper-large-v3",
-                    # Genel Bağlam Prompt'u: Modele sadece düzgün yazmasını söylüyoruz.
-                    prompt="Şimdi toplantı notlarını almaya başlıyorum. Lütfen cümleleri tam, akıcı ve noktalama işaretlerine dikkat ederek yaz.",
-                    response_format="verbose_json",
-                    language="tr"
-                )
-            
-            segments = []
-            if hasattr(transcription, 'segments'):
-                for seg in transcription.segments:
-                    segments.append({
-                        "start": seg['start'],
-                        "end": seg['end'],
-                        "text": seg['text']
-                    })
-            else:
-                segments.append({
-                    "start": 0.0,
-                    "end": transcription.duration,
-                    "text": transcription.text
-                })
-
-            print("✅ Groq Whisper Analizi Tamamlandı!")
-            return {"text": transcription.text, "segments": segments}
+            return self.caller.call_sync(lambda: self.backend.transcribe(file_path), "transcribe")
 
+        except ProviderUnavailableError:
+            # Geçici sağlayıcı hatası: boş transkriptle "tamamlandı" demek yerine iş tekrar denensin
+            raise
         except Exception as e:
-            print(f"❌ Groq Transkripsiyon Hatası: {e}")
+            print(f"❌ Transkripsiyon Hatası: {e}")
+            record_fallback("asr", "transcribe", e)
             return {"text": "", "segments": []}
 
-audio_service = AudioService()
\ No newline at end of file
+audio_service = LazyService("audio", AudioService)
@@ -0,0 +1,107 @@
+from app.core.tokens import estimate_tokens
+from app.services.lexical_index import tokenize
+
+
+def _similar(a: set, b: set, threshold: float) -> bool:
+    """Jaccard benzerliği: kelime kümelerinin kesişimi / birleşimi."""
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= threshold
+
+
+class ContextPacker:
+    """
+    LLM bağlamını token bütçesine göre kurar.
+    - Parçalar alaka sırasıyla eklenir; bütçeyi aşan parça atlanır, sıradakiler denenir.
+    - Neredeyse aynı parçalar (ör. tekrar eden cümleler) bir kez alınır.
+    - Aynı toplantının parçaları tek blokta (kronolojik) birleştirilir; başlık bir kez yazılır.
+    Böylece prompt boyutu (ve gecikme/maliyet) sabit bir üst sınırda kalır.
+    """
+
+    def __init__(self, budget_tokens: int, dedup_threshold: float = 0.85):
+        self.budget_tokens = budget_tokens
+        self.dedup_threshold = dedup_threshold
+        self.used_tokens = 0
+        self.dropped_duplicates = 0
+        self.dropped_over_budget = 0
+        self._selected = []   # (sıra, meeting_id, konum, segment sırası, title, metin)
+        self._token_sets = []
+        self._headers = set()
+
+    def _fits(self, tokens: int) -> bool:
+        return self.used_tokens + tokens <= self.budget_tokens
+
+    def add_hits(self, hits: list, position=None, segment_index=None):
+        """
+        RAG isabetlerini alaka sırasıyla ekler: [{"id", "document", "metadata"}, ...]
+        position: isabetin toplantı içi konumunu (ör. başlangıç saniyesi) veren fonksiyon; yoksa alaka sırası.
+        segment_index: isabet ID'sinden segment sıra numarasını (bilinmiyorsa None) çıkaran fonksiyon;
+        ardışık segmentler "..." olmadan birleştirilir.
+        """
+        for rank, hit in enumerate(hits):
+            text = hit["document"]
+            words = set(tokenize(text))
+            if any(_similar(words, seen, self.dedup_threshold) for seen in self._token_sets):
+                self.dropped_duplicates += 1
+                continue
+
+            meeting_id = hit["metadata"].get("meeting_id")
+            title = hit["metadata"].get("title", "")
+            # Toplantı başlığı blok başına bir kez yazılır
+            cost = estimate_tokens(text) + 1
+            if meeting_id not in self._headers:
+                cost += estimate_tokens(f"[Toplantı: {title}]") + 1
+            if not self._fits(cost):
+                self.dropped_over_budget += 1
+                continue
+
+            index = position(hit) if position else rank
+            sequence = segment_index(hit["id"]) if segment_index else None
+            self._selected.append((rank, meeting_id, index, sequence, title, text))
+            self._token_sets.append(words)
+            self._headers.add(meeting_id)
+            self.used_tokens += cost
+
+    def render(self) -> str:
+        """
+        Seçilen parçaları toplantı bloklarına dönüştürür. Bloklar en alakalı parçalarına göre
+        sıralanır; blok içinde parçalar kronolojiktir. Ardışık segmentler birleşir; aradaki
+        boşluklar (ya da sırası bilinmeyen parçalar arası) "..." ile gösterilir.
+        """
+        meetings = {}
+        for rank, meeting_id, index, sequence, title, text in self._selected:
+            entry = meetings.setdefault(meeting_id, {"rank": rank, "title": title, "segments": []})
+            entry["rank"] = min(entry["rank"], rank)
+            entry["segments"].append((index, sequence, text))
+
+        blocks = []
+        for entry in sorted(meetings.values(), key=lambda e: e["rank"]):
+            lines, previous = [f"[Toplantı: {entry['title']}]"], None
+            for i, (_, sequence, text) in enumerate(sorted(entry["segments"], key=lambda s: s[0])):
+                if i and (sequence is None or previous is None or sequence != previous + 1):
+                    lines.append("...")
+                lines.append(text)
+                previous = sequence
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks)
+
+    def stats(self) -> dict:
+        return {
+            "tokens": self.used_tokens,
+            "budget": self.budget_tokens,
+            "snippets": len(self._selected),
+            "duplicates": self.dropped_duplicates,
+            "over_budget": self.dropped_over_budget
+        }
+
+
+def pack_lines(lines: list, budget_tokens: int) -> tuple:
+    """Sıralı satırları (ör. görev listesi) bütçe dolana kadar alır. Dönüş: (metin, token)."""
+    selected, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget_tokens:
+            break
+        selected.append(line)
+        used += cost
+    return "\n".join(selected), used
@@ -0,0 +1,142 @@
+import os
+import re
+import sqlite3
+import threading
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+SCHEMA_VERSION = "2"
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe'ye uygun küçük harf: I -> ı, İ -> i (str.lower bunu yanlış yapar)."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def tokenize(text: str) -> list:
+    """
+    Kelime, sayı ve proje kodu parçaları ("PRJ-42" -> ["prj", "42"]).
+    ı/i ayrımı kaldırılır; kalan aksanlar (ş, ğ, ü...) FTS5 tarafından katlanır.
+    Böylece "Istanbul", "İSTANBUL" ve "istanbul" aynı terime düşer.
+    """
+    return _TOKEN_RE.findall(turkish_lower(text).replace("ı", "i"))
+
+
+def _match_term(term: str) -> str:
+    # Türkçe ekler için uzun kelimelerde önek eşleşmesi ("bütçe" -> "bütçesi"); sayı/kodlar birebir
+    if len(term) >= 4 and term.isalpha():
+        return f'"{term}" *'
+    return f'"{term}"'
+
+
+def _scope_terms(meeting_id: int, owner_id: int = None, team_id: int = None) -> str:
+    terms = [f"m{meeting_id}"]
+    if owner_id is not None:
+        terms.append(f"o{owner_id}")
+    if team_id is not None:
+        terms.append(f"t{team_id}")
+    return " ".join(terms)
+
+
+class LexicalIndex:
+    """
+    Transkript segmentleri için BM25 tabanlı ters indeks (SQLite FTS5).
+    Yoğun (dense) arama İngilizce ağırlıklı modelle çalıştığı için özel isim,
+    proje kodu ve sayıları kaçırabilir; bu indeks birebir kelime eşleşmesini yakalar.
+    Chroma koleksiyonuyla aynı segment ID'lerini kullanır.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value TEXT)")
+        if self.get_meta("schema_version") != SCHEMA_VERSION:
+            # Eski şema: yeniden kurulur (RagService boş indeksi Chroma'dan tekrar doldurur)
+            conn.execute("DROP TABLE IF EXISTS segments")
+        # scope: "o<owner_id> t<team_id> m<meeting_id>" terimleri; MATCH ile içerikle kesiştirilir,
+        # böylece arama yalnızca kiracının/toplantının kayıtlarının posting listelerinde yürür.
+        # content: aramada kullanılan normalize metin; document: gösterilecek orijinal metin
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS segments USING fts5("
+            "doc_id UNINDEXED, meeting_id UNINDEXED, owner_id UNINDEXED, team_id UNINDEXED, "
+            "title UNINDEXED, timestamp UNINDEXED, document UNINDEXED, scope, content, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self.set_meta("schema_version", SCHEMA_VERSION)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT count(*) FROM segments").fetchone()[0]
+
+    def get_meta(self, key: str):
+        row = self._connect().execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self._connect().execute(
+            "INSERT INTO index_meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def replace_meeting(self, meeting_id: int, ids: list, documents: list, metadatas: list,
+                        owner_id: int = None, team_id: int = None):
+        """Toplantının segmentlerini tek işlemde yeniden yazar (yeniden işleme idempotent)."""
+        scope = _scope_terms(meeting_id, owner_id, team_id)
+        rows = [
+            (doc_id, meeting_id, owner_id, team_id, meta.get("title"), meta.get("timestamp"), document,
+             scope, " ".join(tokenize(document)))
+            for doc_id, document, meta in zip(ids, documents, metadatas)
+        ]
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM segments WHERE meeting_id = ?", (meeting_id,))
+            conn.executemany(
+                "INSERT INTO segments (doc_id, meeting_id, owner_id, team_id, title, timestamp, document, scope, content) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_meeting(self, meeting_id: int):
+        self._connect().execute("DELETE FROM segments WHERE meeting_id = ?", (meeting_id,))
+
+    def search(self, query: str, limit: int = 5, owner_id: int = None, team_ids=(), meeting_id: int = None) -> list:
+        """
+        BM25 ile en alakalı segmentleri döner: [{"id", "document", "metadata", "score"}, ...]
+        Sorgu terimleri OR ile birleştirilir; daha çok terim içeren segment üste çıkar.
+        owner_id verilirse yalnızca kullanıcının ve takımlarının (team_ids) kayıtları aranır;
+        meeting_id verilirse yalnızca o toplantının segmentleri aranır.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        match = "content : (" + " OR ".join(_match_term(term) for term in terms) + ")"
+        if owner_id is not None:
+            scopes = [f"o{owner_id}"] + [f"t{team_id}" for team_id in team_ids]
+            match = "scope : (" + " OR ".join(scopes) + ") AND " + match
+        if meeting_id is not None:
+            match = f"scope : m{meeting_id} AND " + match
+        rows = self._connect().execute(
+            "SELECT doc_id, meeting_id, title, timestamp, document, bm25(segments, 0, 0, 0, 0, 0, 0, 0, 0, 1) AS rank "
+            "FROM segments WHERE segments MATCH ? ORDER BY rank LIMIT ?",  # Yalnızca content puanlanır
+            (match, limit)
+        ).fetchall()
+        return [{
+            "id": doc_id,
+            "document": document,
+            "metadata": {"meeting_id": meeting_id, "title": title, "timestamp": timestamp},
+            "score": -rank  # FTS5 bm25() negatif döner; büyük = daha alakalı
+        } for doc_id, meeting_id, title, timestamp, document, rank in rows]
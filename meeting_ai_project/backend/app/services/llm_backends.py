@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import os
+from collections import deque
+from app.core.config import settings
+from app.core.resilience import FaultInjector
+
+
+class ChatBackend:
+    """
+    Chat completion sağlayıcı arayüzü. LLMService tüm çağrılarını buradan yapar;
+    farklı bir sağlayıcı (veya test için sahte yanıt) eklemek için bu sınıftan
+    türetip CHAT_BACKENDS'e kaydetmek yeterli.
+    """
+
+    async def complete(self, messages: list, model: str, temperature: float, response_format: dict = None):
+        """Yanıtın tamamını döner: (metin, usage sözlüğü veya None)."""
+        raise NotImplementedError
+
+    async def stream(self, messages: list, model: str, temperature: float, usage: dict = None):
+        """Yanıtı parça parça (async iterator) üretir. usage verilirse bitişte doldurulur."""
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+
+class GroqChatBackend(ChatBackend):
+    def __init__(self):
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            print("⚠️ GROQ API KEY Eksik! .env dosyasını kontrol edin.")
+        # Asenkron istemci: ağ beklerken event loop bloklanmaz
+        from groq import AsyncGroq
+        # Retry'ı LLMService'in ResilientCaller'ı yönetir (istemcinin kendi retry'ı ile katlanmasın)
+        self.client = AsyncGroq(api_key=api_key, max_retries=0)
+
+    async def complete(self, messages: list, model: str, temperature: float, response_format: dict = None):
+        kwargs = {}
+        if response_format:
+            kwargs["response_format"] = response_format
+        chat_completion = await self.client.chat.completions.create(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            **kwargs
+        )
+        usage = None
+        if getattr(chat_completion, "usage", None):
+            usage = {
+                "prompt_tokens": chat_completion.usage.prompt_tokens,
+                "completion_tokens": chat_completion.usage.completion_tokens
+            }
+        return chat_completion.choices[0].message.content, usage
+
+    async def stream(self, messages: list, model: str, temperature: float, usage: dict = None):
+        stream = await self.client.chat.completions.create(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            # Groq token kullanımını son parçada x_groq.usage içinde gönderir
+            chunk_usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage is not None and chunk_usage:
+                usage["prompt_tokens"] = chunk_usage.prompt_tokens
+                usage["completion_tokens"] = chunk_usage.completion_tokens
+
+
+def _stub_json_reply(messages: list) -> dict:
+    """
+    Sistem prompt'unun istediği şemada deterministik JSON (görev, duygu, özet).
+    İçerik kullanıcı mesajının satırlarından türetilir; aynı girdi hep aynı yanıtı verir.
+    """
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+    lines = [line.strip() for line in user.splitlines() if line.strip() and not line.startswith("TRANSCRIPT:")]
+    if '"tasks"' in system:
+        tasks = []
+        for line in lines:
+            speaker, _, text = line.rpartition(": ")
+            if any(word in text for word in ("lazım", "gerekli", "yapsın", "hazırlasın", "görüşürüm", "paylaşacak")):
+                tasks.append({"description": text[:120], "assignee": speaker or "Belirsiz", "due_date": None, "confidence": 0.8})
+        return {"tasks": tasks[:5]}
+    if '"mood"' in system:
+        score = 3 + int(hashlib.sha256(user.encode("utf-8")).hexdigest(), 16) % 6
+        return {"mood": "Verimli" if score >= 6 else "Nötr", "score": score}
+    if '"discussions"' in system:
+        return {"discussions": lines[:3], "decisions": lines[3:4], "action_plan": lines[4:5], "deadlines": []}
+    return {}
+
+
+class StubChatBackend(ChatBackend):
+    """
+    Ağa çıkmayan sahte sağlayıcı (testler, yerel geliştirme ve yük testi için).
+    Yanıt, verilen reply'dan ya da son kullanıcı mesajından deterministik olarak
+    üretilir; akışta kelime kelime, isteğe bağlı gecikmelerle gönderilir.
+    failure_rate oranında geçici (503) hata fırlatır.
+    """
+
+    def __init__(self, reply: str = None, first_token_delay: float = None, token_delay: float = None,
+                 failure_rate: float = None, seed: int = None):
+        self.reply = reply
+        self.first_token_delay = settings.LLM_STUB_FIRST_TOKEN_DELAY if first_token_delay is None else first_token_delay
+        self.token_delay = settings.LLM_STUB_TOKEN_DELAY if token_delay is None else token_delay
+        self.faults = FaultInjector(
+            settings.LLM_STUB_FAILURE_RATE if failure_rate is None else failure_rate,
+            settings.STUB_SEED if seed is None else seed
+        )
+        self.calls = deque(maxlen=1000)  # Son çağrılar (uzun yük testlerinde bellek büyümesin)
+
+    def _reply(self, messages: list, response_format: dict = None) -> str:
+        if self.reply is not None:
+            return self.reply
+        if response_format and response_format.get("type") == "json_object":
+            return json.dumps(_stub_json_reply(messages), ensure_ascii=False)
+        last_user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        return f"Stub yanıt: {' '.join(last_user.split()[-20:])}"
+
+    async def complete(self, messages: list, model: str, temperature: float, response_format: dict = None):
+        self.calls.append({"messages": messages, "model": model, "temperature": temperature})
+        await asyncio.sleep(self.first_token_delay)
+        self.faults.maybe_fail("complete")
+        content = self._reply(messages, response_format)
+        return content, {"prompt_tokens": sum(len(m["content"]) for m in messages) // 3, "completion_tokens": len(content) // 3}
+
+    async def stream(self, messages: list, model: str, temperature: float, usage: dict = None):
+        self.calls.append({"messages": messages, "model": model, "temperature": temperature, "stream": True})
+        content = self._reply(messages)
+        await asyncio.sleep(self.first_token_delay)
+        self.faults.maybe_fail("stream")
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield word if i == len(words) - 1 else word + " "
+        if usage is not None:
+            usage["prompt_tokens"] = sum(len(m["content"]) for m in messages) // 3
+            usage["completion_tokens"] = len(content) // 3
+
+
+CHAT_BACKENDS = {
+    "groq": GroqChatBackend,
+    "stub": StubChatBackend,
+}
+
+
+def create_chat_backend(name: str = None) -> ChatBackend:
+    return CHAT_BACKENDS[name or settings.LLM_BACKEND]()
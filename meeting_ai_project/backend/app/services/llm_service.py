@@ -1,22 +1,220 @@
-import os
 import json
+import asyncio
 from datetime import datetime
 import locale
-from groq import Groq
+import hashlib
 from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.lazy import LazyService
+from app.core.cache import DiskCache
+from app.core.metrics import record_fallback
+from app.core.resilience import ProviderUnavailableError, create_caller, is_transient
+from app.services.llm_backends import ChatBackend, create_chat_backend
 
 load_dotenv()
 
+CHAT_ERROR_MESSAGE = "Üzgünüm, şu an bağlantı kuramıyorum."
+
+SUMMARY_KEYS = ("discussions", "decisions", "action_plan", "deadlines")
+
+SUMMARY_PROMPT = """
+        You are an Executive Assistant. Summarize the meeting in Turkish.
+        Output ONLY a JSON object.
+        
+        JSON FORMAT:
+        {
+          "discussions": ["Konuşulan madde 1", "Konuşulan madde 2"],
+          "decisions": ["Alınan karar 1", "Alınan karar 2"],
+          "action_plan": ["Kim ne yapacak (Kısa özet)"],
+          "deadlines": ["Varsa kritik tarihler"]
+        }
+        """
+
+MERGE_PROMPT = """
+        You are an Executive Assistant. Below are partial summaries (one JSON per line) of
+        consecutive parts of the SAME meeting, in order. Merge them into one summary in Turkish.
+        Remove duplicates, keep every decision, action and deadline. Later parts override earlier ones
+        when they conflict. Output ONLY a JSON object.
+        
+        JSON FORMAT:
+        {
+          "discussions": ["Konuşulan madde 1", "Konuşulan madde 2"],
+          "decisions": ["Alınan karar 1", "Alınan karar 2"],
+          "action_plan": ["Kim ne yapacak (Kısa özet)"],
+          "deadlines": ["Varsa kritik tarihler"]
+        }
+        """
+
+
+def split_transcript(transcript: str, max_chars: int) -> list:
+    """
+    Transkripti max_chars'ı aşmayan parçalara böler. Kesim yalnızca satır (segment)
+    sınırında yapılır; mümkünse konuşmacının değiştiği satırda. Tek başına sınırı aşan
+    satır kelime sınırından bölünür.
+    """
+    if len(transcript) <= max_chars:
+        return [transcript] if transcript else []
+
+    lines = []
+    for line in transcript.split("\n"):
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            lines.append(line[:cut])
+            line = line[cut:].lstrip()
+        lines.append(line)
+
+    chunks, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) + 1 > max_chars:
+            # Parçanın ikinci yarısında konuşmacı değişimi varsa oradan kes, kalan satırlar sonraki parçaya
+            split_at = len(current)
+            for i in range(len(current) - 1, len(current) // 2, -1):
+                if _speaker(current[i]) != _speaker(current[i - 1]):
+                    split_at = i
+                    break
+            chunks.append("\n".join(current[:split_at]))
+            current = current[split_at:]
+            size = sum(len(l) + 1 for l in current)
+            if current and size + len(line) + 1 > max_chars:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _speaker(line: str) -> str:
+    return line.split(":", 1)[0] if ":" in line else ""
+
+
+def _normalize_summary(summary: dict) -> dict:
+    """Özeti her zaman dört anahtarlı şemaya getir (eksik anahtar -> boş liste)."""
+    normalized = {}
+    for key in SUMMARY_KEYS:
+        value = summary.get(key) if isinstance(summary, dict) else None
+        if value is None:
+            value = []
+        normalized[key] = value if isinstance(value, list) else [value]
+    return normalized
+
+
+def _concat_summaries(partials: list) -> dict:
+    """Birleştirme çağrısı başarısız olursa ara özetleri tekrarsız uç uca ekle."""
+    merged = {key: [] for key in SUMMARY_KEYS}
+    for partial in partials:
+        for key, items in _normalize_summary(partial).items():
+            merged[key].extend(item for item in items if item not in merged[key])
+    return merged
+
+
+def _group_texts(texts: list, max_chars: int) -> list:
+    """Metinleri sırayla, toplamı max_chars'ı aşmayan gruplara ayırır (indeks listeleri). Metin bölünmez."""
+    groups, current, size = [], [], 0
+    for i, text in enumerate(texts):
+        if current and size + len(text) + 1 > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        current.append(i)
+        size += len(text) + 1
+    if current:
+        groups.append(current)
+    return groups
+
+
+def merge_sentiments(partials: list, weights: list) -> dict:
+    """Parça duygu sonuçlarını birleştirir: skor uzunluk ağırlıklı ortalama, etiket en ağır basan."""
+    total, weighted_score, mood_weights = 0, 0.0, {}
+    for result, weight in zip(partials, weights):
+        try:
+            score = float(result.get("score"))
+        except (TypeError, ValueError, AttributeError):
+            continue
+        total += weight
+        weighted_score += score * weight
+        mood = result.get("mood") or "Nötr"
+        mood_weights[mood] = mood_weights.get(mood, 0) + weight
+    if not total:
+        return {"mood": "Nötr", "score": 5}
+    return {"mood": max(mood_weights, key=mood_weights.get), "score": round(weighted_score / total)}
+
 class LLMService:
-    def __init__(self):
-        self.api_key = os.getenv("GROQ_API_KEY")
-        if not self.api_key:
-            print("⚠️ GROQ API KEY Eksik! .env dosyasını kontrol edin.")
-            
-        self.client = Groq(api_key=self.api_key)
+    def __init__(self, backend: ChatBackend = None):
+        # Sağlayıcı: varsayılan Groq; LLM_BACKEND=stub ile ağa çıkmayan sahte yanıtlar
+        self.backend = backend or create_chat_backend()
         # En güncel ve yetenekli model
         self.model_name = "llama-3.3-70b-versatile"
 
+        # Kalıcı yanıt önbelleği: yeniden işleme/retry aynı çağrılar için Groq'a tekrar gitmez
+        self.response_cache = DiskCache(
+            settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL
+        ) if settings.LLM_CACHE_ENABLED else None
+        self.cache_counters = {}  # method -> {"hits", "misses"}
+
+        # Paylaşılan hız limiti + retry + devre kesici (tüm süreçlerde toplam istek hızı sınırlı)
+        self.caller = create_caller("llm", settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_BURST)
+
+    def _cache_key(self, messages: list, temperature: float, response_format: dict = None) -> str:
+        payload = json.dumps(
+            {"model": self.model_name, "temperature": temperature, "messages": messages, "response_format": response_format},
+            ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, method: str, hit: bool):
+        counters = self.cache_counters.setdefault(method, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+    async def _complete(self, messages: list, temperature: float, response_format: dict = None, usage: dict = None,
+                        method: str = "other", cache: bool = True, validate=None):
+        """
+        Tüm chat completion çağrılarının geçtiği tek nokta. Yanıt metnini döner.
+        usage sözlüğü verilirse prompt/completion token sayıları içine yazılır.
+        cache=False önbelleği atlar (hem okuma hem yazma); isabette ağa hiç çıkılmaz.
+        validate(content) False dönen yanıt önbelleğe yazılmaz, önbellekten de okunmaz
+        (bozuk çıktı tekrar işlemede yeniden sorulsun). JSON modunda varsayılan: boş olmayan nesne.
+        """
+        if validate is None and (response_format or {}).get("type") == "json_object":
+            validate = self._is_valid_json_reply
+        use_cache = cache and self.response_cache is not None
+        if use_cache:
+            key = self._cache_key(messages, temperature, response_format)
+            cached = await asyncio.to_thread(self.response_cache.get, key)
+            if cached is not None and validate is not None and not validate(cached):
+                cached = None
+            self._count(method, cached is not None)
+            if cached is not None:
+                if usage is not None:
+                    usage["prompt_tokens"] = usage["completion_tokens"] = 0
+                    usage["cached"] = True
+                return cached
+
+        content, completion_usage = await self.caller.call(
+            lambda: self.backend.complete(messages, self.model_name, temperature, response_format), method
+        )
+        if usage is not None and completion_usage:
+            usage.update(completion_usage)
+        if use_cache and content and (validate is None or validate(content)):
+            await asyncio.to_thread(self.response_cache.set, key, content)
+        return content
+
+    def cache_stats(self) -> dict:
+        methods = {}
+        for method, counters in self.cache_counters.items():
+            total = counters["hits"] + counters["misses"]
+            methods[method] = {**counters, "hit_rate": round(counters["hits"] / total, 4) if total else 0.0}
+        return {
+            "enabled": self.response_cache is not None,
+            "entries": len(self.response_cache) if self.response_cache is not None else 0,
+            "methods": methods
+        }
+
+    def _is_valid_json_reply(self, content: str) -> bool:
+        data = self._extract_json(content)
+        return isinstance(data, dict) and bool(data)
+
     def _extract_json(self, content: str):
         """
         Yapay zeka çıktısının içinden JSON kısmını çekip alır.
@@ -44,18 +242,28 @@ class LLMService:
         Whisper hatalarını düzeltir.
         """
         try:
-            chat_completion = self.client.chat.completions.create(
+            content = await self._complete(
                 messages=[
                     {"role": "system", "content": "Sen bir editörsün. Sadece metindeki bariz ses hatalarını düzelt. Yorum yapma."},
                     {"role": "user", "content": text}
                 ],
-                model=self.model_name, 
                 temperature=0.1,
+                method="correct_transcript",
             )
-            return chat_completion.choices[0].message.content.strip()
-        except Exception:
+            return content.strip()
+        except ProviderUnavailableError:
+            raise
+        except Exception as e:
+            record_fallback("llm", "correct_transcript", e)
             return text
 
+    async def correct_transcripts(self, texts: list, max_concurrency: int = None):
+        """
+        Birden çok segmenti eşzamanlı düzeltir (aynı anda en fazla max_concurrency istek).
+        Sonuçlar girdi sırasıyla döner; toplam süre en uzun çağrı mertebesine iner.
+        """
+        return await self._bounded_gather([lambda t=t: self.correct_transcript(t) for t in texts], max_concurrency)
+
     async def extract_action_items(self, transcript: str):
         """
         Toplantı dökümünden görevleri çıkarır (Tarih Algılama Dahil).
@@ -102,17 +310,16 @@ class LLMService:
         try:
             print(f"🤖 Groq Görev Analizi Başladı... (Ref: {current_date})")
             
-            chat_completion = self.client.chat.completions.create(
+            content = await self._complete(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                model=self.model_name, 
                 temperature=0.1,
-                response_format={"type": "json_object"} 
+                response_format={"type": "json_object"},
+                method="extract_action_items",
             )
-
-            content = chat_completion.choices[0].message.content.strip()
+            content = content.strip()
             data = self._extract_json(content)
             
             tasks = []
@@ -123,14 +330,27 @@ class LLMService:
             print(f"✅ Bulunan Görev Sayısı: {len(tasks)}")
             return tasks
 
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             print(f"❌ Kritik Groq Hatası (Görev): {e}")
+            record_fallback("llm", "extract_action_items", e)
             return []
 
     async def analyze_sentiment(self, transcript: str):
         """
         Toplantının genel duygu durumunu analiz eder.
+        Uzun transkriptler parçalara bölünür; parça sonuçları uzunlukla ağırlıklandırılarak birleştirilir.
         """
+        chunks = split_transcript(transcript, settings.LLM_SUMMARY_CHUNK_CHARS)
+        if len(chunks) <= 1:
+            return await self._analyze_sentiment_chunk(transcript)
+
+        print(f"🧩 Duygu analizi {len(chunks)} parçada yapılıyor...")
+        partials = await self._bounded_gather([lambda c=c: self._analyze_sentiment_chunk(c) for c in chunks])
+        return merge_sentiments(partials, [len(c) for c in chunks])
+
+    async def _analyze_sentiment_chunk(self, transcript: str):
         prompt = """
         Analyze the sentiment of this meeting transcript.
         Output ONLY a JSON object.
@@ -143,55 +363,115 @@ class LLMService:
         (Score 1-10: 1=Very Negative/Tension, 10=Very Positive/Productive)
         """
         try:
-            chat_completion = self.client.chat.completions.create(
+            content = await self._complete(
                 messages=[
                     {"role": "system", "content": prompt},
-                    {"role": "user", "content": transcript[:15000]} 
+                    {"role": "user", "content": transcript}
                 ],
-                model=self.model_name,
                 temperature=0.1,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                method="analyze_sentiment",
             )
-            return self._extract_json(chat_completion.choices[0].message.content)
+            return self._extract_json(content)
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             print(f"❌ Duygu Analizi Hatası: {e}")
+            record_fallback("llm", "analyze_sentiment", e)
             return {"mood": "Nötr", "score": 5}
 
     async def generate_executive_summary(self, transcript: str):
         """
         4 Maddeli Yönetici Özeti Çıkarır.
+        Transkript LLM_SUMMARY_CHUNK_CHARS'tan uzunsa map-reduce uygulanır: konuşmacı/segment
+        sınırlarından bölünen parçalar eşzamanlı özetlenir, ara özetler aynı şemada birleştirilir.
+        Böylece toplantının sonundaki kararlar da özete girer ve her çağrının süresi sınırlı kalır.
         """
-        prompt = """
-        You are an Executive Assistant. Summarize the meeting in Turkish.
-        Output ONLY a JSON object.
-        
-        JSON FORMAT:
-        {
-          "discussions": ["Konuşulan madde 1", "Konuşulan madde 2"],
-          "decisions": ["Alınan karar 1", "Alınan karar 2"],
-          "action_plan": ["Kim ne yapacak (Kısa özet)"],
-          "deadlines": ["Varsa kritik tarihler"]
-        }
-        """
+        chunks = split_transcript(transcript, settings.LLM_SUMMARY_CHUNK_CHARS)
+        if len(chunks) <= 1:
+            return await self._summarize(SUMMARY_PROMPT, transcript)
+
+        print(f"🧩 Özet {len(chunks)} parçada çıkarılıyor (map-reduce)...")
+        partials = await self._bounded_gather([
+            lambda i=i, c=c: self._summarize(
+                SUMMARY_PROMPT + f"\n        Bu metin toplantının {i + 1}/{len(chunks)}. bölümüdür; yalnızca bu bölümü özetle.",
+                c
+            )
+            for i, c in enumerate(chunks)
+        ])
+        return await self._merge_summaries([p for p in partials if p])
+
+    async def _summarize(self, prompt: str, text: str, method: str = "generate_executive_summary"):
         try:
-            chat_completion = self.client.chat.completions.create(
+            content = await self._complete(
                 messages=[
                     {"role": "system", "content": prompt},
-                    {"role": "user", "content": transcript[:15000]}
+                    {"role": "user", "content": text}
                 ],
-                model=self.model_name,
                 temperature=0.1,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                method=method,
             )
-            return self._extract_json(chat_completion.choices[0].message.content)
+            return self._extract_json(content)
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             print(f"❌ Özet Hatası: {e}")
+            record_fallback("llm", method, e)
             return {}
 
-    async def chat_with_context(self, context: str, user_query: str):
+    async def _merge_summaries(self, partials: list):
         """
-        Global veya Yerel fark etmeksizin, verilen Context'e göre soruyu cevaplar.
+        Ara özetleri tek özette birleştirir. Ara özetler bir çağrıya sığmıyorsa
+        gruplar halinde birleştirilip işlem tekrarlanır (hiyerarşik reduce).
+        """
+        if not partials:
+            return {}
+        if len(partials) == 1:
+            return _normalize_summary(partials[0])
+
+        texts = [json.dumps(_normalize_summary(p), ensure_ascii=False) for p in partials]
+        groups = _group_texts(texts, settings.LLM_SUMMARY_CHUNK_CHARS)
+        if len(groups) == len(partials):
+            # Her ara özet tek başına sınırı dolduruyor: birleştirme çağrısı küçültemez
+            return _concat_summaries(partials)
+
+        merged = await self._bounded_gather([
+            lambda g=g: self._summarize(MERGE_PROMPT, "\n".join(texts[i] for i in g), method="merge_summaries")
+            for g in groups
+        ])
+        # Birleştirmesi başarısız olan grup düşürülmez: ara özetleri uç uca eklenir
+        merged = [
+            m if isinstance(m, dict) and m else _concat_summaries([partials[i] for i in g])
+            for m, g in zip(merged, groups)
+        ]
+        if len(merged) == 1:
+            return _normalize_summary(merged[0])
+        return await self._merge_summaries(merged)
+
+    async def _bounded_gather(self, factories: list, max_concurrency: int = None):
+        """
+        Coroutine üreten fonksiyonları en fazla max_concurrency eşzamanlı çalıştırır; sıra korunur.
+        Biri hata verirse (ya da çağıran iptal edilirse) kalanlar iptal edilir: ölmüş bir iş için
+        kuyruktaki çağrılar hız limitini ve devre kesici denemelerini tüketmeye devam etmesin.
         """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.LLM_MAX_CONCURRENCY))
+
+        async def _bounded(factory):
+            async with semaphore:
+                return await factory()
+
+        tasks = [asyncio.ensure_future(_bounded(f)) for f in factories]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def _chat_messages(self, context: str, user_query: str, instructions: str = None) -> list:
         system_prompt = """
         Sen 'Smart', tüm toplantıların verisine hakim akıllı bir asistansın.
         
@@ -203,6 +483,9 @@ class LLMService:
         2. Eğer sorunun cevabı verilerde yoksa "Kayıtlarımda buna dair net bir bilgi bulamadım" de. Uydurma.
         3. Cevabın profesyonel, toparlayıcı ve Türkçe olsun.
         """
+        if instructions:
+            # Çağıranın ek kuralları (ör. tarih bilgisi) tek sistem mesajında toplanır
+            system_prompt += instructions
         
         user_input = f"""
         BULUNAN VERİLER (CONTEXT):
@@ -211,19 +494,56 @@ class LLMService:
         KULLANICI SORUSU:
         {user_query}
         """
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_input}
+        ]
 
+    async def chat_with_context(self, context: str, user_query: str, usage: dict = None, instructions: str = None):
+        """
+        Global veya Yerel fark etmeksizin, verilen Context'e göre soruyu cevaplar.
+        instructions: sistem mesajına eklenecek ek kurallar (bağlamın içine gömülmez).
+        """
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input}
-                ],
-                model=self.model_name,
-                temperature=0.3, 
+            content = await self._complete(
+                messages=self._chat_messages(context, user_query, instructions),
+                temperature=0.3,
+                usage=usage,
+                method="chat_with_context",
+                cache=False,  # Sohbet yanıtları önbelleğe alınmaz
             )
-            return chat_completion.choices[0].message.content.strip()
+            return content.strip()
         except Exception as e:
             print(f"❌ Chat Hatası: {e}")
-            return "Üzgünüm, şu an bağlantı kuramıyorum."
+            record_fallback("llm", "chat_with_context", e)
+            return CHAT_ERROR_MESSAGE
+
+    async def stream_chat_with_context(self, context: str, user_query: str, usage: dict = None, instructions: str = None):
+        """
+        chat_with_context'in akış (streaming) sürümü: yanıtı model ürettikçe parça parça verir.
+        Hata durumunda istisna çağırana iletilir (akış ortasında yanıt değiştirilemez).
+        Hız limiti ve devre kesici uygulanır; akış başladıktan sonra retry yapılmaz.
+        """
+        breaker = self.caller.breaker
+        probe = breaker.before_call()
+        try:
+            await self.caller.bucket.acquire_async()
+            try:
+                async for delta in self.backend.stream(
+                    self._chat_messages(context, user_query, instructions), self.model_name, temperature=0.3, usage=usage
+                ):
+                    yield delta
+            except Exception as e:
+                if is_transient(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()  # Kalıcı hata: sağlayıcı erişilebilir
+                record_fallback("llm", "stream_chat_with_context", e)
+                raise
+            breaker.record_success()
+        finally:
+            # İstemci bağlantıyı koparınca (GeneratorExit / CancelledError) deneme hakkı bırakılır
+            if probe:
+                breaker.release_probe()
 
-llm_service = LLMService()
\ No newline at end of file
+llm_service = LazyService("llm", LLMService)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import asyncio
+from bisect import bisect_right
+from app.core.config import settings
+from app.core.tokens import estimate_tokens
+from app.services.rag_service import rag_service
+
+
+def _line(segment) -> str:
+    return f"{segment.speaker_label}: {segment.text}"
+
+
+def hit_line_indices(segments: list, hits: list) -> list:
+    """
+    İsabetleri başlangıç saniyeleri üzerinden transkript satırlarına eşler (alaka sırası korunur):
+    isabetin saniyesinde ya da ondan önce başlayan son segment.
+    """
+    order = sorted(range(len(segments)), key=lambda i: segments[i].start_time or 0.0)
+    starts = [segments[i].start_time or 0.0 for i in order]
+    indices = []
+    for hit in hits:
+        position = bisect_right(starts, rag_service.hit_timestamp(hit) + 1e-6) - 1
+        indices.append(order[max(0, position)])
+    return indices
+
+
+def pack_segments(lines: list, ranked_indices: list, budget: int, neighbors: int) -> tuple:
+    """
+    Sıralı isabetleri (ve komşu segmentlerini) token bütçesine sığdığı kadar seçer.
+    Seçilen segmentler kronolojik sırada döner; aradaki boşluklar "..." ile belirtilir.
+    Dönüş: (bağlam metni, tahmini token)
+    """
+    selected, used = set(), 0
+    for index in ranked_indices:
+        window = [i for i in range(index - neighbors, index + neighbors + 1) if 0 <= i < len(lines) and i not in selected]
+        # Komşularla sığmıyorsa yalnızca isabet segmentini dene
+        for candidate in (window, [i for i in window if i == index]):
+            cost = sum(estimate_tokens(lines[i]) + 1 for i in candidate)
+            if candidate and used + cost <= budget:
+                selected.update(candidate)
+                used += cost
+                break
+
+    parts, previous = [], None
+    for i in sorted(selected):
+        if previous is not None and i != previous + 1:
+            parts.append("...")
+        parts.append(lines[i])
+        previous = i
+    return "\n".join(parts), used
+
+
+async def build_meeting_context(meeting_id: int, segments: list, query: str) -> dict:
+    """
+    Toplantı sohbeti için LLM bağlamını hazırlar.
+    - Transkript MEETING_CHAT_FULL_TRANSCRIPT_TOKENS'a sığıyorsa tamamı ("full").
+    - Sığmıyorsa toplantı içi hibrit aramayla en alakalı segmentler ve komşuları
+      MEETING_CHAT_CONTEXT_TOKENS bütçesine paketlenir ("retrieval").
+    segments: toplantının TranscriptSegment'leri, hafızaya yazıldığı sırayla (id'ye göre).
+    """
+    lines = [_line(s) for s in segments]
+    full_transcript = "\n".join(lines)
+    full_tokens = estimate_tokens(full_transcript)
+    if full_tokens <= settings.MEETING_CHAT_FULL_TRANSCRIPT_TOKENS:
+        return {"context": full_transcript, "mode": "full", "tokens": full_tokens, "transcript_tokens": full_tokens}
+
+    ranked = []
+    try:
+        hits = await asyncio.to_thread(rag_service.meeting_hits, query, meeting_id, settings.MEETING_CHAT_CANDIDATES)
+        ranked = hit_line_indices(segments, hits)
+    except Exception as e:
+        print(f"⚠️ Toplantı içi arama başarısız (#{meeting_id}): {e}")
+
+    if not ranked:
+        # Hafızada kayıt yoksa (ör. eski toplantı) transkriptin başı bütçe kadar gönderilir
+        ranked = list(range(len(lines)))
+        neighbors = 0
+    else:
+        neighbors = settings.MEETING_CHAT_NEIGHBOR_SEGMENTS
+
+    context, tokens = pack_segments(lines, ranked, settings.MEETING_CHAT_CONTEXT_TOKENS, neighbors)
+    return {"context": context, "mode": "retrieval", "tokens": tokens, "transcript_tokens": full_tokens}
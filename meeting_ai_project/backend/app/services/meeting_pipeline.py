@@ -0,0 +1,269 @@
+import asyncio
+import json
+from sqlalchemy import delete, insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.domain import Meeting, MeetingStatus, TranscriptSegment, ActionItem
+from app.services.audio_service import audio_service
+from app.services.llm_service import llm_service
+from app.services.voice_service import voice_service
+from app.services.voice_profile_cache import voice_profile_cache
+from app.services.rag_service import rag_service
+from app.services.audio_normalizer import normalize_audio, NormalizedAudio
+from app.services.pipeline import Stage, StageGraph, DatabaseStageStore
+
+
+class MeetingContext:
+    """Aşamalar arasında paylaşılan, değişmeyen iş bilgisi."""
+    def __init__(self, meeting_id: int, file_path: str):
+        self.meeting_id = meeting_id
+        self.file_path = file_path
+
+
+# --- AŞAMALAR ---
+
+async def normalize_stage(ctx: MeetingContext, results: dict):
+    """
+    Ses normalizasyonu: Her formatı (m4a, mp3, wav...) akış halinde tek bir
+    16 kHz mono WAV'a çevirir. ASR ve konuşmacı tanıma aynı dosyayı kullanır.
+    """
+    print(f"🔄 Ses normalize ediliyor: {ctx.file_path} -> 16 kHz mono WAV")
+    audio = await asyncio.to_thread(normalize_audio, ctx.file_path)
+
+    async with AsyncSessionLocal() as db:
+        meeting = await db.get(Meeting, ctx.meeting_id)
+        meeting.audio_file_path = audio.path
+        meeting.duration_seconds = audio.duration
+        await db.commit()
+    print(f"✅ Normalizasyon Başarılı! ({audio.duration:.0f} sn)")
+    return {"wav_path": audio.path, "duration": audio.duration}
+
+
+async def transcribe_stage(ctx: MeetingContext, results: dict):
+    """Transkripsiyon."""
+    result = await asyncio.to_thread(audio_service.transcribe, results["normalize"]["wav_path"])
+    return {"segments": result.get("segments", [])}
+
+
+async def load_audio_stage(ctx: MeetingContext, results: dict):
+    """Normalize edilmiş sese bellek eşlemeli erişim. Çıktı saklanmaz (dosyanın kendisi kalıcı)."""
+    return await asyncio.to_thread(NormalizedAudio, results["normalize"]["wav_path"])
+
+
+async def load_profiles_stage(ctx: MeetingContext, results: dict):
+    """Ses profillerini hazırla (süreç içi önbellekten; yalnızca değiştiyse DB'den yeniden yüklenir)."""
+    async with AsyncSessionLocal() as db:
+        return await voice_profile_cache.get_index(db)
+
+
+async def speakers_stage(ctx: MeetingContext, results: dict):
+    """
+    Konuşmacı tanıma: Segmentleri bellekteki sesten dilimle, geçici dosya
+    yazmadan tek seferde vektörleştir. Metin düzeltmeden bağımsızdır.
+    """
+    segments = results["transcribe"]["segments"]
+    profile_index = results["load_profiles"]
+    speaker_names = ["Misafir"] * len(segments)
+    if len(profile_index) == 0:
+        return {"speaker_names": speaker_names}
+
+    audio = results["load_audio"]
+    sample_rate = audio.sample_rate
+    clip_ranges = []
+    for i, seg in enumerate(segments):
+        start_frame = int(seg["start"] * sample_rate)
+        end_frame = int(seg["end"] * sample_rate)
+        if end_frame - start_frame > sample_rate * 0.5:
+            clip_ranges.append((i, start_frame, end_frame))
+
+    # Segmentleri gruplar halinde dilimle: aynı anda yalnızca bir grubun sesi bellekte olur
+    group_size = settings.VOICE_EMBED_BATCH_SIZE * 4
+    for g in range(0, len(clip_ranges), group_size):
+        group = clip_ranges[g:g + group_size]
+        clips = [audio[start:end] for _, start, end in group]
+        vectors = await asyncio.to_thread(voice_service.extract_embeddings_batch, clips, sample_rate)
+        matches = voice_service.identify_speakers_batch(vectors, profile_index, settings.SPEAKER_MATCH_THRESHOLD)
+        for (i, _, _), (name, _) in zip(group, matches):
+            speaker_names[i] = name
+    return {"speaker_names": speaker_names}
+
+
+async def correct_stage(ctx: MeetingContext, results: dict):
+    """Metin düzeltme (Eşzamanlı, sınırlı paralellik, sıra korunur)."""
+    raw_texts = [seg["text"].strip() for seg in results["transcribe"]["segments"]]
+    correct_indices = [i for i, t in enumerate(raw_texts) if len(t) > 5]
+    corrected = await llm_service.correct_transcripts([raw_texts[i] for i in correct_indices])
+    texts = list(raw_texts)
+    for i, text in zip(correct_indices, corrected):
+        texts[i] = text
+    return {"texts": texts}
+
+
+def _segment_rows(ctx: MeetingContext, results: dict) -> list:
+    """Konuşmacı ve düzeltilmiş metni birleştirilmiş segment satırları (DB'ye yazıldığı sırayla)."""
+    return [
+        {
+            "meeting_id": ctx.meeting_id,
+            "start_time": seg["start"],
+            "end_time": seg["end"],
+            "speaker_label": speaker_name,
+            "text": text
+        }
+        for seg, text, speaker_name in zip(
+            results["transcribe"]["segments"], results["correct"]["texts"], results["speakers"]["speaker_names"]
+        )
+    ]
+
+
+async def _replace_rows(model, meeting_id: int, rows: list):
+    """
+    Toplantının eski satırlarını silip yenilerini Core insert (executemany) ile yazar.
+    ORM nesnesi oluşturulmaz; satırlar DB_BULK_INSERT_BATCH_SIZE'lık gruplar halinde commit edilir
+    (binlerce segmentte tek dev transaction yazıcı kilidini uzun süre tutmasın).
+    """
+    batch_size = max(1, settings.DB_BULK_INSERT_BATCH_SIZE)
+    async with AsyncSessionLocal() as db:
+        # Yeniden işlemede (retry) satırlar çiftlenmesin
+        await db.execute(delete(model).where(model.meeting_id == meeting_id))
+        for start in range(0, len(rows), batch_size):
+            await db.execute(insert(model), rows[start:start + batch_size])
+            await db.commit()
+        await db.commit()  # Satır yoksa silme de kalıcı olsun
+
+
+async def transcript_stage(ctx: MeetingContext, results: dict):
+    """Konuşmacı ve düzeltilmiş metni birleştirip segmentleri kaydeder."""
+    rows = _segment_rows(ctx, results)
+    await _replace_rows(TranscriptSegment, ctx.meeting_id, rows)
+    return {"full_transcript": "\n".join(f"{row['speaker_label']}: {row['text']}" for row in rows)}
+
+
+def _has_content(results: dict) -> bool:
+    return len(results["transcript"]["full_transcript"]) > 10
+
+
+async def summary_stage(ctx: MeetingContext, results: dict):
+    """Yönetici özeti."""
+    if not _has_content(results):
+        return None
+    exec_summary_json = await llm_service.generate_executive_summary(results["transcript"]["full_transcript"])
+    async with AsyncSessionLocal() as db:
+        meeting = await db.get(Meeting, ctx.meeting_id)
+        meeting.executive_summary = json.dumps(exec_summary_json, ensure_ascii=False)
+        await db.commit()
+    return exec_summary_json
+
+
+async def sentiment_stage(ctx: MeetingContext, results: dict):
+    """Duygu analizi."""
+    if not _has_content(results):
+        return None
+    sentiment_json = await llm_service.analyze_sentiment(results["transcript"]["full_transcript"])
+    async with AsyncSessionLocal() as db:
+        meeting = await db.get(Meeting, ctx.meeting_id)
+        meeting.sentiment = json.dumps(sentiment_json, ensure_ascii=False)
+        await db.commit()
+    return sentiment_json
+
+
+async def tasks_stage(ctx: MeetingContext, results: dict):
+    """Görev çıkarımı."""
+    if not _has_content(results):
+        return None
+    extracted_tasks = await llm_service.extract_action_items(results["transcript"]["full_transcript"])
+    await _replace_rows(ActionItem, ctx.meeting_id, [
+        {
+            "meeting_id": ctx.meeting_id,
+            "description": task.get("description", "Tanımsız"),
+            "assignee_name": task.get("assignee", "Belirsiz"),
+            "due_date": task.get("due_date"),
+            "status": "pending",
+            "confidence_score": task.get("confidence", 0.0)
+        }
+        for task in extracted_tasks
+    ])
+    return {"count": len(extracted_tasks)}
+
+
+async def memory_stage(ctx: MeetingContext, results: dict):
+    """Kurum hafızasına kaydet (RAG)."""
+    if not _has_content(results):
+        return None
+    print("🧠 Kurum Hafızasına (Vector DB) Kaydediliyor...")
+    # Segmentler DB'den geri okunmaz: transcript aşamasının yazdığı satırlar aynı girdilerden yeniden kurulur
+    segments_list = _segment_rows(ctx, results)
+    async with AsyncSessionLocal() as db:
+        meeting = await db.get(Meeting, ctx.meeting_id)
+        title = meeting.title
+        owner_id = meeting.owner_id
+        team_id = meeting.team_id
+
+    # RAG Servisine gönder (sahip/takım bilgisi aramayı kiracıya göre sınırlar)
+    await asyncio.to_thread(
+        rag_service.add_meeting_to_memory, ctx.meeting_id, segments_list, title, owner_id=owner_id, team_id=team_id
+    )
+    return {"count": len(segments_list)}
+
+
+# Aşama grafiği:
+#   normalize -> transcribe ----------------------> correct ----\
+#            \-> load_audio --\                                  > transcript -> summary | sentiment | tasks | memory
+#   load_profiles ------------> speakers (transcribe'a da bağlı) /
+MEETING_PIPELINE = StageGraph([
+    Stage("normalize", normalize_stage),
+    Stage("transcribe", transcribe_stage, depends_on=("normalize",)),
+    Stage("load_audio", load_audio_stage, depends_on=("normalize",), persist=False),
+    Stage("load_profiles", load_profiles_stage, persist=False),
+    Stage("speakers", speakers_stage, depends_on=("transcribe", "load_audio", "load_profiles")),
+    Stage("correct", correct_stage, depends_on=("transcribe",)),
+    Stage("transcript", transcript_stage, depends_on=("speakers", "correct")),
+    Stage("summary", summary_stage, depends_on=("transcript",)),
+    Stage("sentiment", sentiment_stage, depends_on=("transcript",)),
+    Stage("tasks", tasks_stage, depends_on=("transcript",)),
+    Stage("memory", memory_stage, depends_on=("transcript",)),
+])
+
+
+async def process_meeting_task(meeting_id: int, file_path: str, mark_failed: bool = True, raise_errors: bool = False,
+                               pipeline: StageGraph = None, timings: dict = None):
+    """
+    Toplantıyı uçtan uca analiz eder.
+    mark_failed: Hata durumunda toplantı FAILED'a çekilsin mi? (Worker, tekrar denenecek işlerde False verir.)
+    raise_errors: Hata yutulmasın, çağırana iletilsin mi? (Worker'ın retry mantığı için.)
+    pipeline: Koşturulacak aşama grafiği (varsayılan MEETING_PIPELINE).
+    timings: Verilirse {aşama_adı: süre_sn} ile doldurulur (benchmark için).
+    """
+    print(f"🚀 Meeting ID {meeting_id} için analiz başladı...")
+
+    try:
+        # 1. Durumu Güncelle -> PROCESSING
+        async with AsyncSessionLocal() as db:
+            meeting = await db.get(Meeting, meeting_id)
+            if not meeting: return
+            meeting.status = MeetingStatus.PROCESSING
+            await db.commit()
+
+        # 2. Aşama grafiğini koştur (tamamlanmış aşamalar atlanır)
+        await (pipeline or MEETING_PIPELINE).run(
+            MeetingContext(meeting_id, file_path), store=DatabaseStageStore(meeting_id), timings=timings
+        )
+
+        async with AsyncSessionLocal() as db:
+            final_meeting = await db.get(Meeting, meeting_id)
+            final_meeting.status = MeetingStatus.COMPLETED
+            await db.commit()
+        print(f"✅ TÜM ANALİZLER BAŞARIYLA TAMAMLANDI: Meeting {meeting_id}")
+
+    except Exception as e:
+        print(f"❌ Arka Plan Görevi Hatası: {e}")
+        if mark_failed:
+            try:
+                async with AsyncSessionLocal() as db:
+                    err_meeting = await db.get(Meeting, meeting_id)
+                    if err_meeting:
+                        err_meeting.status = MeetingStatus.FAILED
+                        await db.commit()
+            except:
+                pass
+        if raise_errors:
+            raise
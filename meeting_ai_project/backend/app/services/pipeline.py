@@ -0,0 +1,196 @@
+import asyncio
+import json
+import time
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.models.domain import PipelineStageResult
+
+
+class Stage:
+    """
+    Pipeline'daki tek bir adım.
+    func: `async def func(ctx, results)` -> bağımlılıkların çıktıları `results` içinde gelir.
+    persist: Çıktı JSON'a çevrilip saklanır mı? (Ses dizisi gibi büyük/geçici
+    çıktılar saklanmaz; gerektiğinde yeniden hesaplanır.)
+    """
+    def __init__(self, name: str, func, depends_on: tuple = (), persist: bool = True):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.persist = persist
+
+
+class StageStore:
+    """Aşama sonuçlarını saklamayan varsayılan depo (Testler / tek seferlik koşular için)."""
+
+    async def load(self) -> dict:
+        return {}
+
+    async def save(self, stage: str, output, duration: float):
+        pass
+
+    async def fail(self, stage: str, error: str, duration: float):
+        pass
+
+
+class DatabaseStageStore(StageStore):
+    """Aşama sonuçlarını `pipeline_stage_results` tablosunda toplantı bazında saklar."""
+
+    def __init__(self, meeting_id: int):
+        self.meeting_id = meeting_id
+
+    async def load(self) -> dict:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(PipelineStageResult).where(
+                    (PipelineStageResult.meeting_id == self.meeting_id) &
+                    (PipelineStageResult.status == "completed")
+                )
+            )
+            return {row.stage: json.loads(row.output) if row.output else None for row in result.scalars().all()}
+
+    async def _upsert(self, stage: str, **values):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(PipelineStageResult).where(
+                    (PipelineStageResult.meeting_id == self.meeting_id) &
+                    (PipelineStageResult.stage == stage)
+                )
+            )
+            row = result.scalars().first()
+            if row is None:
+                row = PipelineStageResult(meeting_id=self.meeting_id, stage=stage)
+                db.add(row)
+            for key, value in values.items():
+                setattr(row, key, value)
+            await db.commit()
+
+    async def save(self, stage: str, output, duration: float):
+        await self._upsert(
+            stage,
+            status="completed",
+            output=json.dumps(output, ensure_ascii=False),
+            duration_ms=duration * 1000,
+            error=None
+        )
+
+    async def fail(self, stage: str, error: str, duration: float):
+        await self._upsert(stage, status="failed", duration_ms=duration * 1000, error=error[:2000])
+
+
+class StageGraph:
+    """
+    Bağımlılıkları bildirilmiş aşamalardan oluşan DAG.
+    Bağımlılıkları tamamlanan her aşama hemen başlatılır; birbirinden bağımsız
+    aşamalar eşzamanlı koşar. Toplam süre, tüm aşamaların toplamı yerine
+    kritik yol tarafından belirlenir.
+    """
+
+    def __init__(self, stages: list):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Aynı isimde birden fazla aşama var")
+        for stage in stages:
+            for dep in stage.depends_on:
+                if dep not in self.stages:
+                    raise ValueError(f"'{stage.name}' aşaması bilinmeyen '{dep}' aşamasına bağlı")
+        self._check_acyclic()
+
+    def without(self, *names) -> "StageGraph":
+        """
+        Verilen aşamalar çıkarılmış yeni graf (örn. benchmark'ta hafıza aşamasını atlamak için).
+        Çıkarılan bir aşamaya bağlı aşama kalırsa ValueError fırlatılır.
+        """
+        unknown = set(names) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Bilinmeyen aşama(lar): {', '.join(sorted(unknown))}")
+        return StageGraph([stage for name, stage in self.stages.items() if name not in names])
+
+    def _check_acyclic(self):
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Aşama grafiğinde döngü var: '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _required(self, completed: dict) -> set:
+        """
+        Koşması gereken aşamalar: saklanmış sonucu olmayanlar ve bunların
+        sonucu saklanmayan (persist=False) bağımlılıkları.
+        """
+        required = set()
+
+        def need(name):
+            if name in required:
+                return
+            required.add(name)
+            for dep in self.stages[name].depends_on:
+                if dep not in completed:
+                    need(dep)
+
+        for name in self.stages:
+            if name not in completed:
+                need(name)
+        return required
+
+    async def run(self, ctx, store: StageStore = None, timings: dict = None) -> dict:
+        """
+        Grafı koşturur ve {aşama_adı: çıktı} sözlüğünü döner.
+        Depoda tamamlanmış görünen aşamalar tekrar koşmaz (kaldığı yerden devam).
+        Bir aşama hata verirse bekleyen aşamalar iptal edilir ve hata yükseltilir.
+        """
+        store = store or StageStore()
+        completed = {
+            name: output for name, output in (await store.load()).items()
+            if name in self.stages and self.stages[name].persist
+        }
+        required = self._required(completed)
+
+        results = dict(completed)
+        events = {name: asyncio.Event() for name in self.stages}
+        for name in completed:
+            if name not in required:
+                events[name].set()
+
+        async def run_stage(stage: Stage):
+            for dep in stage.depends_on:
+                await events[dep].wait()
+
+            started = time.perf_counter()
+            try:
+                output = await stage.func(ctx, results)
+            except Exception as e:
+                duration = time.perf_counter() - started
+                if stage.persist:
+                    await store.fail(stage.name, f"{type(e).__name__}: {e}", duration)
+                raise
+            duration = time.perf_counter() - started
+
+            results[stage.name] = output
+            if timings is not None:
+                timings[stage.name] = duration
+            if stage.persist:
+                await store.save(stage.name, output, duration)
+            print(f"⏱️ Aşama '{stage.name}' tamamlandı ({duration:.2f} sn)")
+            events[stage.name].set()
+
+        tasks = [asyncio.create_task(run_stage(self.stages[name])) for name in required]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return results
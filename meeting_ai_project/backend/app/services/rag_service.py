@@ -1,10 +1,61 @@
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
 import os
+import re
+from app.core.config import settings
+from app.core.cache import TTLCache, TagGenerations
+from app.core.lazy import LazyService
+from app.services.lexical_index import LexicalIndex
+
+
+def normalize_query(query: str) -> str:
+    """Önbellek anahtarı için soruyu sadeleştir (Türkçe büyük/küçük harf, boşluk, noktalama)."""
+    query = query.replace("I", "ı").replace("İ", "i").lower()
+    query = re.sub(r"\s+", " ", query)
+    return query.strip(" \t\n?!.,;:")
+
+
+# Chroma metadata değerleri None olamaz: sahipsiz/takımsız kayıtlar için işaret değerleri
+NO_OWNER = -1
+NO_TEAM = -1
+TENANT_BACKFILL_KEY = "tenant_backfill_v1"
+
+
+def reciprocal_rank_fusion(result_lists: list, limit: int, k: int = None) -> list:
+    """
+    Farklı yöntemlerin sıralamalarını birleştirir: skor = Σ 1 / (k + sıra).
+    Skor ölçekleri (cosine, BM25) karşılaştırılamadığı için yalnızca sıra kullanılır.
+    """
+    k = k if k is not None else settings.RAG_RRF_K
+    scores, hits = {}, {}
+    for results in result_lists:
+        for rank, hit in enumerate(results, start=1):
+            scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (k + rank)
+            hits.setdefault(hit["id"], hit)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [hits[doc_id] for doc_id in ranked]
+
+
+def scope_filter(owner_id: int, team_ids=()) -> dict:
+    """Chroma metadata filtresi: kullanıcının kendi toplantıları + üyesi olduğu takımların toplantıları."""
+    if not team_ids:
+        return {"owner_id": owner_id}
+    return {"$or": [{"owner_id": owner_id}, {"team_id": {"$in": list(team_ids)}}]}
+
+
+def scope_tags(owner_id: int = None, team_ids=()) -> tuple:
+    if owner_id is None:
+        return ("all",)
+    return ("all", f"tenant:{owner_id}") + tuple(f"team:{team_id}" for team_id in team_ids)
+
+
+def format_hit(hit: dict) -> str:
+    return f"[Toplantı: {hit['metadata']['title']}] {hit['document']}"
 
 class RagService:
     def __init__(self):
+        # Ağır bağımlılıklar yalnızca servis ilk kullanıldığında yüklenir
+        import chromadb
+        from sentence_transformers import SentenceTransformer
+
         # 1. Vektör Veritabanını Başlat (Yerel Klasöre Kaydeder)
         self.chroma_client = chromadb.PersistentClient(path="chroma_db")
         
@@ -21,75 +72,238 @@ class RagService:
         self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
         print("✅ AI Hafıza Hazır!")
 
-    def add_meeting_to_memory(self, meeting_id: int, segments: list, title: str):
+        # 4. Kelime bazlı (BM25) indeks: isim, proje kodu ve sayılar için
+        self.lexical_index = LexicalIndex(settings.LEXICAL_INDEX_PATH)
+        if self.lexical_index.count() == 0 and self.transcript_collection.count() > 0:
+            self._backfill_lexical_index()
+
+        # 5. Önbellekler: Aynı sorular tekrar tekrar vektöre çevrilip aranmasın
+        self.query_cache = TTLCache("rag_query_embedding", settings.RAG_QUERY_CACHE_SIZE, settings.RAG_QUERY_CACHE_TTL)
+        self.result_cache = TTLCache(
+            "rag_retrieval", settings.RAG_RESULT_CACHE_SIZE, settings.RAG_RESULT_CACHE_TTL,
+            generations=TagGenerations(settings.CACHE_STATE_PATH)
+        )
+
+    @staticmethod
+    def segment_id(meeting_id: int, index: int) -> str:
+        """Toplantı içindeki sıra numarasından türetilen, çakışmayan ve deterministik ID."""
+        return f"meet_{meeting_id}_seg_{index:05d}"
+
+    @staticmethod
+    def segment_index(segment_id: str):
         """
-        Toplantı bittiğinde tüm konuşmaları vektör veritabanına ekler.
+        segment_id'nin tersi: "meet_1_seg_00042" -> 42. Eski biçimdeki ID'lerde
+        (meet_1_seg_{saniye}, sıfır dolgusuz) sıra bilinmez: None döner.
+        """
+        suffix = segment_id.rsplit("_", 1)[-1]
+        if len(suffix) == 5 and suffix.startswith("0") and suffix.isdigit():
+            return int(suffix)
+        return None
+
+    @staticmethod
+    def hit_timestamp(hit: dict) -> float:
+        """
+        İsabetin toplantı içindeki başlangıç saniyesi (metadata). Sıra ID'den çıkarılmaz:
+        eski kayıtların ID'leri (meet_1_seg_{saniye}) sıra numarası değil saniye taşır.
         """
-        ids = []
-        documents = []
-        metadatas = []
-        embeddings = []
+        return float(hit["metadata"].get("timestamp") or 0.0)
 
+    def _invalidate(self, owner_id: int = None, team_id: int = None, meeting_id: int = None):
+        """
+        Hafıza değişince yalnızca etkilenen kapsamların (sahip, takım) arama sonuçlarını
+        düşür. Kapsamsız ("all") aramalar her değişiklikte düşer.
+        """
+        tags = ["all"]
+        if owner_id is not None:
+            tags.append(f"tenant:{owner_id}")
+        if team_id is not None:
+            tags.append(f"team:{team_id}")
+        if meeting_id is not None:
+            tags.append(f"meeting:{meeting_id}")
+        self.result_cache.invalidate_tags(*tags)
+
+    def _backfill_lexical_index(self):
+        """Lexical indeks sonradan eklendi: mevcut Chroma kayıtlarından bir kez doldurulur."""
+        data = self.transcript_collection.get(include=["documents", "metadatas"])
+        by_meeting = {}
+        for doc_id, document, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+            by_meeting.setdefault(metadata["meeting_id"], []).append((doc_id, document, metadata))
+        for meeting_id, rows in by_meeting.items():
+            ids, documents, metadatas = zip(*sorted(rows))
+            owner_id, team_id = metadatas[0].get("owner_id", NO_OWNER), metadatas[0].get("team_id", NO_TEAM)
+            self.lexical_index.replace_meeting(
+                meeting_id, list(ids), list(documents), list(metadatas),
+                owner_id=None if owner_id == NO_OWNER else owner_id,
+                team_id=None if team_id == NO_TEAM else team_id
+            )
+        print(f"🔤 Kelime indeksi mevcut hafızadan oluşturuldu ({len(data['ids'])} parça)")
+
+    def add_meeting_to_memory(self, meeting_id: int, segments: list, title: str, batch_size: int = None,
+                              owner_id: int = None, team_id: int = None):
+        """
+        Toplantı bittiğinde tüm konuşmaları vektör veritabanına ekler.
+        Metinler toplu (batch) halde vektöre çevrilir ve upsert edilir; aynı
+        toplantı yeniden işlenirse kayıtlar çiftlenmez, eski fazlalar silinir.
+        Kayıtlar sahip ve takım bilgisiyle etiketlenir; arama bu kapsamla filtrelenir.
+        """
+        batch_size = batch_size or settings.RAG_EMBED_BATCH_SIZE
         print(f"📥 Meeting #{meeting_id} hafızaya işleniyor...")
 
-        # Her segmenti (cümle grubunu) tek tek işle
-        for segment in segments:
-            # Metin: "Ali: Bütçeyi onayladık."
-            text_content = f"{segment['speaker_label']}: {segment['text']}"
-            
-            # Vektöre Çevir
-            vector = self.embedding_model.encode(text_content).tolist()
-            
-            # Listelere Ekle
-            # ID formatı: meet_1_seg_0, meet_1_seg_1...
-            seg_id = f"meet_{meeting_id}_seg_{int(segment['start_time'])}"
-            
-            ids.append(seg_id)
-            documents.append(text_content)
-            embeddings.append(vector)
-            metadatas.append({
-                "meeting_id": meeting_id,
-                "title": title,
-                "timestamp": segment['start_time']
-            })
-
-        # Toplu halde ChromaDB'ye kaydet
-        if ids:
-            self.transcript_collection.add(
-                ids=ids,
-                documents=documents,
-                embeddings=embeddings,
-                metadatas=metadatas
+        # Metin: "Ali: Bütçeyi onayladık."
+        documents = [f"{segment['speaker_label']}: {segment['text']}" for segment in segments]
+        # ID formatı: meet_1_seg_00000, meet_1_seg_00001... (aynı saniyede başlayan segmentler çakışmaz)
+        ids = [self.segment_id(meeting_id, i) for i in range(len(segments))]
+        metadatas = [{
+            "meeting_id": meeting_id,
+            "title": title,
+            "timestamp": segment['start_time'],
+            "owner_id": owner_id if owner_id is not None else NO_OWNER,
+            "team_id": team_id if team_id is not None else NO_TEAM
+        } for segment in segments]
+
+        # Yeniden işlemede önceki (belki daha fazla sayıda) segmentleri temizle
+        self.transcript_collection.delete(where={"meeting_id": meeting_id})
+        self.lexical_index.replace_meeting(meeting_id, ids, documents, metadatas, owner_id=owner_id, team_id=team_id)
+        self._invalidate(owner_id, team_id, meeting_id)
+        if not ids:
+            return
+
+        # Vektöre Çevir (Toplu ileri geçiş)
+        embeddings = self.embedding_model.encode(
+            documents, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+        ).tolist()
+
+        # Toplu halde ChromaDB'ye kaydet (idempotent)
+        step = settings.RAG_UPSERT_BATCH_SIZE
+        for start in range(0, len(ids), step):
+            self.transcript_collection.upsert(
+                ids=ids[start:start + step],
+                documents=documents[start:start + step],
+                embeddings=embeddings[start:start + step],
+                metadatas=metadatas[start:start + step]
             )
-            print(f"✅ Meeting #{meeting_id} hafızaya kaydedildi ({len(ids)} parça).")
+        self._invalidate(owner_id, team_id, meeting_id)
+        print(f"✅ Meeting #{meeting_id} hafızaya kaydedildi ({len(ids)} parça).")
+
+    def embed_query(self, query: str) -> list:
+        """Soruyu vektöre çevirir (normalize edilmiş soru bazında önbellekli)."""
+        return self.query_cache.get_or_compute(
+            normalize_query(query),
+            lambda: self.embedding_model.encode(query).tolist()
+        )
 
-    def search_memory(self, query: str, limit: int = 5):
+    def search_hits(self, query: str, limit: int = 5, owner_id: int = None, team_ids=()) -> list:
         """
-        Kullanıcının sorusunu vektöre çevirip en alakalı geçmiş konuşmaları bulur.
+        Vektör araması yapar ve ham sonuçları döner: [{"id", "document", "metadata"}, ...]
+        owner_id verilirse yalnızca kullanıcının ve takımlarının toplantılarında aranır.
+        Sonuçlar (kapsam, soru, limit) bazında önbelleklenir; kapsam değişince düşer.
         """
-        # 1. Soruyu vektöre çevir
-        query_vector = self.embedding_model.encode(query).tolist()
-        
-        # 2. Vektör veritabanında ara
-        results = self.transcript_collection.query(
-            query_embeddings=[query_vector],
-            n_results=limit
+        team_ids = tuple(sorted(team_ids))
+        def _search():
+            # 1. Soruyu vektöre çevir
+            query_vector = self.embed_query(query)
+
+            # 2. Vektör veritabanında ara
+            results = self.transcript_collection.query(
+                query_embeddings=[query_vector],
+                n_results=limit,
+                where=scope_filter(owner_id, team_ids) if owner_id is not None else None
+            )
+
+            hits = []
+            if results['documents']:
+                for i, doc in enumerate(results['documents'][0]):
+                    hits.append({
+                        "id": results['ids'][0][i],
+                        "document": doc,
+                        "metadata": results['metadatas'][0][i]
+                    })
+            return hits
+
+        return self.result_cache.get_or_compute(
+            ("vector", owner_id, team_ids, normalize_query(query), limit), _search, tags=scope_tags(owner_id, team_ids)
         )
-        
-        # 3. Sonuçları temizle ve döndür
-        found_docs = []
-        if results['documents']:
-            for i, doc in enumerate(results['documents'][0]):
-                meta = results['metadatas'][0][i]
-                found_docs.append(f"[Toplantı: {meta['title']}] {doc}")
-                
-        return found_docs
-
-    def delete_meeting_memory(self, meeting_id: int):
+
+    def lexical_hits(self, query: str, limit: int = 5, owner_id: int = None, team_ids=()) -> list:
+        """BM25 araması; search_hits ile aynı kapsam, sonuç biçimi ve önbellek kuralları."""
+        team_ids = tuple(sorted(team_ids))
+        return self.result_cache.get_or_compute(
+            ("lexical", owner_id, team_ids, normalize_query(query), limit),
+            lambda: self.lexical_index.search(query, limit, owner_id=owner_id, team_ids=team_ids),
+            tags=scope_tags(owner_id, team_ids)
+        )
+
+    def meeting_hits(self, query: str, meeting_id: int, limit: int = 10) -> list:
+        """
+        Tek bir toplantı içinde hibrit arama (vektör + BM25, RRF ile birleştirilmiş).
+        Toplantı sohbetinde transkriptin tamamı yerine en alakalı segmentleri bulmak için.
+        """
+        def _search():
+            results = self.transcript_collection.query(
+                query_embeddings=[self.embed_query(query)],
+                n_results=limit,
+                where={"meeting_id": meeting_id}
+            )
+            vector_hits = [
+                {"id": doc_id, "document": doc, "metadata": meta}
+                for doc_id, doc, meta in zip(results['ids'][0], results['documents'][0], results['metadatas'][0])
+            ] if results['documents'] else []
+            lexical_hits = self.lexical_index.search(query, limit, meeting_id=meeting_id)
+            return reciprocal_rank_fusion([vector_hits, lexical_hits], limit=limit)
+
+        return self.result_cache.get_or_compute(
+            ("meeting", meeting_id, normalize_query(query), limit), _search, tags=("all", f"meeting:{meeting_id}")
+        )
+
+    def search_memory(self, query: str, limit: int = 5, owner_id: int = None, team_ids=()):
+        """
+        Kullanıcının sorusunu vektöre çevirip en alakalı geçmiş konuşmaları bulur.
+        """
+        # Sonuçları temizle ve döndür
+        return [format_hit(hit) for hit in self.search_hits(query, limit, owner_id, team_ids)]
+
+    def delete_meeting_memory(self, meeting_id: int, owner_id: int = None, team_id: int = None):
         """Toplantı silinirse hafızadan da sil."""
         self.transcript_collection.delete(
             where={"meeting_id": meeting_id}
         )
+        self.lexical_index.delete_meeting(meeting_id)
+        self._invalidate(owner_id, team_id, meeting_id)
+
+    def backfill_tenants(self, meeting_tenants: dict) -> int:
+        """
+        Kapsam etiketi olmadan kaydedilmiş eski segmentlere sahip/takım bilgisini yazar.
+        meeting_tenants: {meeting_id: (owner_id, team_id)}. Bir kez çalışır; güncellenen kayıt sayısını döner.
+        """
+        if self.lexical_index.get_meta(TENANT_BACKFILL_KEY):
+            return 0
+        data = self.transcript_collection.get(include=["documents", "metadatas"])
+        by_meeting = {}
+        for doc_id, document, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+            if "owner_id" not in metadata:
+                by_meeting.setdefault(metadata["meeting_id"], []).append((doc_id, document, metadata))
+
+        updated = 0
+        for meeting_id, rows in by_meeting.items():
+            owner_id, team_id = meeting_tenants.get(meeting_id, (None, None))
+            ids, documents, metadatas = zip(*sorted(rows))
+            metadatas = [
+                {**metadata, "owner_id": owner_id if owner_id is not None else NO_OWNER,
+                 "team_id": team_id if team_id is not None else NO_TEAM}
+                for metadata in metadatas
+            ]
+            self.transcript_collection.update(ids=list(ids), metadatas=metadatas)
+            self.lexical_index.replace_meeting(meeting_id, list(ids), list(documents), metadatas, owner_id=owner_id, team_id=team_id)
+            updated += len(ids)
+        self.lexical_index.set_meta(TENANT_BACKFILL_KEY, "1")
+        self.result_cache.invalidate_tags("all")
+        return updated
+
+    def cache_stats(self) -> dict:
+        return {
+            "query_embedding": self.query_cache.stats(),
+            "retrieval": self.result_cache.stats()
+        }
 
 # Servisi başlat
-rag_service = RagService()
\ No newline at end of file
+rag_service = LazyService("rag", RagService)
@@ -0,0 +1,286 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import time
+import uuid
+from app.core.config import settings
+
+try:
+    import fcntl  # Süreçler arası oturum kilidi (POSIX)
+except ImportError:  # Windows: kilit yalnızca süreç içi, parçalı yükleme tek API süreci gerektirir
+    fcntl = None
+
+
+class UploadTooLargeError(Exception):
+    """Dosya UPLOAD_MAX_BYTES sınırını aştı."""
+
+
+class UploadOffsetMismatchError(Exception):
+    """İstemcinin gönderdiği parça, sunucudaki mevcut ofsete denk gelmiyor."""
+    def __init__(self, expected_offset: int):
+        super().__init__(f"Beklenen ofset: {expected_offset}")
+        self.expected_offset = expected_offset
+
+
+class UploadNotFoundError(Exception):
+    """Yükleme oturumu bulunamadı (süresi dolmuş veya hiç açılmamış)."""
+
+
+class UploadIncompleteError(Exception):
+    """Yükleme tamamlanmadan bitirilmeye çalışıldı."""
+
+
+class UploadChecksumError(Exception):
+    """İstemcinin bildirdiği SHA-256 ile sunucuda hesaplanan uyuşmuyor."""
+
+
+def safe_filename(user_id: int, filename: str) -> str:
+    """
+    Dosya ismini güvenli hale getir (Kullanıcı ID'si ile başlasın). Her çağrıda benzersizdir:
+    aynı isimli iki yükleme (ve .16k.wav yan dosyaları) birbirinin üzerine yazılmaz, kuyruktaki
+    ya da tekrar denenen iş yanlış toplantının sesini işlemez.
+    """
+    base = os.path.basename(filename or "kayit").replace(" ", "_")
+    return f"user_{user_id}_{uuid.uuid4().hex}_{base}"
+
+
+async def _write_chunks(chunks, buffer, hasher, max_bytes: int, start: int = 0) -> int:
+    """Asenkron parça akışını diske yazar; boyutu sınırlar ve hash'i yazarken hesaplar."""
+    size = start
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadTooLargeError(f"Dosya boyutu sınırı aşıldı ({max_bytes} bayt)")
+        if hasher is not None:
+            hasher.update(chunk)
+        # Disk yazımı event loop'u bloklamasın
+        await asyncio.to_thread(buffer.write, chunk)
+    return size
+
+
+async def _iter_upload_file(file, chunk_size: int):
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def save_upload_file(file, dest_path: str, max_bytes: int = None):
+    """
+    UploadFile'ı parça parça, event loop'u bloklamadan diske yazar.
+    Dönüş: (boyut, sha256_hex). Sınır aşılırsa yarım dosya silinir ve UploadTooLargeError yükselir.
+    """
+    max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+    hasher = hashlib.sha256()
+    buffer = await asyncio.to_thread(open, dest_path, "wb")
+    try:
+        size = await _write_chunks(_iter_upload_file(file, settings.UPLOAD_CHUNK_BYTES), buffer, hasher, max_bytes)
+    except BaseException:
+        await asyncio.to_thread(buffer.close)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    await asyncio.to_thread(buffer.close)
+    return size, hasher.hexdigest()
+
+
+class ResumableUploadStore:
+    """
+    Kaldığı yerden devam edebilen parçalı yüklemeler.
+    Her oturum `uploads/.partial/` altında bir veri dosyası ve bir JSON
+    meta dosyasıyla tutulur; mevcut ofset her zaman veri dosyasının boyutudur,
+    böylece bağlantı kopsa da sunucu yeniden başlasa da durum kaybolmaz.
+    - Ekleme/bitirme meta dosyası üzerinde flock ile sıralanır: birden fazla uvicorn
+      worker'ı aynı parçayı aynı dosyaya iki kez ekleyemez.
+    - ttl_seconds içinde bitirilmeyen oturumlar (dosyalar ve süreç içi durum) silinir.
+    """
+
+    _SWEEP_INTERVAL = 600  # Süresi dolan oturum taraması en fazla bu sıklıkla (sn)
+
+    def __init__(self, root: str, ttl_seconds: float = None):
+        self.root = root
+        self.ttl_seconds = settings.RESUMABLE_UPLOAD_TTL if ttl_seconds is None else ttl_seconds
+        # Sıralı parçalarda hash'i tekrar okumadan devam ettirmek için süreç içi durum
+        self._hashers = {}
+        self._locks = {}
+        self._last_sweep = 0.0
+
+    def _paths(self, upload_id: str):
+        return os.path.join(self.root, f"{upload_id}.part"), os.path.join(self.root, f"{upload_id}.json")
+
+    def _lock(self, upload_id: str) -> asyncio.Lock:
+        lock = self._locks.get(upload_id)
+        if lock is None:
+            lock = self._locks[upload_id] = asyncio.Lock()
+        return lock
+
+    @contextlib.asynccontextmanager
+    async def _session_lock(self, upload_id: str):
+        """Süreç içi asyncio kilidi + (POSIX'te) meta dosyası üzerinde süreçler arası flock."""
+        _, meta_path = self._paths(upload_id)
+        async with self._lock(upload_id):
+            try:
+                handle = await asyncio.to_thread(open, meta_path, "rb")
+            except FileNotFoundError:
+                raise UploadNotFoundError(upload_id)
+            try:
+                if fcntl is not None:
+                    await asyncio.to_thread(fcntl.flock, handle.fileno(), fcntl.LOCK_EX)
+                yield
+            finally:
+                handle.close()  # Kapatmak flock'u da bırakır
+
+    def _forget(self, upload_id: str):
+        self._hashers.pop(upload_id, None)
+        lock = self._locks.get(upload_id)
+        if lock is not None and not lock.locked():
+            del self._locks[upload_id]
+
+    def _remove_files(self, upload_id: str):
+        for path in self._paths(upload_id):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def _expired(self, meta: dict) -> bool:
+        return time.time() - meta.get("created_at", 0) > self.ttl_seconds
+
+    def sweep(self, force: bool = False) -> int:
+        """
+        Süresi dolan oturumları siler ve bitmiş/silinmiş oturumların süreç içi durumunu bırakır.
+        Kullanımdaki (kilitli) oturumlara dokunulmaz. Silinen oturum sayısını döner.
+        """
+        now = time.time()
+        if not force and now - self._last_sweep < self._SWEEP_INTERVAL:
+            return 0
+        self._last_sweep = now
+        removed = 0
+        names = os.listdir(self.root) if os.path.isdir(self.root) else []
+        for name in names:
+            upload_id, ext = os.path.splitext(name)
+            path = os.path.join(self.root, name)
+            if ext == ".json":
+                try:
+                    with open(path, "rb") as handle:
+                        if fcntl is not None:
+                            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        if not self._expired(json.load(handle)):
+                            continue
+                        self._remove_files(upload_id)
+                except (BlockingIOError, FileNotFoundError, ValueError):
+                    continue
+                removed += 1
+            elif ext == ".part" and not os.path.exists(os.path.join(self.root, f"{upload_id}.json")):
+                # Meta dosyası olmayan yetim veri dosyası (ör. yarıda kalan oluşturma)
+                with contextlib.suppress(FileNotFoundError):
+                    if now - os.path.getmtime(path) > self.ttl_seconds:
+                        os.remove(path)
+        for upload_id in set(self._hashers) | set(self._locks):
+            if not os.path.exists(self._paths(upload_id)[1]):
+                self._forget(upload_id)
+        if removed:
+            print(f"🧹 {removed} süresi dolmuş parçalı yükleme silindi.")
+        return removed
+
+    def create(self, owner_id: int, filename: str, size: int, title: str) -> dict:
+        if size <= 0 or size > settings.UPLOAD_MAX_BYTES:
+            raise UploadTooLargeError(f"Dosya boyutu sınırı aşıldı ({settings.UPLOAD_MAX_BYTES} bayt)")
+        os.makedirs(self.root, exist_ok=True)
+        self.sweep()
+        upload_id = uuid.uuid4().hex
+        data_path, meta_path = self._paths(upload_id)
+        meta = {
+            "upload_id": upload_id,
+            "owner_id": owner_id,
+            "filename": filename,
+            "size": size,
+            "title": title,
+            "created_at": time.time()
+        }
+        open(data_path, "wb").close()
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        self._hashers[upload_id] = (0, hashlib.sha256())
+        return meta
+
+    def get(self, upload_id: str, owner_id: int) -> dict:
+        data_path, meta_path = self._paths(upload_id)
+        if not os.path.exists(meta_path) or not os.path.exists(data_path):
+            raise UploadNotFoundError(upload_id)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["owner_id"] != owner_id:
+            raise UploadNotFoundError(upload_id)
+        if self._expired(meta):
+            raise UploadNotFoundError(upload_id)
+        meta["offset"] = os.path.getsize(data_path)
+        return meta
+
+    async def append(self, upload_id: str, owner_id: int, offset: int, chunks) -> int:
+        """Parçayı `offset` konumuna ekler ve yeni ofseti döner."""
+        async with self._session_lock(upload_id):
+            meta = await asyncio.to_thread(self.get, upload_id, owner_id)
+            if offset != meta["offset"]:
+                raise UploadOffsetMismatchError(meta["offset"])
+
+            data_path, _ = self._paths(upload_id)
+            hashed_upto, hasher = self._hashers.get(upload_id, (None, None))
+            if hashed_upto != offset:
+                hasher = None  # Süreç değişmiş / sıra bozulmuş: hash'i bitirirken dosyadan hesaplanır
+
+            buffer = await asyncio.to_thread(open, data_path, "ab")
+            try:
+                new_offset = await _write_chunks(chunks, buffer, hasher, meta["size"], start=offset)
+            except BaseException as e:
+                # Hasher reddedilen/yarım kalan baytları da gördü: bitirirken dosyadan hesaplansın
+                self._hashers.pop(upload_id, None)
+                if isinstance(e, UploadTooLargeError):
+                    await asyncio.to_thread(buffer.truncate, offset)
+                raise
+            finally:
+                await asyncio.to_thread(buffer.close)
+
+            if hasher is not None:
+                self._hashers[upload_id] = (new_offset, hasher)
+            else:
+                self._hashers.pop(upload_id, None)
+            return new_offset
+
+    def _file_sha256(self, path: str) -> str:
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(settings.UPLOAD_CHUNK_BYTES), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    async def finish(self, upload_id: str, owner_id: int, dest_path: str, expected_sha256: str = None):
+        """
+        Yüklemeyi bitirir, dosyayı kalıcı yerine taşır.
+        Dönüş: (meta, sha256_hex).
+        """
+        async with self._session_lock(upload_id):
+            meta = await asyncio.to_thread(self.get, upload_id, owner_id)
+            if meta["offset"] != meta["size"]:
+                raise UploadIncompleteError(f"{meta['offset']}/{meta['size']} bayt alındı")
+
+            data_path, meta_path = self._paths(upload_id)
+            hashed_upto, hasher = self._hashers.pop(upload_id, (None, None))
+            if hasher is not None and hashed_upto == meta["size"]:
+                digest = hasher.hexdigest()
+            else:
+                digest = await asyncio.to_thread(self._file_sha256, data_path)
+
+            if expected_sha256 and expected_sha256.lower() != digest:
+                raise UploadChecksumError(digest)
+
+            await asyncio.to_thread(os.replace, data_path, dest_path)
+            await asyncio.to_thread(os.remove, meta_path)
+        self._forget(upload_id)
+        return meta, digest
+
+
+resumable_uploads = ResumableUploadStore(os.path.join(settings.UPLOAD_DIR, ".partial"))
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import timezone
+import numpy as np
+from sqlalchemy import select, func
+from app.models.domain import VoiceProfile, User
+from app.services.voice_service import SpeakerProfileIndex
+
+
+def _as_naive_utc(value):
+    """SQLite saat dilimi bilgisini saklamaz; karşılaştırma için UTC'ye indir."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class VoiceProfileCache:
+    """
+    Süreç içi ses profili önbelleği.
+    Her analiz işi tüm profilleri çekip çözmek yerine önbellekteki
+    SpeakerProfileIndex'i kullanır. Tazelik, tek satırlık ucuz bir sorguyla
+    (profil sayısı + en son updated_at) kontrol edilir; böylece başka bir
+    süreçte yapılan kayıtlar da fark edilir.
+    """
+
+    def __init__(self):
+        self._entries = {}      # user_id -> (isim, np.float32 vektör)
+        self._index = None
+        self._version = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    async def _read_version(db):
+        result = await db.execute(
+            select(func.count(VoiceProfile.id), func.max(VoiceProfile.updated_at)).join(User)
+        )
+        count, updated_at = result.one()
+        return count, _as_naive_utc(updated_at)
+
+    def _rebuild(self):
+        self._index = SpeakerProfileIndex(
+            [{"name": name, "embedding": vec} for name, vec in self._entries.values()]
+        )
+
+    async def get_index(self, db) -> SpeakerProfileIndex:
+        version = await self._read_version(db)
+        if self._index is not None and version == self._version:
+            return self._index
+
+        async with self._lock:
+            if self._index is not None and version == self._version:
+                return self._index
+            result = await db.execute(
+                select(VoiceProfile.user_id, VoiceProfile.embedding, User.full_name).join(User)
+            )
+            entries = {}
+            for user_id, embedding, full_name in result.all():
+                if embedding is not None:
+                    entries[user_id] = (full_name, np.asarray(embedding, dtype=np.float32))
+            self._entries = entries
+            self._rebuild()
+            self._version = version
+            print(f"🎙️ Ses profili önbelleği yenilendi ({len(self._index)} profil)")
+            return self._index
+
+    async def upsert(self, db, user_id: int, name: str, embedding, updated_at):
+        """
+        Kayıt/güncelleme sonrası önbelleği yerinde günceller.
+        DB'deki sürüm damgası yalnızca bu değişikliği içeriyorsa benimsenir;
+        arada başka bir değişiklik olduysa bir sonraki okumada tam yenileme yapılır.
+        """
+        async with self._lock:
+            if self._index is None:
+                return
+            self._entries[user_id] = (name, np.asarray(embedding, dtype=np.float32))
+            self._rebuild()
+            version = await self._read_version(db)
+            self._version = version if version == (len(self._entries), _as_naive_utc(updated_at)) else None
+
+    def invalidate(self):
+        self._version = None
+
+
+voice_profile_cache = VoiceProfileCache()
@@ -1,16 +1,21 @@
-import torch
-import soundfile as sf # <-- Torchaudio yerine Soundfile
 import os
 import numpy as np
-
-# SpeechBrain import kontrolü
-try:
-    from speechbrain.inference.speaker import EncoderClassifier
-except ImportError:
-    EncoderClassifier = None
+from app.core.config import settings
+from app.core.lazy import LazyService
+from app.services.audio_normalizer import normalize_audio, normalized_path_for
 
 class VoiceService:
     def __init__(self):
+        # torch / SpeechBrain yalnızca servis ilk kullanıldığında yüklenir
+        import torch
+        self.torch = torch
+
+        # SpeechBrain import kontrolü
+        try:
+            from speechbrain.inference.speaker import EncoderClassifier
+        except ImportError:
+            EncoderClassifier = None
+
         print("🔄 Ses Tanıma Modeli Hazırlanıyor...")
         self.classifier = None
         save_path = "tmp_models/embedding_model"
@@ -32,63 +37,172 @@ class VoiceService:
     def extract_embedding(self, file_path: str):
         """
         Ses dosyasından 192 boyutlu vektör çıkarır.
-        Soundfile kullanarak okur (Hatasız).
+        Dosya önce toplantı sesleriyle aynı 16 kHz mono formata normalize edilir.
         """
         if self.classifier is None:
             return [0.0] * 192
 
         try:
-            # 1. Sesi Soundfile ile Yükle (Torchaudio yerine)
-            signal_np, fs = sf.read(file_path)
-            
-            # 2. Tensor'a çevir
-            signal = torch.from_numpy(signal_np).float()
-            
-            # 3. Eğer Stereo ise Mono yap, boyut ekle
-            if len(signal.shape) > 1:
-                signal = signal.mean(dim=1) # Stereo -> Mono
-            if signal.dim() == 1:
-                signal = signal.unsqueeze(0) # [Batch, Time] formatı için
-
-            # 4. Vektörü Çıkar
-            embeddings = self.classifier.encode_batch(signal)
-            
-            # 5. Listeye Çevir
-            vector = embeddings[0, 0, :].detach().cpu().numpy().tolist()
-            return vector
+            # 1. Toplantı sesleriyle aynı formata (16 kHz mono) getir ve oku
+            normalized_path = normalized_path_for(file_path)
+            audio = normalize_audio(file_path, normalized_path)
+            signal_np = audio[:]
         except Exception as e:
             print(f"❌ Vektör Çıkarma Hatası: {e}")
             return [0.0] * 192
+        finally:
+            if normalized_path != file_path and os.path.exists(normalized_path):
+                os.remove(normalized_path)
 
-    def identify_speaker(self, segment_embedding: list, known_profiles: list):
-        if not known_profiles or segment_embedding == [0.0]*192:
-            return "Misafir", 0.0
+        # 2. Tek parçalık bir batch olarak işle
+        return self.extract_embeddings_batch([signal_np], audio.sample_rate)[0]
 
-        best_match_name = "Misafir"
-        best_score = 0.0
-        threshold = 0.30 
+    def extract_embeddings_batch(self, clips: list, sample_rate: int, batch_size: int = None):
+        """
+        Bellekteki ses parçalarından (NumPy dizileri) toplu halde vektör çıkarır.
+        Diske geçici dosya yazılmaz; parçalar uzunluğa göre sıralanıp kovalara
+        ayrılır, her kova sıfırla doldurulup tek bir encode_batch çağrısıyla işlenir.
+        Sonuçlar girdi sırasıyla döner (hatalı parçalar için sıfır vektör).
+        """
+        empty = [0.0] * 192
+        if not clips:
+            return []
+        if self.classifier is None:
+            return [list(empty) for _ in clips]
 
-        vec_a = np.array(segment_embedding)
-        norm_a = np.linalg.norm(vec_a)
-        
-        if norm_a == 0: return "Misafir", 0.0
+        batch_size = batch_size or settings.VOICE_EMBED_BATCH_SIZE
+        max_batch_frames = int(settings.VOICE_EMBED_MAX_BATCH_SECONDS * sample_rate)
 
-        for profile in known_profiles:
-            vec_b = np.array(profile["embedding"])
-            norm_b = np.linalg.norm(vec_b)
-            
-            if norm_b == 0: continue
+        # 1. Mono float32'ye indir (Stereo -> Mono)
+        signals = []
+        for clip in clips:
+            clip = np.asarray(clip)
+            if clip.ndim > 1:
+                clip = clip.mean(axis=1)
+            signals.append(clip.astype(np.float32, copy=False))
 
-            dot_product = np.dot(vec_a, vec_b)
-            score = dot_product / (norm_a * norm_b)
+        results = [list(empty) for _ in clips]
 
-            if score > best_score:
-                best_score = score
-                best_match_name = profile["name"]
+        # 2. Uzunluğa göre sırala: benzer uzunluktaki parçalar aynı batch'e düşer, dolgu israfı azalır
+        order = sorted(range(len(signals)), key=lambda i: len(signals[i]))
 
-        if best_score > threshold:
-            return best_match_name, best_score
+        batches = []
+        current = []
+        for idx in order:
+            longest = len(signals[idx])  # Sıralı olduğu için son eklenen en uzun olandır
+            if current and (len(current) >= batch_size or longest * (len(current) + 1) > max_batch_frames):
+                batches.append(current)
+                current = []
+            current.append(idx)
+        if current:
+            batches.append(current)
+
+        # 3. Her kovayı tek seferde modele ver
+        for batch in batches:
+            try:
+                max_len = max(len(signals[i]) for i in batch)
+                if max_len == 0:
+                    continue
+                padded = np.zeros((len(batch), max_len), dtype=np.float32)
+                for row, i in enumerate(batch):
+                    padded[row, :len(signals[i])] = signals[i]
+                # Göreli uzunluklar: model dolguyu dikkate almasın
+                wav_lens = self.torch.tensor([len(signals[i]) / max_len for i in batch], dtype=self.torch.float32)
+
+                with self.torch.no_grad():
+                    embeddings = self.classifier.encode_batch(self.torch.from_numpy(padded), wav_lens)
+
+                vectors = embeddings[:, 0, :].detach().cpu().numpy()
+                for row, i in enumerate(batch):
+                    results[i] = vectors[row].tolist()
+            except Exception as e:
+                print(f"❌ Toplu Vektör Çıkarma Hatası: {e}")
+
+        return results
+
+    def identify_speaker(self, segment_embedding: list, known_profiles):
+        """
+        Tek bir segment vektörünü bilinen profillerle eşleştirir.
+        known_profiles: SpeakerProfileIndex veya [{"name", "embedding"}] listesi.
+        """
+        if not isinstance(known_profiles, SpeakerProfileIndex):
+            known_profiles = SpeakerProfileIndex(known_profiles or [])
+        return self.identify_speakers_batch([segment_embedding], known_profiles)[0]
+
+    def identify_speakers_batch(self, segment_embeddings: list, profile_index: "SpeakerProfileIndex", threshold: float = None):
+        """
+        Birden çok segmenti tek matris çarpımıyla eşleştirir.
+        Her segment için (isim, skor) döner; eşik (varsayılan SPEAKER_MATCH_THRESHOLD) altındakiler "Misafir" olur.
+        """
+        threshold = settings.SPEAKER_MATCH_THRESHOLD if threshold is None else threshold
+        results = []
+        for matches in profile_index.search(segment_embeddings, top_k=1):
+            if not matches:
+                results.append(("Misafir", 0.0))
+                continue
+            name, score = matches[0]
+            score = max(score, 0.0)
+            results.append((name, score) if score > threshold else ("Misafir", score))
+        return results
+
+
+class SpeakerProfileIndex:
+    """
+    Bilinen ses profillerinin önceden normalize edilmiş float32 matrisi.
+    Profiller bir kez normalize edilir; eşleştirme, segment(ler) ile matrisin
+    tek bir çarpımıdır (kosinüs benzerliği = normalize vektörlerin iç çarpımı).
+    """
+
+    def __init__(self, profiles: list, dim: int = 192):
+        self.dim = dim
+        names = []
+        rows = []
+        for profile in profiles:
+            vec = np.asarray(profile["embedding"], dtype=np.float32).reshape(-1)
+            if vec.shape[0] != dim:
+                continue
+            norm = np.linalg.norm(vec)
+            if norm == 0:
+                continue
+            names.append(profile["name"])
+            rows.append(vec / norm)
+        self.names = names
+        self.matrix = np.stack(rows) if rows else np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, embeddings, top_k: int = 1):
+        """
+        embeddings: tek vektör veya (N, dim) vektör listesi.
+        Her girdi için skora göre azalan [(isim, skor), ...] listesi döner
+        (sıfır vektörler ve boş indeks için boş liste).
+        """
+        queries = np.asarray(embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        if len(self) == 0 or queries.size == 0:
+            return [[] for _ in range(len(queries))]
+
+        norms = np.linalg.norm(queries, axis=1)
+        valid = norms > 0
+        scores = np.zeros((len(queries), len(self)), dtype=np.float32)
+        scores[valid] = (queries[valid] / norms[valid, None]) @ self.matrix.T
+
+        k = min(top_k, len(self))
+        if k < len(self):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
         else:
-            return "Misafir", best_score
+            top = np.tile(np.arange(len(self)), (len(queries), 1))
+
+        results = []
+        for row in range(len(queries)):
+            if not valid[row]:
+                results.append([])
+                continue
+            idx = top[row][np.argsort(-scores[row, top[row]])]
+            results.append([(self.names[j], float(scores[row, j])) for j in idx])
+        return results
+
 
-voice_service = VoiceService()
\ No newline at end of file
+voice_service = LazyService("voice", VoiceService)
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Toplantı analiz worker'ları.
+
+API süreçleri işleri yalnızca kuyruğa yazar; ağır işleri (ASR, torch, LLM)
+bu süreçler yürütür. Kullanım:
+
+    python -m app.worker                 # WORKER_CONCURRENCY kadar süreç
+    python -m app.worker --concurrency 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+from app.core.config import settings
+from app.core.job_queue import get_job_queue
+from app.core.lazy import warmup_services
+from app.core.database import AsyncSessionLocal
+from sqlalchemy import select
+from app.models.domain import Meeting, MeetingStatus
+
+
+# --- İŞ TİPLERİ ---
+
+async def handle_process_meeting(payload: dict, job):
+    from app.services.meeting_pipeline import process_meeting_task
+    # Son denemede hata kalıcıdır: toplantıyı FAILED'a çek. Öncesinde PROCESSING kalır, tekrar denenir.
+    await process_meeting_task(payload["meeting_id"], payload["file_path"], mark_failed=job.is_last_attempt, raise_errors=True)
+
+
+async def dead_process_meeting(payload: dict):
+    """Worker çöktüğü için deneme hakkı biten işler: toplantı PROCESSING'de asılı kalmasın."""
+    async with AsyncSessionLocal() as db:
+        meeting = await db.get(Meeting, payload["meeting_id"])
+        if meeting and meeting.status != MeetingStatus.COMPLETED:
+            meeting.status = MeetingStatus.FAILED
+            await db.commit()
+
+
+JOB_HANDLERS = {
+    "process_meeting": (handle_process_meeting, dead_process_meeting),
+}
+
+
+# --- WORKER DÖNGÜSÜ ---
+
+async def _keep_lease(queue, job, worker_id: str, handler: asyncio.Task) -> bool:
+    """
+    İş sürdükçe kirayı yeniler; worker çökerse kira dolar ve iş başka worker'a geçer.
+    Kira yenilenemezse iş başka bir worker'a geçmiş olabilir: aynı toplantı iki kez
+    işlenmesin diye işleyici iptal edilir ve False döner.
+    """
+    interval = max(1.0, settings.JOB_LEASE_SECONDS / 3)
+    while not handler.done():
+        await asyncio.sleep(interval)
+        try:
+            renewed = await asyncio.to_thread(queue.heartbeat, job.id, worker_id, settings.JOB_LEASE_SECONDS)
+        except Exception as e:
+            print(f"⚠️ Job {job.id} kirası yenilenemedi: {e}")
+            renewed = False
+        if not renewed:
+            print(f"🛑 Job {job.id} kirası kaybedildi, işlem durduruluyor.")
+            handler.cancel()
+            return False
+    return True
+
+
+def _lease_lost(lease_task: asyncio.Task) -> bool:
+    return lease_task.done() and not lease_task.cancelled() and lease_task.result() is False
+
+
+async def _reap_dead(queue):
+    for job in await asyncio.to_thread(queue.pop_dead):
+        handlers = JOB_HANDLERS.get(job.kind)
+        if handlers:
+            try:
+                await handlers[1](job.payload)
+            except Exception as e:
+                print(f"⚠️ Ölü iş bildirimi başarısız (Job {job.id}): {e}")
+
+
+async def backfill_memory_tenants():
+    """Kapsam etiketi olmadan kaydedilmiş eski hafıza kayıtlarına sahip/takım bilgisini yazar (bir kez)."""
+    from app.services.rag_service import rag_service
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(Meeting.id, Meeting.owner_id, Meeting.team_id))).all()
+    updated = await asyncio.to_thread(rag_service.backfill_tenants, {mid: (owner, team) for mid, owner, team in rows})
+    if updated:
+        print(f"🏷️ {updated} hafıza kaydına kiracı bilgisi eklendi.")
+
+
+async def run_worker(worker_id: str, stop: asyncio.Event, warmup: str = "", backfill: bool = False):
+    queue = get_job_queue()
+    # Modelleri ilk işten önce yükle: ilk toplantı model yükleme süresini beklemesin
+    if warmup:
+        timings = await asyncio.to_thread(warmup_services, warmup)
+        print(f"🔥 Worker {worker_id} servisleri ısıttı: {timings}")
+    if backfill:
+        try:
+            await backfill_memory_tenants()
+        except Exception as e:
+            print(f"⚠️ Hafıza kiracı etiketleme başarısız: {e}")
+    print(f"👷 Worker {worker_id} hazır.")
+
+    while not stop.is_set():
+        await _reap_dead(queue)
+        job = await asyncio.to_thread(queue.claim, worker_id, settings.JOB_LEASE_SECONDS)
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        handlers = JOB_HANDLERS.get(job.kind)
+        if handlers is None:
+            await asyncio.to_thread(queue.fail, job.id, worker_id, f"Bilinmeyen iş tipi: {job.kind}", 0)
+            continue
+
+        print(f"📦 Job {job.id} ({job.kind}) alındı, deneme {job.attempts}/{job.max_attempts}")
+        handler_task = asyncio.create_task(handlers[0](job.payload, job))
+        lease_task = asyncio.create_task(_keep_lease(queue, job, worker_id, handler_task))
+        try:
+            await handler_task
+        except asyncio.CancelledError:
+            if not _lease_lost(lease_task):
+                raise
+            # İş artık bu worker'ın değil: tamamlandı/hatalı olarak işaretlenmez
+        except Exception as e:
+            retry_delay = settings.JOB_RETRY_BASE_SECONDS * (2 ** (job.attempts - 1))
+            will_retry = await asyncio.to_thread(queue.fail, job.id, worker_id, f"{type(e).__name__}: {e}", retry_delay)
+            if will_retry:
+                print(f"🔁 Job {job.id} {retry_delay:.0f} sn sonra tekrar denenecek: {e}")
+            else:
+                print(f"💀 Job {job.id} kalıcı olarak başarısız: {e}")
+        else:
+            await asyncio.to_thread(queue.complete, job.id, worker_id)
+            print(f"✅ Job {job.id} tamamlandı.")
+        finally:
+            lease_task.cancel()
+
+
+def _worker_main(index: int, warmup: str):
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{index}"
+
+    async def _main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
+        await run_worker(worker_id, stop, warmup, backfill=index == 0)
+
+    asyncio.run(_main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Smart toplantı analiz worker'ları")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--warmup", default=settings.WORKER_WARMUP_SERVICES, help='Örn: "all", "voice,rag" veya ""')
+    args = parser.parse_args()
+
+    if args.concurrency <= 1:
+        _worker_main(0, args.warmup)
+        return
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_worker_main, args=(i, args.warmup), daemon=False) for i in range(args.concurrency)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Uçtan uca analiz hattı yük testi (ağa çıkmadan).
+
+N adet sentetik toplantı sesi üretilir ve process_meeting_task ile eşzamanlı
+işlenir. ASR ve LLM sahte (stub) backend'lerle çalışır; gecikme ve hata oranı
+ayarlanabilir. Veritabanı ve yan dosyalar geçici bir çalışma klasöründe tutulur.
+Rapor: verim (toplantı/sn), aşama başına p50/p95 süre, tepe bellek.
+
+    python -m benchmarks.pipeline_benchmark
+    python -m benchmarks.pipeline_benchmark -n 50 --concurrency 8 --seconds 300 \\
+        --asr-latency 0.5 --llm-latency 0.2 --failure-rate 0.05 --skip memory
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import math
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure_env(args):
+    """Uygulama modülleri import edilmeden önce: sahte backend'ler, sınırsız hız limiti, kısa retry."""
+    os.environ.update({
+        "ASR_BACKEND": "stub",
+        "LLM_BACKEND": "stub",
+        "ASR_STUB_LATENCY": str(args.asr_latency),
+        "ASR_STUB_REALTIME_FACTOR": str(args.asr_realtime_factor),
+        "ASR_STUB_FAILURE_RATE": str(args.failure_rate),
+        "LLM_STUB_FIRST_TOKEN_DELAY": str(args.llm_latency),
+        "LLM_STUB_FAILURE_RATE": str(args.failure_rate),
+        "STUB_SEED": str(args.seed),
+        "LLM_CACHE_ENABLED": "1" if args.llm_cache else "0",
+    })
+    # Kullanıcı ortamda verdiyse onunki geçerli
+    os.environ.setdefault("LLM_REQUESTS_PER_MINUTE", "0")
+    os.environ.setdefault("ASR_REQUESTS_PER_MINUTE", "0")
+    os.environ.setdefault("PROVIDER_RETRY_BASE_SECONDS", "0.05")
+    os.environ.setdefault("PROVIDER_RETRY_MAX_SECONDS", "1")
+
+
+def write_synthetic_wav(path: str, seconds: float, seed: int):
+    """
+    Konuşmacı değişimlerini andıran sentetik ses (44.1 kHz stereo: normalizasyon da ölçülsün).
+    Bloklar halinde yazılır; uzun toplantılar belleğe alınmaz.
+    """
+    rate = 44100
+    rng = np.random.default_rng(seed)
+    block = rate * 10
+    total = int(seconds * rate)
+    with wave.open(path, "wb") as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        for start in range(0, total, block):
+            t = np.arange(start, min(total, start + block)) / rate
+            # Her 6 sn'de bir "konuşmacı" (temel frekans) değişir
+            freq = 120 + 80 * ((t // 6).astype(int) % 3)
+            signal = 0.3 * np.sin(2 * np.pi * freq * t) + 0.05 * rng.standard_normal(len(t))
+            pcm = np.clip(signal * 32767, -32768, 32767).astype("<i2")
+            writer.writeframes(np.repeat(pcm, 2).tobytes())
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank yüzdelik."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> float:
+    # Linux'ta KB, macOS'ta bayt döner
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run(args) -> dict:
+    from sqlalchemy import select, func
+    from app.core.database import engine, AsyncSessionLocal, run_migrations
+    from app.core.metrics import get_metrics
+    from app.models.domain import User, Meeting, MeetingStatus
+    from app.services.meeting_pipeline import MEETING_PIPELINE, process_meeting_task
+
+    engine.sync_engine.echo = False  # SQL logu ölçümü bozmasın
+    await run_migrations()
+
+    os.makedirs("uploads", exist_ok=True)
+    paths = []
+    for i in range(args.meetings):
+        path = os.path.join("uploads", f"bench_{i}.wav")
+        write_synthetic_wav(path, args.seconds, args.seed + i)
+        paths.append(path)
+
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"bench-{time.time_ns()}@example.com", full_name="Benchmark", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        meetings = [
+            Meeting(owner_id=user.id, title=f"Benchmark {i}", audio_file_path=path, status=MeetingStatus.UPLOADING)
+            for i, path in enumerate(paths)
+        ]
+        db.add_all(meetings)
+        await db.commit()
+        meeting_ids = [m.id for m in meetings]
+
+    pipeline = MEETING_PIPELINE.without(*args.skip) if args.skip else MEETING_PIPELINE
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+
+    async def process(meeting_id: int, path: str):
+        async with semaphore:
+            timings = {}
+            started = time.perf_counter()
+            try:
+                await process_meeting_task(meeting_id, path, raise_errors=True, pipeline=pipeline, timings=timings)
+                ok = True
+            except Exception:
+                ok = False
+            return ok, time.perf_counter() - started, timings
+
+    rss_before = peak_rss_mb()
+    if args.tracemalloc:
+        tracemalloc.start()
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output:
+        results = await asyncio.gather(*(process(mid, path) for mid, path in zip(meeting_ids, paths)))
+    wall = time.perf_counter() - started
+    traced_peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+
+    async with AsyncSessionLocal() as db:
+        completed = (await db.execute(
+            select(func.count(Meeting.id)).where(Meeting.id.in_(meeting_ids), Meeting.status == MeetingStatus.COMPLETED)
+        )).scalar()
+
+    stage_times = {}
+    for _, _, timings in results:
+        for stage, seconds in timings.items():
+            stage_times.setdefault(stage, []).append(seconds)
+    counters = {}
+    for row in get_metrics().snapshot():
+        counters[row["name"]] = counters.get(row["name"], 0) + row["value"]
+
+    return {
+        "wall": wall,
+        "completed": completed,
+        "failed": sum(1 for ok, _, _ in results if not ok),
+        "totals": [seconds for ok, seconds, _ in results if ok],
+        "stages": stage_times,
+        "order": [name for name in pipeline.stages if name in stage_times],
+        "rss_before": rss_before,
+        "rss_peak": peak_rss_mb(),
+        "traced_peak": traced_peak,
+        "counters": counters,
+    }
+
+
+def report(args, result: dict):
+    print(f"\n📊 {args.meetings} toplantı x {args.seconds:.0f} sn, eşzamanlılık {args.concurrency}")
+    print(f"   Süre: {result['wall']:.2f} sn | Tamamlanan: {result['completed']} | Hatalı: {result['failed']}")
+    print(f"   Verim: {result['completed'] / result['wall']:.2f} toplantı/sn "
+          f"(gerçek zamanın {result['completed'] * args.seconds / result['wall']:.0f} katı)")
+
+    print(f"\n   {'aşama':<14}{'n':>5}{'p50 (ms)':>12}{'p95 (ms)':>12}{'maks (ms)':>12}")
+    rows = [(name, result["stages"][name]) for name in result["order"]] + [("TOPLAM", result["totals"])]
+    for name, values in rows:
+        print(f"   {name:<14}{len(values):>5}{percentile(values, 50) * 1000:>12.1f}"
+              f"{percentile(values, 95) * 1000:>12.1f}{(max(values) if values else 0) * 1000:>12.1f}")
+
+    print(f"\n   Tepe RSS: {result['rss_peak']:.0f} MB (koşu öncesi {result['rss_before']:.0f} MB)")
+    if result["traced_peak"] is not None:
+        print(f"   Tepe Python ayırımı (tracemalloc): {result['traced_peak'] / (1024 * 1024):.1f} MB")
+    for name in ("ai_retries_total", "ai_errors_total", "ai_fallbacks_total"):
+        if name in result["counters"]:
+            print(f"   {name}: {result['counters'][name]:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uçtan uca analiz hattı yük testi (sahte ASR/LLM)")
+    parser.add_argument("-n", "--meetings", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=120, help="Toplantı başına ses süresi")
+    parser.add_argument("--concurrency", type=int, default=4, help="Aynı anda işlenen toplantı sayısı")
+    parser.add_argument("--asr-latency", type=float, default=0.2, help="ASR çağrısı sabit gecikmesi (sn)")
+    parser.add_argument("--asr-realtime-factor", type=float, default=0.005, help="Ses saniyesi başına ASR gecikmesi")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="LLM çağrısı gecikmesi (sn)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Sahte sağlayıcı geçici hata oranı (0-1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip", nargs="*", default=[], help='Atlanacak aşamalar (örn. "memory": Chroma/model gerektirmez)')
+    parser.add_argument("--llm-cache", action="store_true", help="LLM yanıt önbelleğini açık bırak")
+    parser.add_argument("--tracemalloc", action="store_true", help="Python ayırımlarını izle (yavaşlatır)")
+    parser.add_argument("--workdir", default=None, help="Veritabanı/dosyalar için klasör (varsayılan: geçici, sonda silinir)")
+    parser.add_argument("--verbose", action="store_true", help="Hat çıktısını gizleme")
+    args = parser.parse_args()
+
+    configure_env(args)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="pipeline_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    # Veritabanı ve yan dosyaların yolları çalışma klasörüne göre: gerçek verilere dokunulmaz
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(workdir)
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        os.chdir(BACKEND_DIR)
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+    report(args, result)
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
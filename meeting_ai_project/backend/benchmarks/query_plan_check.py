@@ -0,0 +1,126 @@
+"""
+Sık kullanılan sorguların indeks kullanım kontrolü (SQLite EXPLAIN QUERY PLAN).
+
+Boş bir veritabanı migrasyonlarla kurulur, endpoint'lerdeki sorguların
+aynısı derlenip planları incelenir. Beklenen indeksi kullanmayan ya da
+tabloyu baştan sona tarayan sorgu varsa çıkış kodu 1 olur (CI'da şema
+değişikliklerinin indeksleri bozmadığını doğrulamak için).
+
+    python -m benchmarks.query_plan_check
+    python -m benchmarks.query_plan_check --verbose
+"""
+import argparse
+import asyncio
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def hot_queries() -> list:
+    """(ad, sorgu, beklenen indeksler) — endpoint'lerdeki sorgularla aynı şekilde kurulur."""
+    from sqlalchemy import select, func, or_, and_
+    from app.models.domain import Meeting, TranscriptSegment, ActionItem, Team, TeamMember
+
+    user_id, meeting_id = 1, 1
+    return [
+        ("get_meeting_details: segmentler",
+         select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id).order_by(TranscriptSegment.id),
+         ["ix_transcript_segments_meeting_id_id"]),
+        ("get_meeting_details: transkript penceresi (zaman aralığı + offset)",
+         select(TranscriptSegment.id, TranscriptSegment.text)
+         .where(TranscriptSegment.meeting_id == meeting_id, TranscriptSegment.end_time > 60, TranscriptSegment.start_time < 120)
+         .order_by(TranscriptSegment.id).offset(100).limit(100),
+         ["ix_transcript_segments_meeting_id_id"]),
+        ("get_meeting_details: pencere toplamı",
+         select(func.count(TranscriptSegment.id)).where(TranscriptSegment.meeting_id == meeting_id),
+         ["ix_transcript_segments_meeting_id_id"]),
+        ("get_meeting_details: görevler",
+         select(ActionItem).where(ActionItem.meeting_id == meeting_id),
+         ["ix_action_items_meeting_id_status_due_date"]),
+        ("list_meetings (imleçli sayfa + görev sayısı)",
+         select(
+             Meeting.id, Meeting.title,
+             select(func.count(ActionItem.id)).where(ActionItem.meeting_id == Meeting.id).scalar_subquery()
+         ).where(Meeting.owner_id == user_id, Meeting.id < 100).order_by(Meeting.id.desc()).limit(51),
+         ["ix_meetings_owner_id_id", "ix_action_items_meeting_id_status_due_date"]),
+        ("list_meetings: include_action_items",
+         select(ActionItem.id, ActionItem.meeting_id).where(ActionItem.meeting_id.in_([1, 2, 3])).order_by(ActionItem.id),
+         ["ix_action_items_meeting_id_status_due_date"]),
+        ("get_all_tasks (imleçli sayfa)",
+         select(ActionItem.id, ActionItem.due_date, Meeting.title).join(Meeting).where(Meeting.owner_id == user_id)
+         .where(or_(ActionItem.due_date > "2026-01-01", and_(ActionItem.due_date == "2026-01-01", ActionItem.id > 5),
+                    ActionItem.due_date.is_(None)))
+         .order_by(ActionItem.due_date.asc().nulls_last(), ActionItem.id.asc()).limit(51),
+         ["ix_meetings_owner_id_id", "ix_action_items_meeting_id_status_due_date"]),
+        ("/nudges",
+         select(ActionItem, Meeting).join(Meeting).where(
+             (Meeting.owner_id == user_id) & (ActionItem.status != "completed") & (ActionItem.due_date != None)
+         ),
+         ["ix_meetings_owner_id_id", "ix_action_items_meeting_id_status_due_date"]),
+        ("get_my_teams",
+         select(Team).join(TeamMember).where(TeamMember.user_id == user_id),
+         ["ix_team_members_user_id"]),
+        ("global_chat: kullanıcının takımları",
+         select(TeamMember.team_id).where(TeamMember.user_id == user_id),
+         ["ix_team_members_user_id"]),
+        ("takım toplantıları",
+         select(Meeting.id).where(Meeting.team_id.in_([1, 2])),
+         ["ix_meetings_team_id"]),
+    ]
+
+
+def check_plan(plan: list, expected: list) -> list:
+    """Sorun listesi döner (boş = plan uygun)."""
+    problems = [f"'{index}' kullanılmıyor" for index in expected if not any(index in line for line in plan)]
+    # İndekssiz tam tablo taraması ("SCAN meetings"); "USING INDEX" içeren taramalar sıralı indeks gezintisidir
+    for line in plan:
+        if re.match(r"SCAN \w+$", line):
+            problems.append(f"tam tablo taraması: {line}")
+    return problems
+
+
+async def explain_all(verbose: bool) -> bool:
+    from app.core.database import engine, run_migrations
+
+    await run_migrations()
+    ok = True
+    async with engine.connect() as conn:
+        for name, stmt, expected in hot_queries():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")).all()
+            plan = [row[-1] for row in rows]
+            problems = check_plan(plan, expected)
+            ok = ok and not problems
+            print(f"{'✅' if not problems else '❌'} {name}")
+            for problem in problems:
+                print(f"   - {problem}")
+            if verbose or problems:
+                for line in plan:
+                    print(f"      {line}")
+    await engine.dispose()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sorgu planı / indeks kontrolü")
+    parser.add_argument("--verbose", action="store_true", help="Tüm planları yazdır")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="query_plan_")
+    # Uygulama modülleri import edilmeden önce: gerçek veritabanına dokunulmaz
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'plan.db')}"
+    os.environ.setdefault("DB_SLOW_QUERY_MS", "0")
+    sys.path.insert(0, BACKEND_DIR)
+    try:
+        ok = asyncio.run(explain_all(args.verbose))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Eski veritabanlarının açılışta güncellenebildiğinin kontrolü.
+
+Migrasyon sisteminden önce create_all ile kurulmuş veritabanları, modele sütun
+eklenen her ara sürümün şemasıyla taklit edilir (başlangıç şeması, +content_sha256,
++ses profili sütunları, +aşama sonuçları). Her biri açılıştaki yoldan (_upgrade)
+geçirilir; ardından şemanın modellerle birebir aynı olduğu ve sık sorguların
+çalıştığı doğrulanır. Sorun varsa çıkış kodu 1 olur.
+
+    python -m benchmarks.schema_upgrade_check
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ara sürümlerde create_all'un eklediği parçalar (birikimli)
+LEGACY_STEPS = [
+    ("başlangıç şeması", []),
+    ("+ meetings.content_sha256", [
+        "ALTER TABLE meetings ADD COLUMN content_sha256 VARCHAR(64)",
+    ]),
+    ("+ voice_profiles.sample_count / updated_at", [
+        "ALTER TABLE voice_profiles ADD COLUMN sample_count INTEGER",
+        "ALTER TABLE voice_profiles ADD COLUMN updated_at DATETIME",
+    ]),
+    ("+ pipeline_stage_results", [
+        "CREATE TABLE pipeline_stage_results (id INTEGER NOT NULL PRIMARY KEY, meeting_id INTEGER REFERENCES meetings(id), "
+        "stage VARCHAR, status VARCHAR, output TEXT, error TEXT, duration_ms FLOAT, "
+        "updated_at DATETIME DEFAULT (CURRENT_TIMESTAMP), CONSTRAINT uq_pipeline_stage UNIQUE (meeting_id, stage))",
+        "CREATE INDEX ix_pipeline_stage_results_id ON pipeline_stage_results (id)",
+        "CREATE INDEX ix_pipeline_stage_results_meeting_id ON pipeline_stage_results (meeting_id)",
+    ]),
+]
+
+
+def legacy_database(path: str, statements: list):
+    """Başlangıç şeması + verilen ara sürüm değişiklikleri; alembic_version yok (create_all dönemi)."""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import create_engine, text
+    from app.core.database import BASELINE_REVISION
+
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+        config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+        config.attributes["connection"] = conn
+        command.upgrade(config, BASELINE_REVISION)
+        conn.execute(text("DROP TABLE alembic_version"))
+        for statement in statements:
+            conn.execute(text(statement))
+        conn.execute(text("INSERT INTO users (id, email, full_name, hashed_password) VALUES (1, 'a@example.com', 'A', '-')"))
+        conn.execute(text("INSERT INTO meetings (id, owner_id, title, status) VALUES (1, 1, 'Eski toplantı', 'completed')"))
+        conn.execute(text("INSERT INTO voice_profiles (id, user_id, embedding) VALUES (1, 1, :e)"), {"e": json.dumps([0.5] * 192)})
+    engine.dispose()
+
+
+def check(path: str) -> list:
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from sqlalchemy import create_engine, select
+    from app.core.database import Base, _upgrade
+    from app.models.domain import Meeting, VoiceProfile
+
+    engine = create_engine(f"sqlite:///{path}")
+    problems = []
+    with engine.begin() as conn:
+        _upgrade(conn)
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn, opts={"compare_type": False}), Base.metadata)
+        problems += [f"şema farkı: {item}" for item in diff]
+        try:
+            conn.execute(select(Meeting)).all()
+            embedding = conn.execute(select(VoiceProfile.embedding)).scalar()
+            if embedding is None or len(embedding) != 192:
+                problems.append("ses profili vektörü okunamadı")
+        except Exception as e:
+            problems.append(f"sorgu başarısız: {e}")
+    engine.dispose()
+    return problems
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="schema_upgrade_")
+    # Uygulama modülleri import edilmeden önce: gerçek veritabanına dokunulmaz
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(workdir, 'unused.db')}"
+    os.environ.setdefault("DB_SLOW_QUERY_MS", "0")
+    sys.path.insert(0, BACKEND_DIR)
+    ok = True
+    try:
+        statements = []
+        for i, (name, step) in enumerate(LEGACY_STEPS):
+            statements += step
+            path = os.path.join(workdir, f"legacy_{i}.db")
+            legacy_database(path, statements)
+            problems = check(path)
+            ok = ok and not problems
+            print(f"{'✅' if not problems else '❌'} {name}")
+            for problem in problems:
+                print(f"   - {problem}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
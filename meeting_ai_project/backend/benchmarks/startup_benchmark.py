@@ -0,0 +1,86 @@
+"""
+API/worker açılış süresi ölçümü.
+
+Her modül temiz bir Python sürecinde `-X importtime` ile import edilir;
+toplam süre ve en pahalı importlar yazdırılır. API modüllerinin torch,
+sentence_transformers veya chromadb yüklemediği de kontrol edilir.
+
+    python -m benchmarks.startup_benchmark
+    python -m benchmarks.startup_benchmark --budget-ms 1500 --top 15
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modül -> açılışta yüklenmemesi gereken ağır paketler
+TARGETS = {
+    "app.main": ("torch", "speechbrain", "sentence_transformers", "chromadb"),
+    "app.api.v1.endpoints.auth": ("torch", "speechbrain", "sentence_transformers", "chromadb"),
+    "app.worker": ("torch", "speechbrain", "sentence_transformers", "chromadb"),
+}
+
+_PROBE = """
+import sys, json
+import {module}
+print("__HEAVY__" + json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+
+def measure(module: str, heavy: tuple) -> dict:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=heavy)],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import edilemedi:\n{proc.stderr[-2000:]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative_us), name.strip()))
+
+    loaded_heavy = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("__HEAVY__"):
+            loaded_heavy = json.loads(line[len("__HEAVY__"):])
+
+    own_ms = next((us / 1000 for us, name in imports if name == module), 0.0)
+    return {"wall_ms": wall_ms, "import_ms": own_ms, "imports": imports, "heavy": loaded_heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Açılış import süresi ölçümü")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Modül başına import bütçesi (ms)")
+    parser.add_argument("--top", type=int, default=10, help="Gösterilecek en pahalı import sayısı")
+    parser.add_argument("modules", nargs="*", default=list(TARGETS))
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        result = measure(module, TARGETS.get(module, ("torch",)))
+        print(f"\n⏱️ {module}: import {result['import_ms']:.0f} ms (süreç {result['wall_ms']:.0f} ms)")
+        for cumulative_us, name in sorted(result["imports"], reverse=True)[:args.top]:
+            print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+        if result["heavy"]:
+            failed = True
+            print(f"❌ Açılışta ağır paket yüklendi: {', '.join(result['heavy'])}")
+        if args.budget_ms is not None and result["import_ms"] > args.budget_ms:
+            failed = True
+            print(f"❌ Bütçe aşıldı: {result['import_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
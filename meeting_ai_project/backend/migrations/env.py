@@ -0,0 +1,55 @@
+import asyncio
+from logging.config import fileConfig
+from alembic import context
+from app.core.database import Base, engine
+import app.models.domain  # noqa: F401  (modeller metadata'ya kaydolsun)
+
+config = context.config
+target_metadata = Base.metadata
+
+# Uygulama içinden (açılışta) çağrıldığında bağlantı hazır gelir; loglama ayarlarına dokunulmaz
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        # SQLite ALTER TABLE desteği sınırlı: sütun değişiklikleri tabloyu yeniden kurarak yapılır
+        render_as_batch=engine.dialect.name == "sqlite",
+        compare_type=True,
+        **kwargs
+    )
+
+
+def run_migrations_offline():
+    """SQL çıktısı üretir (alembic upgrade head --sql)."""
+    _configure(url=engine.url.render_as_string(hide_password=False), literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def do_run_migrations(connection):
+    _configure(connection=connection)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_async_migrations():
+    async with engine.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+        await connection.commit()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is None:
+        asyncio.run(run_async_migrations())
+    else:
+        do_run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,104 @@
+"""Başlangıç şeması (migrasyonlardan önce create_all ile kurulan tablolar)
+
+Migrasyon sisteminden önce oluşturulmuş veritabanları bu sürüme "stamp"lenir
+(app.core.database.run_migrations), sonraki migrasyonlar üzerine uygulanır.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("full_name", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "teams",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id")),
+    )
+    op.create_index("ix_teams_id", "teams", ["id"])
+    op.create_index("ix_teams_name", "teams", ["name"])
+
+    op.create_table(
+        "team_members",
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("role", sa.String()),
+        sa.Column("joined_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    op.create_table(
+        "meetings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("team_id", sa.Integer(), sa.ForeignKey("teams.id"), nullable=True),
+        sa.Column("title", sa.String()),
+        sa.Column("audio_file_path", sa.String()),
+        sa.Column("duration_seconds", sa.Float(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("executive_summary", sa.Text(), nullable=True),
+        sa.Column("sentiment", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_meetings_id", "meetings", ["id"])
+    op.create_index("ix_meetings_title", "meetings", ["title"])
+
+    op.create_table(
+        "transcript_segments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("meeting_id", sa.Integer(), sa.ForeignKey("meetings.id")),
+        sa.Column("start_time", sa.Float()),
+        sa.Column("end_time", sa.Float()),
+        sa.Column("speaker_label", sa.String()),
+        sa.Column("text", sa.String()),
+    )
+    op.create_index("ix_transcript_segments_id", "transcript_segments", ["id"])
+
+    op.create_table(
+        "action_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("meeting_id", sa.Integer(), sa.ForeignKey("meetings.id")),
+        sa.Column("description", sa.String()),
+        sa.Column("assignee_name", sa.String(), nullable=True),
+        sa.Column("due_date", sa.String(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("confidence_score", sa.Float()),
+    )
+    op.create_index("ix_action_items_id", "action_items", ["id"])
+
+    op.create_table(
+        "voice_profiles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), unique=True),
+        sa.Column("embedding", sa.Text()),  # JSON metin (0002'de ikili vektöre çevrilir)
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_voice_profiles_id", "voice_profiles", ["id"])
+
+
+def downgrade():
+    for table in ("voice_profiles", "action_items", "transcript_segments", "meetings", "team_members", "teams", "users"):
+        op.drop_table(table)
@@ -0,0 +1,93 @@
+"""Modellere migrasyonsuz eklenmiş sütun/tablolar ve ses vektörlerinin ikili formata çevrilmesi
+
+- meetings.content_sha256, voice_profiles.sample_count / updated_at
+- pipeline_stage_results tablosu
+- voice_profiles.embedding: JSON metin -> float32 BLOB (SQLite) / vector(192) (Postgres + pgvector)
+
+create_all ile bu değişikliklerden sonra kurulmuş veritabanlarında zaten var
+olan parçalar atlanır.
+
+Revision ID: 0002_catch_up_models
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+import json
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+revision = "0002_catch_up_models"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def _columns(table: str) -> dict:
+    return {c["name"]: c for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _to_blob(value: str) -> bytes:
+    return np.asarray(json.loads(value), dtype=np.float32).reshape(-1).tobytes()
+
+
+def _convert_embeddings(bind):
+    if bind.dialect.name == "sqlite":
+        rows = bind.execute(sa.text("SELECT id, embedding FROM voice_profiles WHERE typeof(embedding) = 'text'")).all()
+        for row_id, value in rows:
+            bind.execute(sa.text("UPDATE voice_profiles SET embedding = :e WHERE id = :id"), {"e": _to_blob(value), "id": row_id})
+        return
+
+    if bind.dialect.name != "postgresql" or not isinstance(_columns("voice_profiles")["embedding"]["type"], sa.Text):
+        return
+    try:
+        import pgvector  # noqa: F401  (EmbeddingVector ile aynı karar: paket varsa native vektör)
+    except ImportError:
+        rows = bind.execute(sa.text("SELECT id, embedding FROM voice_profiles WHERE embedding IS NOT NULL")).all()
+        op.execute("ALTER TABLE voice_profiles ALTER COLUMN embedding TYPE bytea USING NULL")
+        for row_id, value in rows:
+            bind.execute(sa.text("UPDATE voice_profiles SET embedding = :e WHERE id = :id"), {"e": _to_blob(value), "id": row_id})
+    else:
+        # JSON dizi metni ("[0.1, ...]") pgvector'ün metin formatıyla aynı
+        op.execute("ALTER TABLE voice_profiles ALTER COLUMN embedding TYPE vector(192) USING embedding::vector(192)")
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if "content_sha256" not in _columns("meetings"):
+        op.add_column("meetings", sa.Column("content_sha256", sa.String(64), nullable=True))
+
+    voice_columns = _columns("voice_profiles")
+    if "sample_count" not in voice_columns:
+        op.add_column("voice_profiles", sa.Column("sample_count", sa.Integer(), nullable=True))
+        op.execute("UPDATE voice_profiles SET sample_count = 1")
+    if "updated_at" not in voice_columns:
+        op.add_column("voice_profiles", sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+    if "pipeline_stage_results" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "pipeline_stage_results",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("meeting_id", sa.Integer(), sa.ForeignKey("meetings.id")),
+            sa.Column("stage", sa.String()),
+            sa.Column("status", sa.String()),
+            sa.Column("output", sa.Text(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("duration_ms", sa.Float(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.UniqueConstraint("meeting_id", "stage", name="uq_pipeline_stage"),
+        )
+        op.create_index("ix_pipeline_stage_results_id", "pipeline_stage_results", ["id"])
+        op.create_index("ix_pipeline_stage_results_meeting_id", "pipeline_stage_results", ["meeting_id"])
+
+    _convert_embeddings(bind)
+
+
+def downgrade():
+    # Vektör formatı geri çevrilmez (EmbeddingVector eski JSON satırlarını da okuyabilir)
+    op.drop_table("pipeline_stage_results")
+    with op.batch_alter_table("voice_profiles") as batch:
+        batch.drop_column("updated_at")
+        batch.drop_column("sample_count")
+    with op.batch_alter_table("meetings") as batch:
+        batch.drop_column("content_sha256")
@@ -0,0 +1,42 @@
+"""Sık kullanılan sorguların filtre/join sütunlarına indeksler
+
+- transcript_segments (meeting_id, id): toplantı detayı, sohbet bağlamı, yeniden işlemede silme
+- action_items (meeting_id, status, due_date): toplantının görevleri, /tasks/all ve /nudges join'i
+- action_items (status, due_date): açık/tarihli görev taramaları
+- meetings (owner_id, id): kullanıcının toplantı listesi (en yeni önce)
+- meetings (team_id): takım toplantıları / hafıza kiracı kapsamı
+- team_members (user_id): kullanıcının takımları (PK team_id ile başlar)
+
+Revision ID: 0003_hot_query_indexes
+Revises: 0002_catch_up_models
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_hot_query_indexes"
+down_revision = "0002_catch_up_models"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_transcript_segments_meeting_id_id", "transcript_segments", ["meeting_id", "id"]),
+    ("ix_action_items_meeting_id_status_due_date", "action_items", ["meeting_id", "status", "due_date"]),
+    ("ix_action_items_status_due_date", "action_items", ["status", "due_date"]),
+    ("ix_meetings_owner_id_id", "meetings", ["owner_id", "id"]),
+    ("ix_meetings_team_id", "meetings", ["team_id"]),
+    ("ix_team_members_user_id", "team_members", ["user_id"]),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        # Bu sürümden sonra create_all ile kurulmuş veritabanlarında indeks zaten var
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
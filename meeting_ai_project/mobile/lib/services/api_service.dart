@@ -1,5 +1,6 @@
 import 'dart:convert';
 import 'dart:io';
+import 'dart:math';
 import 'package:http/http.dart' as http;
 import 'package:shared_preferences/shared_preferences.dart';
 
@@ -129,6 +130,10 @@ class ApiService {
   // --- TOPLANTI İŞLEMLERİ ---
 
   Future<int?> uploadMeeting(String filePath) async {
+    // Önce parçalı (kaldığı yerden devam eden) yüklemeyi dene
+    final resumableId = await uploadMeetingResumable(filePath);
+    if (resumableId != null) return resumableId;
+
     try {
       final headers = await _getHeaders();
       var request = http.MultipartRequest('POST', Uri.parse('$baseUrl/meetings/upload'));
@@ -148,6 +153,82 @@ class ApiService {
     return null;
   }
 
+  // Büyük kayıtları parça parça yükler. Bağlantı koparsa bir sonraki çağrıda
+  // sunucudaki ofsetten devam eder, dosyanın tamamı yeniden gönderilmez.
+  Future<int?> uploadMeetingResumable(String filePath) async {
+    final prefs = await SharedPreferences.getInstance();
+    final file = File(filePath);
+    try {
+      final headers = await _getHeaders();
+      final total = await file.length();
+      final sessionKey = 'upload_session_${filePath}_$total';
+
+      String? uploadId = prefs.getString(sessionKey);
+      int offset = 0;
+      int chunkSize = 4 * 1024 * 1024;
+
+      // 1. Yarım kalmış oturum varsa ofseti öğren
+      if (uploadId != null) {
+        final res = await http.get(Uri.parse('$baseUrl/meetings/uploads/$uploadId'), headers: headers);
+        if (res.statusCode == 200) {
+          offset = jsonDecode(res.body)['offset'];
+        } else {
+          uploadId = null;
+        }
+      }
+
+      // 2. Yoksa yeni oturum aç
+      if (uploadId == null) {
+        final res = await http.post(
+          Uri.parse('$baseUrl/meetings/uploads'),
+          headers: headers,
+          body: jsonEncode({'filename': filePath.split('/').last, 'size': total}),
+        );
+        if (res.statusCode != 201) return null;
+        final data = jsonDecode(res.body);
+        uploadId = data['upload_id'] as String;
+        chunkSize = data['chunk_size'];
+        await prefs.setString(sessionKey, uploadId);
+      }
+
+      // 3. Parçaları sırayla gönder
+      final raf = await file.open();
+      try {
+        while (offset < total) {
+          await raf.setPosition(offset);
+          final bytes = await raf.read(min(chunkSize, total - offset));
+          final res = await http.put(
+            Uri.parse('$baseUrl/meetings/uploads/$uploadId?offset=$offset'),
+            headers: {...headers, 'Content-Type': 'application/octet-stream'},
+            body: bytes,
+          );
+          if (res.statusCode == 200 || res.statusCode == 409) {
+            // 409: Sunucu farklı bir ofsette, oradan devam et
+            offset = jsonDecode(res.body)['offset'];
+          } else {
+            return null;
+          }
+        }
+      } finally {
+        await raf.close();
+      }
+
+      // 4. Bitir: toplantı oluşturulur ve analiz başlar
+      final res = await http.post(
+        Uri.parse('$baseUrl/meetings/uploads/$uploadId/complete'),
+        headers: headers,
+        body: jsonEncode({}),
+      );
+      if (res.statusCode == 201) {
+        await prefs.remove(sessionKey);
+        return jsonDecode(res.body)['id'];
+      }
+    } catch (e) {
+      print("Parçalı Upload Hatası: $e");
+    }
+    return null;
+  }
+
   Future<List<dynamic>> fetchMeetings() async {
     try {
       final headers = await _getHeaders();
@@ -37,10 +37,8 @@ function App() {
       let durationSum = 0;
 
       data.forEach(meeting => {
-        // Backend'den gelen action_items listesinin uzunluğu
-        if (meeting.action_items) {
-          taskCount += meeting.action_items.length;
-        }
+        // Backend'den gelen görev sayısı
+        taskCount += meeting.action_item_count || 0;
         if (meeting.duration_seconds) {
           durationSum += meeting.duration_seconds;
         }
@@ -205,7 +203,7 @@ function App() {
                         </span>
                       </td>
                       <td className="px-6 py-4 text-sm text-gray-600 font-medium">
-                        {meeting.action_items ? meeting.action_items.length : 0} Görev
+                        {meeting.action_item_count || 0} Görev
                       </td>
                       <td className="px-6 py-4 text-right">
                         <button 